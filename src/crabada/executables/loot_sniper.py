@@ -18,7 +18,7 @@ def main() -> None:
         CrabadaWeb2Client(),
         verbose=True,
     )
-    cb = circuit_breaker.CircuitBreaker(15.0)
+    cb = circuit_breaker.CircuitBreaker(15.0, adaptive=True)
     while True:
         for _, config in USERS.items():
             cb.start()
@@ -27,8 +27,12 @@ def main() -> None:
             except KeyboardInterrupt:
                 sniper.end()
             except:
-                pass
+                cb.record_error()
+            deadline = sniper.get_next_deadline()
+            if deadline is not None:
+                cb.set_deadline(deadline)
             cb.end()
+            logger.print_normal(f"Circuit breaker: {cb.get_state()}")
             time.sleep(1.0)
 
 
@@ -176,6 +176,17 @@ class LootSnipes:
         logger.print_ok_blue("Hunting for low MP loot snipes...")
         self._hunt_low_mp_teams(address, available_loots)
 
+    def get_next_deadline(self) -> T.Optional[float]:
+        """Epoch time a snipe goes stale or the sheet is due to be re-read"""
+        deadlines = [
+            s["start_time"] + self.MAX_LOOT_STALE_TIME
+            for s in self.snipes.values()
+            if "start_time" in s
+        ]
+        if self.gsheet:
+            deadlines.append(self.last_update + self.sheets_update_delta)
+        return min(deadlines, default=None)
+
     def _read_log(self, log_file: str = "") -> T.Dict[str, int]:
         if not log_file:
             log_file = self.log_file
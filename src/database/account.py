@@ -1,11 +1,13 @@
+import threading
 import time
 import typing as T
 
 from contextlib import contextmanager
+from sqlalchemy.orm import Query, Session, selectinload
 from sqlalchemy.sql import func
 
 from config_admin import USER_CONFIGS_DB
-from database.connect import ManagedSession
+from database.connect import ManagedSession, QueryCounter
 from database.models.account import Account
 from database.models.game_config import GameConfig
 from database.models.wallet import Wallet
@@ -13,17 +15,70 @@ from utils import logger
 
 
 class AccountDb:
+    """
+    Accounts are read far more often than they are written, so reads go
+    through a process wide cache of eagerly loaded, detached accounts. The
+    wallets, game configs and commission percents of every account come back
+    in a fixed number of queries no matter how many accounts there are, and
+    any write through this class drops the cache for that db.
+    """
+
+    # (db, game) -> accounts with a config for that game
+    CONFIG_CACHE: T.Dict[T.Tuple[str, str], T.List[Account]] = {}
+    # (db, owner) -> account
+    ACCOUNT_CACHE: T.Dict[T.Tuple[str, str], Account] = {}
+    CACHE_LOCK = threading.RLock()
+
     def __init__(self, owner: str, db_str: str = USER_CONFIGS_DB) -> None:
         self.owner = owner
         self.wallets = []
         self.db_str = db_str
 
-        with ManagedSession(self.db_str) as db:
-            user = db.query(Account).filter(Account.owner == owner).first()
-            assert user is not None, f"Account {self.owner} not in DB!"
-            logger.print_bold(f"{user} initiated")
-            for wallet in user.wallets:
-                self.wallets.append(wallet.address)
+        user = AccountDb.get_account(owner, db_str)
+        assert user is not None, f"Account {self.owner} not in DB!"
+        logger.print_bold(f"{user} initiated")
+        for wallet in user.wallets:
+            self.wallets.append(wallet.address)
+
+    @staticmethod
+    def _eager_query(db: Session) -> Query:
+        # selectin loading is one extra query per relationship for the whole
+        # result set instead of one lazy load per row
+        return db.query(Account).options(
+            selectinload(Account.wallets).selectinload(Wallet.game_configs),
+            selectinload(Account.wallets).selectinload(
+                Wallet.commission_percents
+            ),
+        )
+
+    @staticmethod
+    def invalidate_cache(db_str: str = USER_CONFIGS_DB) -> None:
+        with AccountDb.CACHE_LOCK:
+            for cache in [AccountDb.CONFIG_CACHE, AccountDb.ACCOUNT_CACHE]:
+                for key in [k for k in cache.keys() if k[0] == db_str]:
+                    del cache[key]
+
+    @staticmethod
+    def get_account(
+        owner: str, db_str: str = USER_CONFIGS_DB
+    ) -> T.Optional[Account]:
+        """Cached, detached account with its wallets and configs loaded"""
+        with AccountDb.CACHE_LOCK:
+            if (db_str, owner) in AccountDb.ACCOUNT_CACHE:
+                return AccountDb.ACCOUNT_CACHE[(db_str, owner)]
+
+            with ManagedSession(db_str) as db:
+                account = (
+                    AccountDb._eager_query(db)
+                    .filter(Account.owner == owner)
+                    .first()
+                )
+                # detach before the commit expires the loaded relationships
+                db.expunge_all()
+
+            if account is not None:
+                AccountDb.ACCOUNT_CACHE[(db_str, owner)] = account
+            return account
 
     @contextmanager
     def account(self) -> T.Iterator[Account]:
@@ -38,6 +93,8 @@ class AccountDb:
             except:
                 logger.print_fail("Failed to store db item!")
 
+        AccountDb.invalidate_cache(self.db_str)
+
     @contextmanager
     def wallet(self, address: str) -> T.Iterator[GameConfig]:
         with ManagedSession(self.db_str) as db:
@@ -56,6 +113,8 @@ class AccountDb:
             except:
                 logger.print_fail("Failed to store db item!")
 
+        AccountDb.invalidate_cache(self.db_str)
+
     @contextmanager
     def game_config(self, game: str, address: str) -> T.Iterator[GameConfig]:
         with ManagedSession(self.db_str) as db:
@@ -83,6 +142,8 @@ class AccountDb:
             except:
                 logger.print_fail("Failed to store db item!")
 
+        AccountDb.invalidate_cache(self.db_str)
+
     @staticmethod
     def add_account(
         user: str,
@@ -104,6 +165,8 @@ class AccountDb:
 
             db.add(account)
 
+        AccountDb.invalidate_cache(db_str)
+
     @staticmethod
     def add_wallet(
         user: str, address: str, private_key: str, db_str: str = USER_CONFIGS_DB
@@ -114,7 +177,13 @@ class AccountDb:
                 logger.print_fail(f"Failed to add wallet, user doesn't exist!")
                 return
 
-            if address in [w.address for w in account.wallets]:
+            existing = (
+                db.query(Wallet.address)
+                .filter(Wallet.address == address)
+                .filter(Wallet.account_id == account.owner)
+                .first()
+            )
+            if existing is not None:
                 logger.print_warn(f"Skipping add wallet, already in account!")
                 return
 
@@ -128,6 +197,8 @@ class AccountDb:
 
             db.add(wallet)
 
+        AccountDb.invalidate_cache(db_str)
+
     @staticmethod
     def add_game_config(
         address: str,
@@ -144,7 +215,13 @@ class AccountDb:
                 )
                 return
 
-            if game in [g.name for g in wallet.game_configs]:
+            existing = (
+                db.query(GameConfig.id)
+                .filter(GameConfig.wallet_id == wallet.address)
+                .filter(GameConfig.name == game)
+                .first()
+            )
+            if existing is not None:
                 logger.print_warn(f"Skipping config, already in wallet!")
                 return
 
@@ -156,16 +233,35 @@ class AccountDb:
 
             db.add(config)
 
+        AccountDb.invalidate_cache(db_str)
+
     @staticmethod
     def get_configs_for_game(
         game: str, db_str: str = USER_CONFIGS_DB
     ) -> T.List[Account]:
-        with ManagedSession(db_str) as db:
-            accounts = (
-                db.query(Account)
-                .join(Account.wallets)
-                .join(Wallet.game_configs)
-                .filter(GameConfig.name == game)
-                .all()
+        """Cached, detached accounts with a config for `game`"""
+        with AccountDb.CACHE_LOCK:
+            if (db_str, game) in AccountDb.CONFIG_CACHE:
+                return AccountDb.CONFIG_CACHE[(db_str, game)]
+
+            with ManagedSession(db_str) as db:
+                with QueryCounter(db_str) as counter:
+                    accounts = (
+                        AccountDb._eager_query(db)
+                        .filter(
+                            Account.wallets.any(
+                                Wallet.game_configs.any(GameConfig.name == game)
+                            )
+                        )
+                        .all()
+                    )
+                db.expunge_all()
+
+            logger.print_normal(
+                f"Loaded {len(accounts)} {game} accounts with {counter.count} queries"
             )
+
+            AccountDb.CONFIG_CACHE[(db_str, game)] = accounts
+            for account in accounts:
+                AccountDb.ACCOUNT_CACHE[(db_str, account.owner)] = account
             return accounts
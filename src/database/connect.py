@@ -1,12 +1,14 @@
 import contextlib
 import os
+import threading
 import typing as T
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.orm.scoping import ScopedSessionMixin
+from sqlalchemy.pool import QueuePool
 from sqlalchemy_utils import database_exists
 
 from utils import logger
@@ -18,12 +20,49 @@ THREAD_SAFE_SESSION_FACTORY = {}
 AccountBase = declarative_base(name="AccountBase")
 GameBase = declarative_base(name="GameBase")
 
+# applied to every new sqlite connection when using the tuned profile
+SQLITE_PRAGMAS = {
+    # readers don't block the writer and commits are a sequential append
+    "journal_mode": "WAL",
+    # safe with WAL, only the last commits can be lost on power failure
+    "synchronous": "NORMAL",
+    # negative means KiB, so ~64MB of page cache per connection
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    # wait on a locked db instead of failing right away
+    "busy_timeout": 5000,
+}
 
-def init_engine(uri: str, db: str, **kwargs: T.Any) -> Engine:
+# one pool per db shared by every bot thread in the process
+SQLITE_POOL_KWARGS = {
+    "poolclass": QueuePool,
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_pre_ping": True,
+    "connect_args": {"check_same_thread": False},
+}
+
+
+def _set_sqlite_pragmas(dbapi_connection: T.Any, _: T.Any) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+def init_engine(
+    uri: str, db: str, tuned: bool = True, **kwargs: T.Any
+) -> Engine:
     global ENGINE
     if db not in ENGINE:
-        uri.split(".")[0]
+        is_sqlite = uri.startswith("sqlite")
+        if is_sqlite and tuned:
+            for key, value in SQLITE_POOL_KWARGS.items():
+                kwargs.setdefault(key, value)
         ENGINE[db] = create_engine(uri, **kwargs)
+        if is_sqlite and tuned:
+            event.listen(ENGINE[db], "connect", _set_sqlite_pragmas)
     return ENGINE[db]
 
 
@@ -77,12 +116,45 @@ def ManagedSession(db: str = None):
         THREAD_SAFE_SESSION_FACTORY[db].remove()
 
 
-def init_database(log_dir: str, db_name: str, db_model_class: T.Any) -> None:
+class QueryCounter:
+    """
+    Count the statements the current thread sends to a database, used to
+    measure how chatty a block of code is:
+    ```
+    with QueryCounter(db) as counter:
+        do_db_things()
+    print(counter.count)
+    ```
+    The engine is shared by every bot thread so statements from other
+    threads are left out.
+    """
+
+    def __init__(self, db: str) -> None:
+        self.engine = ENGINE[db]
+        self.count = 0
+        self.thread_id = threading.get_ident()
+
+    def _on_execute(self, *args: T.Any, **kwargs: T.Any) -> None:
+        if threading.get_ident() == self.thread_id:
+            self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        self.thread_id = threading.get_ident()
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *args: T.Any) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def init_database(
+    log_dir: str, db_name: str, db_model_class: T.Any, tuned: bool = True
+) -> None:
     db_file = os.path.join(log_dir, "database", db_name)
     sql_db = "sqlite:///" + db_file
 
     make_sure_path_exists(db_file)
-    engine = init_engine(sql_db, db_name)
+    engine = init_engine(sql_db, db_name, tuned=tuned)
     if database_exists(engine.url):
         logger.print_bold(f"Found existing database")
     else:
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark of the account models with the default and the tuned
+sqlite engine profiles. Every operation uses its own ManagedSession, the
+way the bots do, so the numbers include the per-use commit and remove.
+"""
+import argparse
+import os
+import tempfile
+import time
+import typing as T
+
+from database.connect import ManagedSession, init_database
+from database.models.account import Account
+from database.models.commission_percents import CommissionPercents
+from database.models.game_config import GameConfig
+from database.models.wallet import Wallet
+from utils import logger
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-accounts", type=int, default=500)
+    parser.add_argument("--log-dir", default="")
+    return parser.parse_args()
+
+
+def insert_accounts(db_name: str, num_accounts: int) -> float:
+    start = time.time()
+    for i in range(num_accounts):
+        address = f"0x{i:040x}"
+        with ManagedSession(db_name) as db:
+            db.add(
+                Account(
+                    owner=f"user{i}",
+                    email=f"user{i}@example.com",
+                    discord_handle=f"user#{i}",
+                )
+            )
+            db.add(
+                Wallet(
+                    address=address, private_key="dummy", account_id=f"user{i}"
+                )
+            )
+            db.add(CommissionPercents(address=address, wallet_id=address))
+            db.add(
+                GameConfig(
+                    name="benchmark",
+                    discriminator="GameConfig",
+                    wallet_id=address,
+                )
+            )
+    return time.time() - start
+
+
+def query_accounts(db_name: str, num_accounts: int) -> float:
+    start = time.time()
+    for i in range(num_accounts):
+        with ManagedSession(db_name) as db:
+            account = (
+                db.query(Account).filter(Account.owner == f"user{i}").first()
+            )
+            assert account is not None, f"Missing user{i}"
+            assert sum([len(w.game_configs) for w in account.wallets]) == 1
+    return time.time() - start
+
+
+def run_profile(
+    log_dir: str, num_accounts: int, tuned: bool
+) -> T.Dict[str, float]:
+    db_name = f"benchmark_{'tuned' if tuned else 'default'}.db"
+    db_file = os.path.join(log_dir, "database", db_name)
+    for suffix in ["", "-wal", "-shm"]:
+        if os.path.isfile(db_file + suffix):
+            os.remove(db_file + suffix)
+
+    init_database(log_dir, db_name, Account, tuned=tuned)
+
+    insert_time = insert_accounts(db_name, num_accounts)
+    query_time = query_accounts(db_name, num_accounts)
+
+    return {
+        "inserts_per_sec": num_accounts / insert_time,
+        "queries_per_sec": num_accounts / query_time,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    log_dir = args.log_dir if args.log_dir else tempfile.mkdtemp()
+
+    for tuned in [False, True]:
+        results = run_profile(log_dir, args.num_accounts, tuned)
+        logger.print_ok_blue(
+            f"{'Tuned' if tuned else 'Default'} profile: "
+            f"{results['inserts_per_sec']:.1f} account inserts/sec, "
+            f"{results['queries_per_sec']:.1f} account queries/sec"
+        )
+
+    logger.print_normal(
+        f"Benchmark databases in {os.path.join(log_dir, 'database')}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import threading
+
+from sqlalchemy import text
+
+from database.connect import QueryCounter, init_engine
+
+
+def test_query_counter_per_thread() -> None:
+    db_name = "query_counter_test.db"
+    log_dir = tempfile.mkdtemp()
+    engine = init_engine("sqlite:///" + os.path.join(log_dir, db_name), db_name)
+
+    # both threads are counting while the other one runs its statements
+    num_queries = {"first": 3, "second": 7}
+    counts = {}
+    started = threading.Barrier(len(num_queries))
+    done = threading.Barrier(len(num_queries))
+
+    def run(name: str) -> None:
+        with QueryCounter(db_name) as counter:
+            started.wait()
+            with engine.connect() as connection:
+                for _ in range(num_queries[name]):
+                    connection.execute(text("SELECT 1"))
+            done.wait()
+        counts[name] = counter.count
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in num_queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counts == num_queries, f"Counts leaked across threads: {counts}"
+
+
+if __name__ == "__main__":
+    test_query_counter_per_thread()
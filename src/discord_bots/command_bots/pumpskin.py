@@ -2,29 +2,20 @@ import discord
 import time
 import typing as T
 
-from config_admin import ADMIN_ADDRESS
 from crabada.crabada_web2_client import CrabadaWeb2Client
 from discord_bots.command_bots.default import OnMessage
 from joepegs.joepegs_api import JOEPEGS_ICON_URL, JOEPEGS_URL
+from pumpskin.collection_cache import PUMPSKIN_CACHE
 from pumpskin.listings import post_rarist_listings
-from pumpskin.pumpskin_web3_client import (
-    PumpskinCollectionWeb3Client,
-    PumpskinNftWeb3Client,
-)
-from pumpskin.pumpskin_web2_client import PumpskinWeb2Client
-from pumpskin.types import ATTRIBUTE_TO_EMOJI, StakedPumpskin
-from pumpskin.utils import ATTRIBUTES_FILE
+from pumpskin.pumpskin_web3_client import PumpskinNftWeb3Client
+from pumpskin.types import ATTRIBUTE_TO_EMOJI, Rarity, StakedPumpskin
 from pumpskin.utils import (
-    get_json_path,
-    get_mint_stats,
     calc_potn_from_level,
     calc_ppie_per_day_from_level,
     calc_roi_from_mint,
-    calculate_rarity_from_query,
 )
 from utils import logger
 from utils.general import get_pretty_seconds
-from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
 
 
 class GetPumpkinLevel(OnMessage):
@@ -38,7 +29,11 @@ class GetPumpkinLevel(OnMessage):
 
     @staticmethod
     def _get_pumpskin_info_embed(
-        token_id: int, level: int, image_uri: str, cooldown_time: str
+        token_id: int,
+        level: int,
+        image_uri: str,
+        cooldown_time: str,
+        pumpskin_rarity: Rarity,
     ) -> discord.Embed:
         embed = discord.Embed(
             title=f"PUMPʂKIN {token_id}",
@@ -60,10 +55,6 @@ class GetPumpkinLevel(OnMessage):
             name=f"\U0000200b", value=f"**Attribute Rarity**", inline=False
         )
 
-        pumpskin_rarity = calculate_rarity_from_query(
-            token_id, get_json_path(ATTRIBUTES_FILE)
-        )
-
         if not pumpskin_rarity:
             return ""
 
@@ -117,26 +108,16 @@ class GetPumpkinLevel(OnMessage):
         except ValueError:
             return ""
 
-        minted, _ = get_mint_stats()
-
-        if token_id > minted:
+        if not PUMPSKIN_CACHE.is_minted(token_id):
             return "Not yet minted"
 
         try:
-            w3: PumpskinCollectionWeb3Client = (
-                PumpskinCollectionWeb3Client()
-                .set_credentials(ADMIN_ADDRESS, "")
-                .set_node_uri(AvalancheCWeb3Client.NODE_URL)
-                .set_contract()
-                .set_dry_run(False)
-            )
-
-            w2: PumpskinWeb2Client = PumpskinWeb2Client()
-
-            pumpskin_info: StakedPumpskin = w3.get_staked_pumpskin_info(
-                token_id
+            pumpskin_info: StakedPumpskin = (
+                PUMPSKIN_CACHE.get_staked_pumpskin_info(token_id)
             )
-            pumpskin_image_uri = w2.get_pumpskin_image(token_id)
+            token_info = PUMPSKIN_CACHE.get_token_info(token_id)
+            if token_info is None:
+                return ""
 
             now = time.time()
             cooldown_time = pumpskin_info["cooldown_ts"] - now
@@ -147,7 +128,11 @@ class GetPumpkinLevel(OnMessage):
             ml = int(pumpskin_info["kg"] / 100)
 
             embed = cls._get_pumpskin_info_embed(
-                token_id, ml, pumpskin_image_uri, cooldown_time_pretty
+                token_id,
+                ml,
+                token_info["image"],
+                cooldown_time_pretty,
+                token_info["rarity"],
             )
 
             logger.print_normal(
@@ -278,7 +263,7 @@ class MintNumber(OnMessage):
         if not text.startswith(cls.HOTKEY):
             return ""
 
-        minted, supply = get_mint_stats()
+        minted, supply = PUMPSKIN_CACHE.get_mint_stats()
 
         return f"Minted: `{minted}/{supply}`"
 
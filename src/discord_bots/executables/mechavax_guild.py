@@ -39,6 +39,7 @@ from mechavax.mechavax_web3client import (
     MechHangerContractWeb3Client,
     ShirakContractWeb3Client,
 )
+from mechavax.stats_history import MechStatsHistory
 from utils import general, logger
 from utils.async_utils import async_func_wrapper
 from utils.price import wei_to_token, TokenWei
@@ -294,7 +295,8 @@ async def shk_plots_command(
 
     logger.print_bold(f"Received plots command")
 
-    if not os.path.isfile(MECH_STATS_HISTORY_FILE):
+    history = MechStatsHistory(MECH_STATS_HISTORY_FILE, read_only=True)
+    if len(history) == 0:
         await interaction.response.send_message("Missing data")
         return
 
@@ -331,21 +333,16 @@ async def shk_plots_command(
             address = stats[0]
             top_holders.append(address)
 
-    with open(MECH_STATS_HISTORY_FILE, "r") as infile:
-        data_str = infile.read()
-        if data_str == "":
-            await interaction.followup.send("Missing data")
-            return
-        data = json.loads(data_str)
+    # only the rows of the window we plot are read
+    _, series = await async_func_wrapper(
+        history.load, nft_type.lower(), top_holders, window
+    )
 
     plot = []
     legend_labels = {}
     row_label = []
     row_length = 0
-    for address, stats in data.items():
-        if address not in top_holders:
-            continue
-
+    for address, row in series.items():
         resolved_address = await async_func_wrapper(
             resolve_address_to_avvy, w3.w3, address
         )
@@ -355,20 +352,8 @@ async def shk_plots_command(
             )
         legend_labels[address] = resolved_address
         row_label.append(address)
-        row = stats[nft_type.lower()]
-        plot.append(row)
-        row_length = max(row_length, len(row))
-
-    for i in range(len(plot)):
-        row = plot[i]
-        if len(row) < row_length:
-            plot[i] = [0] * (row_length - len(row)) + row
-
-        if window > 0:
-            plot[i] = plot[i][-window:]
-
-    if window > 0:
-        row_length = window
+        plot.append(row.tolist())
+        row_length = len(row)
 
     row_label.append("sample")
     plot.append(list(range(row_length)))
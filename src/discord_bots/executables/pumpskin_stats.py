@@ -6,6 +6,7 @@ from config_admin import DISCORD_PUMPSKIN_BOT_TOKEN
 from utils import logger
 from discord_bots.command_bots import default, pumpskin
 from pumpskin.bot import PumpskinBot
+from pumpskin.collection_cache import PUMPSKIN_CACHE
 from pumpskin.utils import get_mint_stats
 
 intents: discord.Intents = discord.Intents.default()
@@ -51,4 +52,6 @@ async def on_message(message: discord.message.Message) -> None:
                 await message.channel.send(response)
 
 
+# on_ready fires again on every reconnect, start the refresh thread once here
+PUMPSKIN_CACHE.run()
 client.run(DISCORD_PUMPSKIN_BOT_TOKEN)
@@ -23,6 +23,13 @@ class HealthMonitor:
         self.users = users
         self.server_url = server_url
         self.verbose = verbose
+        self.user_stats: T.Dict[str, T.Dict[str, T.Any]] = {}
+        self.lock = threading.Lock()
+
+    def set_user_stats(self, user: str, stats: T.Dict[str, T.Any]) -> None:
+        """Per user latency/throughput numbers sent along with the next ping"""
+        with self.lock:
+            self.user_stats[user] = stats
 
     def update(self) -> None:
         url = self.server_url + f"/health/{self.bot_name}"
@@ -42,6 +49,10 @@ class HealthMonitor:
             "users": users,
         }
 
+        with self.lock:
+            if self.user_stats:
+                data["user_stats"] = dict(self.user_stats)
+
         if self.verbose:
             logger.print_normal(f"Ping from {self.bot_name}...")
             logger.print_normal(f"{json.dumps(data,indent=4)}")
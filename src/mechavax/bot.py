@@ -23,6 +23,8 @@ from mechavax.mechavax_web3client import (
     MechHangerContractWeb3Client,
     ShirakContractWeb3Client,
 )
+from mechavax.stats_history import MechStatsHistory
+from mechavax.stats_snapshot import MechStatsSnapshot
 from utils import discord, logger
 from utils.general import get_pretty_seconds
 from utils.async_utils import async_func_wrapper
@@ -33,6 +35,7 @@ from web3_utils.helpers import (
     resolve_address_to_avvy,
     shortened_address_str,
 )
+from web3_utils.presigned_tx_queue import PresignedTransactionQueue
 from web3_utils.snowtrace import SnowtraceApi
 
 
@@ -104,6 +107,18 @@ class MechBot:
             .set_dry_run(False)
         )
 
+        self.mint_queues: T.Dict[str, PresignedTransactionQueue] = {
+            "MECH": PresignedTransactionQueue(
+                self.w3_mech, self.w3_mech.get_mint_from_shk_function
+            ),
+            "MARM": PresignedTransactionQueue(
+                self.w3_arm, self.w3_arm.get_mint_from_shk_function
+            ),
+        }
+
+        self.stats_snapshot = MechStatsSnapshot(self.w3_mech, self.MAX_SUPPLY)
+        self.stats_history = MechStatsHistory(MECH_STATS_HISTORY_FILE)
+
         self.last_time_mech_minted = self.get_last_mech_mint()
         self.last_time_marm_minted = self.get_last_marm_mint()
 
@@ -551,7 +566,8 @@ class MechBot:
         shk_balance = await async_func_wrapper(
             self.w3_mech.get_deposited_shk, self.address
         )
-        min_mint_shk = await async_func_wrapper(w3.get_min_mint_bid)
+        min_mint_shk_wei = await async_func_wrapper(w3.get_min_mint_bid_wei)
+        min_mint_shk = wei_to_token(min_mint_shk_wei)
 
         savings_margin = shk_balance / min_mint_shk
         savings_mult = self.MINTING_INFO[nft_type]["multiplier"]
@@ -575,7 +591,20 @@ class MechBot:
             return
 
         logger.print_normal(f"Margin = {savings_margin}")
-        tx_hash = await async_func_wrapper(w3.mint_from_shk)
+
+        # the queue's thread keeps the tx at this price signed between passes,
+        # so while the price holds this is only the broadcast
+        mint_queue = self.mint_queues[nft_type]
+        try:
+            await async_func_wrapper(
+                mint_queue.prepare, min_mint_shk_wei, True, replace=True
+            )
+            tx_hash = await async_func_wrapper(
+                mint_queue.fire, min_mint_shk_wei, True
+            )
+        except Exception as e:
+            logger.print_fail(f"Failed to mint {nft_type}: {e}")
+            return
         action_str = f"Mint {nft_type} for {min_mint_shk:.2f} using $SHK balance of {shk_balance:.2f}"
         _, txn_url = process_w3_results(w3, action_str, tx_hash)
         if txn_url:
@@ -588,26 +617,17 @@ class MechBot:
         self.mint_webhook.send(message)
 
     def parse_stats_iteration(self) -> None:
-        current_balances = {}
-        for nft_id in range(1, self.MAX_SUPPLY + 1):
-            address = self.w3_mech.get_owner_of(nft_id)
-            if not address:
-                continue
-
-            if address in current_balances:
-                continue
-
-            current_balances[address] = {}
-            current_balances[address]["shk"] = self.w3_mech.get_deposited_shk(
-                address
-            )
-            current_balances[address]["mechs"] = self.w3_mech.get_num_mechs(
-                address
-            )
-            if self.verbose:
+        start = time.time()
+        current_balances = self.stats_snapshot.get_stats()
+        if self.verbose:
+            for address, stats in current_balances.items():
                 logger.print_normal(
-                    f"[{nft_id}/{self.MAX_SUPPLY}] Found {address} with {current_balances[address]['shk']}, {current_balances[address]['mechs']} mechs"
+                    f"Found {address} with {stats['shk']}, {stats['mechs']} mechs"
                 )
+        logger.print_normal(
+            f"Snapshot of {len(current_balances)} mech owners took "
+            f"{time.time() - start:.1f}s"
+        )
 
         sorted_stats = {
             k: v
@@ -623,36 +643,7 @@ class MechBot:
         with open(MECH_STATS_CACHE_FILE, "w") as outfile:
             json.dump(sorted_stats, outfile, indent=4)
 
-        if os.path.isfile(MECH_STATS_HISTORY_FILE):
-            with open(MECH_STATS_HISTORY_FILE, "r") as infile:
-                data_str = infile.read()
-                if data_str:
-                    data = json.loads(data_str)
-                else:
-                    data = {}
-        else:
-            data = {}
-
-        with open(MECH_STATS_HISTORY_FILE, "w") as outfile:
-            for address, stats in current_balances.items():
-                if address not in data:
-                    data[address] = {}
-
-                for k, v in stats.items():
-                    if k not in data[address]:
-                        data[address][k] = []
-                    data[address][k].append(v)
-
-                resolved_address = resolve_address_to_avvy(
-                    self.w3_mech.w3, address
-                )
-                if resolved_address in data and resolved_address != address:
-                    data[address] = data[resolved_address]
-                    del data[resolved_address]
-                    logger.print_normal(
-                        f"Converting {resolved_address} -> {address}"
-                    )
-            json.dump(data, outfile, indent=4)
+        self.stats_history.append(current_balances)
 
         logger.print_bold("Updated cache file!")
         time.sleep(1.0)
@@ -787,6 +778,9 @@ class MechBot:
         )
         thread.start()
 
+        for mint_queue in self.mint_queues.values():
+            mint_queue.run()
+
         try:
             while True:
                 loop.run_until_complete(
@@ -800,4 +794,6 @@ class MechBot:
                     )
                 )
         finally:
+            for mint_queue in self.mint_queues.values():
+                mint_queue.stop()
             loop.close()
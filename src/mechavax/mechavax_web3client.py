@@ -6,15 +6,22 @@ import typing as T
 from eth_typing import Address
 from eth_typing.encoding import HexStr
 from web3 import Web3
+from web3.contract import ContractFunction
 from web3.types import TxParams, Wei
 
 from utils import logger
 from utils.price import token_to_wei, wei_to_token, TokenWei
 from web3_utils.web3_client import Web3Client
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
+from web3_utils.multicall import MULTICALL_AVAX_ADDRESS, Multicall
 from pumpskin.types import StakedPumpskin
 
 
+class MechUserStats(T.TypedDict):
+    shk: float
+    mechs: int
+
+
 class ShirakContractWeb3Client(AvalancheCWeb3Client):
     """
     https://snowtrace.io/address/0x7D57f563db93F257BD556D86e6FEe7079c80226e
@@ -63,6 +70,13 @@ class MechArmContractWeb3Client(AvalancheCWeb3Client):
             logger.print_fail(f"{e}")
             return 0
 
+    def get_mint_from_shk_function(
+        self, price_shk_wei: TokenWei, use_deposit: bool = True
+    ) -> ContractFunction:
+        return self.contract.functions.mintFromShirak(
+            price_shk_wei, use_deposit
+        )
+
     def mint_from_shk(
         self, max_price_shk: T.Optional[float] = None, use_deposit: bool = True
     ) -> HexStr:
@@ -73,9 +87,7 @@ class MechArmContractWeb3Client(AvalancheCWeb3Client):
 
         try:
             tx: TxParams = self.build_contract_transaction(
-                self.contract.functions.mintFromShirak(
-                    price_shk_wei, use_deposit
-                )
+                self.get_mint_from_shk_function(price_shk_wei, use_deposit)
             )
             return self.sign_and_send_transaction(tx)
         except Exception as e:
@@ -97,6 +109,8 @@ class MechContractWeb3Client(AvalancheCWeb3Client):
     )
     abi = Web3Client._get_contract_abi_from_file(abi_dir)
 
+    MULTICALL_BATCH_SIZE = 250
+
     def get_base_uri(self) -> HexStr:
         try:
             return self.contract.functions.BASE_URI().call()
@@ -191,6 +205,63 @@ class MechContractWeb3Client(AvalancheCWeb3Client):
                 logger.print_fail(f"{e}")
             return ""
 
+    def _get_multicall(self) -> Multicall:
+        return Multicall(self.w3.eth, MULTICALL_AVAX_ADDRESS)
+
+    def get_owners_of(
+        self, token_ids: T.List[int]
+    ) -> T.Tuple[int, T.Dict[int, Address]]:
+        """
+        Owners of `token_ids` with one eth_call per MULTICALL_BATCH_SIZE
+        tokens, and the block the first batch was read at. Burned and
+        unminted tokens are left out.
+        """
+        multicall = self._get_multicall()
+        block_number = 0
+        owners: T.Dict[int, Address] = {}
+        for i in range(0, len(token_ids), self.MULTICALL_BATCH_SIZE):
+            batch = token_ids[i : i + self.MULTICALL_BATCH_SIZE]
+            aggregate = multicall.try_aggregate(
+                [self.contract.functions.ownerOf(t) for t in batch]
+            )
+            if block_number == 0:
+                block_number = aggregate.block_number
+            for token_id, result in zip(batch, aggregate.results):
+                if result.success:
+                    owners[token_id] = Web3.toChecksumAddress(result.results[0])
+        return block_number, owners
+
+    def get_users_stats(
+        self, addresses: T.List[Address]
+    ) -> T.Dict[Address, MechUserStats]:
+        """Deposited SHK and mech count of every address, batched"""
+        multicall = self._get_multicall()
+        stats: T.Dict[Address, MechUserStats] = {}
+        # two calls per address
+        batch_size = self.MULTICALL_BATCH_SIZE // 2
+        for i in range(0, len(addresses), batch_size):
+            batch = addresses[i : i + batch_size]
+            calls = []
+            for address in batch:
+                calls.append(self.contract.functions.shirakBalance(address))
+                calls.append(self.contract.functions.getUserData(address))
+            aggregate = multicall.try_aggregate(calls)
+            for inx, address in enumerate(batch):
+                shk = aggregate.results[inx * 2]
+                data = aggregate.results[inx * 2 + 1]
+                stats[address] = MechUserStats(
+                    shk=wei_to_token(shk.results[0]) if shk.success else 0,
+                    mechs=data.results[0] if data.success else 0,
+                )
+        return stats
+
+    def get_mint_from_shk_function(
+        self, price_shk_wei: TokenWei, use_deposit: bool = True
+    ) -> ContractFunction:
+        return self.contract.functions.mintFromShirak(
+            price_shk_wei, use_deposit
+        )
+
     def mint_from_shk(
         self, max_price_shk: T.Optional[float] = None, use_deposit: bool = True
     ) -> HexStr:
@@ -201,9 +272,7 @@ class MechContractWeb3Client(AvalancheCWeb3Client):
 
         try:
             tx: TxParams = self.build_contract_transaction(
-                self.contract.functions.mintFromShirak(
-                    price_shk_wei, use_deposit
-                )
+                self.get_mint_from_shk_function(price_shk_wei, use_deposit)
             )
             return self.sign_and_send_transaction(tx)
         except Exception as e:
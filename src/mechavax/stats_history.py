@@ -0,0 +1,225 @@
+import json
+import os
+import time
+import typing as T
+
+import numpy as np
+from eth_typing import Address
+
+from mechavax.mechavax_web3client import MechUserStats
+from utils import logger
+
+# one record per sample, written after its rows so readers never see a
+# sample whose rows aren't on disk yet
+INDEX_DTYPE = np.dtype([("timestamp", np.float64), ("end_row", np.int64)])
+
+
+class MechStatsHistory:
+    """
+    Append only columnar store of the mech stats every `parse_stats` pass
+    takes. Each column is a flat binary file with one value per (sample,
+    owner) row, so an append is a write to the end of every file and a read
+    of the last N samples only touches the rows for those samples.
+
+    The files live in a directory next to the json history file they
+    replace, and that file is imported the first time the store is opened
+    for writing. The json didn't keep times, so imported samples have a
+    timestamp of 0.
+
+    Only one process should write, readers open with `read_only` and never
+    touch the files.
+    """
+
+    COLUMNS = {
+        "sample": np.int32,
+        "address": np.int32,
+        "shk": np.float64,
+        "mechs": np.int32,
+    }
+
+    def __init__(self, history_file: str, read_only: bool = False) -> None:
+        self.history_file = history_file
+        self.store_dir = os.path.splitext(history_file)[0] + "_columns"
+        self.read_only = read_only
+
+        self.addresses: T.List[Address] = []
+        self.address_codes: T.Dict[Address, int] = {}
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self.num_samples = 0
+        self.num_rows = 0
+
+        if not read_only:
+            os.makedirs(self.store_dir, exist_ok=True)
+        self._load_index()
+
+        if not read_only:
+            self._repair()
+            if len(self) == 0 and os.path.isfile(history_file):
+                self._import_json()
+
+    def _get_path(self, name: str) -> str:
+        return os.path.join(self.store_dir, name)
+
+    def _load_index(self) -> None:
+        index_file = self._get_path("index.bin")
+        if os.path.isfile(index_file):
+            # a record the writer is in the middle of is left off
+            self.index = np.fromfile(index_file, dtype=INDEX_DTYPE)
+            self.num_samples = len(self.index)
+            self.num_rows = (
+                int(self.index["end_row"][-1]) if self.num_samples > 0 else 0
+            )
+
+        addresses_file = self._get_path("addresses.txt")
+        if not os.path.isfile(addresses_file):
+            return
+        with open(addresses_file, "r") as infile:
+            lines = infile.readlines()
+        # only owners a writer added since we last looked
+        for line in lines[len(self.addresses) :]:
+            if line.endswith("\n"):
+                self._add_address(T.cast(Address, line[:-1]))
+
+    def _add_address(self, address: Address) -> int:
+        self.address_codes[address] = len(self.addresses)
+        self.addresses.append(address)
+        return self.address_codes[address]
+
+    def _repair(self) -> None:
+        """Drop rows of a sample that was cut off before its index record"""
+        num_rows = self.num_rows
+        for column, dtype in self.COLUMNS.items():
+            column_file = self._get_path(f"{column}.bin")
+            size = num_rows * np.dtype(dtype).itemsize
+            if not os.path.isfile(column_file):
+                open(column_file, "wb").close()
+            if os.path.getsize(column_file) != size:
+                logger.print_warn(f"Truncating {column_file} to {num_rows}")
+                with open(column_file, "ab") as outfile:
+                    outfile.truncate(size)
+
+        index_file = self._get_path("index.bin")
+        with open(index_file, "ab") as outfile:
+            outfile.truncate(self.num_samples * INDEX_DTYPE.itemsize)
+
+    def _import_json(self) -> None:
+        with open(self.history_file, "r") as infile:
+            data_str = infile.read()
+        if not data_str:
+            return
+        data: T.Dict[Address, T.Dict[str, T.List[float]]] = json.loads(data_str)
+
+        # rows were only appended while an address held mechs, so like the
+        # plots did we line every series up on the most recent sample
+        num_samples = max(
+            [len(s.get("shk", [])) for s in data.values()], default=0
+        )
+        for sample in range(num_samples):
+            stats: T.Dict[Address, MechUserStats] = {}
+            for address, series in data.items():
+                offset = num_samples - len(series.get("shk", []))
+                if sample < offset:
+                    continue
+                stats[address] = MechUserStats(
+                    shk=series["shk"][sample - offset],
+                    mechs=series["mechs"][sample - offset],
+                )
+            self.append(stats, timestamp=0.0)
+
+        logger.print_ok_blue(
+            f"Imported {num_samples} samples of {len(data)} owners from "
+            f"{self.history_file}"
+        )
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+    def append(
+        self,
+        stats: T.Dict[Address, MechUserStats],
+        timestamp: T.Optional[float] = None,
+    ) -> None:
+        assert not self.read_only, "History opened read only"
+
+        timestamp = time.time() if timestamp is None else timestamp
+        sample = self.num_samples
+
+        new_addresses = [a for a in stats if a not in self.address_codes]
+        if new_addresses:
+            with open(self._get_path("addresses.txt"), "a") as outfile:
+                for address in new_addresses:
+                    outfile.write(f"{address}\n")
+                    self._add_address(address)
+
+        columns = {
+            "sample": np.full(len(stats), sample),
+            "address": [self.address_codes[a] for a in stats],
+            "shk": [s["shk"] for s in stats.values()],
+            "mechs": [s["mechs"] for s in stats.values()],
+        }
+        for column, dtype in self.COLUMNS.items():
+            with open(self._get_path(f"{column}.bin"), "ab") as outfile:
+                np.asarray(columns[column], dtype=dtype).tofile(outfile)
+
+        record = np.array(
+            [(timestamp, self.num_rows + len(stats))], dtype=INDEX_DTYPE
+        )
+        with open(self._get_path("index.bin"), "ab") as outfile:
+            record.tofile(outfile)
+        self.num_samples += 1
+        self.num_rows += len(stats)
+
+    def _read_column(
+        self, column: str, start_row: int, end_row: int
+    ) -> np.ndarray:
+        dtype = np.dtype(self.COLUMNS[column])
+        return np.fromfile(
+            self._get_path(f"{column}.bin"),
+            dtype=dtype,
+            count=end_row - start_row,
+            offset=start_row * dtype.itemsize,
+        )
+
+    def load(
+        self,
+        column: str,
+        addresses: T.List[Address],
+        window: int = -1,
+        since: T.Optional[float] = None,
+    ) -> T.Tuple[np.ndarray, T.Dict[Address, np.ndarray]]:
+        """
+        Timestamps of the last `window` samples, or the ones after `since`,
+        and the `column` values of each address over them. Samples where an
+        address held no mechs are 0.
+        """
+        # the index is 16 bytes a sample, re-read it to see new samples
+        self._load_index()
+
+        num_samples = self.num_samples
+        if num_samples == 0:
+            return np.zeros(0), {a: np.zeros(0) for a in addresses}
+
+        first = 0
+        if window > 0:
+            first = max(num_samples - window, 0)
+        if since is not None:
+            first = max(
+                first,
+                int(np.searchsorted(self.index["timestamp"], since, "left")),
+            )
+
+        start_row = int(self.index["end_row"][first - 1]) if first > 0 else 0
+        end_row = self.num_rows
+        samples = self._read_column("sample", start_row, end_row) - first
+        codes = self._read_column("address", start_row, end_row)
+        values = self._read_column(column, start_row, end_row)
+
+        series: T.Dict[Address, np.ndarray] = {}
+        for address in addresses:
+            row = np.zeros(num_samples - first, dtype=values.dtype)
+            code = self.address_codes.get(address)
+            if code is not None:
+                mask = codes == code
+                row[samples[mask]] = values[mask]
+            series[address] = row
+        return self.index["timestamp"][first:], series
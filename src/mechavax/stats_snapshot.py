@@ -0,0 +1,111 @@
+import time
+import typing as T
+
+from eth_typing import Address
+from web3 import Web3
+
+from mechavax.mechavax_web3client import MechContractWeb3Client, MechUserStats
+from utils import logger
+
+MINT_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+class MechStatsSnapshot:
+    """
+    Owner of every mech plus the deposited SHK and mech count of each owner,
+    read with batched multicalls instead of three calls per token.
+
+    A full read of every owner is done on start and every
+    `full_refresh_period`, in between the owners are moved forward with the
+    `Transfer` logs since the last block we saw. SHK accrues every second
+    without an event, so owner stats are always re-read, but that is a
+    couple of batches for the unique owners.
+    """
+
+    FULL_REFRESH_PERIOD = 60.0 * 60.0 * 6.0
+    # same step MechBot uses when pulling logs, the node caps the range
+    BLOCK_STEP = 2047
+    MAX_BLOCKS_BEHIND = BLOCK_STEP * 20
+
+    def __init__(
+        self,
+        w3: MechContractWeb3Client,
+        max_supply: int,
+        full_refresh_period: float = FULL_REFRESH_PERIOD,
+    ) -> None:
+        self.w3 = w3
+        self.max_supply = max_supply
+        self.full_refresh_period = full_refresh_period
+
+        self.owners: T.Dict[int, Address] = {}
+        self.block_number = 0
+        self.refreshed_at = 0.0
+
+    def refresh_full(self) -> None:
+        start = time.time()
+        self.block_number, self.owners = self.w3.get_owners_of(
+            list(range(1, self.max_supply + 1))
+        )
+        self.refreshed_at = time.time()
+        logger.print_normal(
+            f"Read owners of {len(self.owners)} mechs at block "
+            f"{self.block_number} in {self.refreshed_at - start:.1f}s"
+        )
+
+    def _apply_transfers(self, to_block: int) -> int:
+        num_transfers = 0
+        from_block = self.block_number + 1
+        while from_block <= to_block:
+            end_block = min(from_block + self.BLOCK_STEP - 1, to_block)
+            events = self.w3.contract.events.Transfer.getLogs(
+                fromBlock=from_block, toBlock=end_block
+            )
+            for event in sorted(
+                events, key=lambda e: (e.blockNumber, e.logIndex)
+            ):
+                token_id = event.args.id
+                if token_id < 1 or token_id > self.max_supply:
+                    continue
+                to_address = Web3.toChecksumAddress(event.args.to)
+                if to_address == MINT_ADDRESS:
+                    self.owners.pop(token_id, None)
+                else:
+                    self.owners[token_id] = to_address
+                num_transfers += 1
+            # only move forward once a range is applied so a failed read
+            # picks up from the same place
+            self.block_number = end_block
+            from_block = end_block + 1
+        return num_transfers
+
+    def update(self) -> T.Dict[int, Address]:
+        latest_block = self.w3.w3.eth.block_number
+        if (
+            self.block_number == 0
+            or time.time() - self.refreshed_at > self.full_refresh_period
+            or latest_block - self.block_number > self.MAX_BLOCKS_BEHIND
+        ):
+            self.refresh_full()
+            return self.owners
+
+        try:
+            num_transfers = self._apply_transfers(latest_block)
+        except:
+            logger.print_warn("Failed to get mech transfers, reading all")
+            self.refresh_full()
+            return self.owners
+
+        if num_transfers > 0:
+            logger.print_normal(f"Applied {num_transfers} mech transfers")
+        return self.owners
+
+    def get_owner_addresses(self) -> T.List[Address]:
+        """Unique owners in the order of their lowest token id"""
+        addresses: T.Dict[Address, None] = {}
+        for token_id in sorted(self.owners):
+            addresses.setdefault(self.owners[token_id], None)
+        return list(addresses)
+
+    def get_stats(self) -> T.Dict[Address, MechUserStats]:
+        self.update()
+        return self.w3.get_users_stats(self.get_owner_addresses())
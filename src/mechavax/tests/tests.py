@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import typing as T
+
+import numpy as np
+from eth_typing import Address
+
+from mechavax.mechavax_web3client import MechUserStats
+from mechavax.stats_history import INDEX_DTYPE, MechStatsHistory
+
+OWNER_A = T.cast(Address, "0x000000000000000000000000000000000000000A")
+OWNER_B = T.cast(Address, "0x000000000000000000000000000000000000000B")
+OWNER_C = T.cast(Address, "0x000000000000000000000000000000000000000C")
+
+
+def _stats(shk: float, mechs: int) -> MechUserStats:
+    return MechUserStats(shk=shk, mechs=mechs)
+
+
+def test_stats_history_repair_drops_torn_sample() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history_file = os.path.join(tmp_dir, "mech_history.json")
+        history = MechStatsHistory(history_file)
+        history.append({OWNER_A: _stats(1.0, 1)}, timestamp=10.0)
+        history.append(
+            {OWNER_A: _stats(2.0, 1), OWNER_B: _stats(5.0, 2)}, timestamp=20.0
+        )
+
+        # a writer that died after the rows of a third sample and half way
+        # through its index record
+        for column, dtype in MechStatsHistory.COLUMNS.items():
+            with open(history._get_path(f"{column}.bin"), "ab") as outfile:
+                np.asarray([2, 2], dtype=dtype).tofile(outfile)
+        with open(history._get_path("index.bin"), "ab") as outfile:
+            outfile.write(b"\x00" * (INDEX_DTYPE.itemsize // 2))
+
+        history = MechStatsHistory(history_file)
+        assert len(history) == 2
+        assert history.num_rows == 3
+        for column, dtype in MechStatsHistory.COLUMNS.items():
+            size = os.path.getsize(history._get_path(f"{column}.bin"))
+            assert size == 3 * np.dtype(dtype).itemsize, column
+        size = os.path.getsize(history._get_path("index.bin"))
+        assert size == 2 * INDEX_DTYPE.itemsize
+
+        # appends land right after the last whole sample
+        history.append({OWNER_B: _stats(6.0, 2)}, timestamp=30.0)
+        timestamps, series = history.load("shk", [OWNER_A, OWNER_B])
+        assert list(timestamps) == [10.0, 20.0, 30.0]
+        assert list(series[OWNER_A]) == [1.0, 2.0, 0.0]
+        assert list(series[OWNER_B]) == [0.0, 5.0, 6.0]
+
+
+def test_stats_history_imports_json_aligned_to_latest() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history_file = os.path.join(tmp_dir, "mech_history.json")
+        with open(history_file, "w") as outfile:
+            json.dump(
+                {
+                    OWNER_A: {"shk": [1.0, 2.0, 3.0], "mechs": [1, 1, 2]},
+                    OWNER_B: {"shk": [7.0], "mechs": [4]},
+                },
+                outfile,
+            )
+
+        history = MechStatsHistory(history_file)
+        assert len(history) == 3
+        timestamps, shk = history.load("shk", [OWNER_A, OWNER_B])
+        _, mechs = history.load("mechs", [OWNER_A, OWNER_B])
+        assert list(timestamps) == [0.0, 0.0, 0.0]
+        assert list(shk[OWNER_A]) == [1.0, 2.0, 3.0]
+        assert list(mechs[OWNER_A]) == [1, 1, 2]
+        # the shorter series ends on the most recent sample
+        assert list(shk[OWNER_B]) == [0.0, 0.0, 7.0]
+        assert list(mechs[OWNER_B]) == [0, 0, 4]
+
+        # only imported the once
+        history = MechStatsHistory(history_file)
+        assert len(history) == 3
+
+
+def test_stats_history_load_window_and_since() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history_file = os.path.join(tmp_dir, "mech_history.json")
+        history = MechStatsHistory(history_file)
+        reader = MechStatsHistory(history_file, read_only=True)
+
+        for sample in range(5):
+            stats = {OWNER_A: _stats(float(sample), 1)}
+            if sample % 2 == 0:
+                stats[OWNER_B] = _stats(float(sample * 10), 2)
+            history.append(stats, timestamp=(sample + 1) * 10.0)
+
+        # the reader picks up samples written after it was opened
+        timestamps, series = reader.load("shk", [OWNER_A, OWNER_B, OWNER_C])
+        assert list(timestamps) == [10.0, 20.0, 30.0, 40.0, 50.0]
+        assert list(series[OWNER_B]) == [0.0, 0.0, 20.0, 0.0, 40.0]
+        assert list(series[OWNER_C]) == [0.0] * 5
+
+        timestamps, series = reader.load("shk", [OWNER_A, OWNER_B], window=2)
+        assert list(timestamps) == [40.0, 50.0]
+        assert list(series[OWNER_A]) == [3.0, 4.0]
+        assert list(series[OWNER_B]) == [0.0, 40.0]
+
+        timestamps, series = reader.load("shk", [OWNER_A, OWNER_B], since=25.0)
+        assert list(timestamps) == [30.0, 40.0, 50.0]
+        assert list(series[OWNER_A]) == [2.0, 3.0, 4.0]
+        assert list(series[OWNER_B]) == [20.0, 0.0, 40.0]
+
+        # a sample at exactly `since` is kept, and the tighter bound wins
+        timestamps, _ = reader.load("shk", [OWNER_A], since=20.0)
+        assert list(timestamps) == [20.0, 30.0, 40.0, 50.0]
+        timestamps, _ = reader.load("shk", [OWNER_A], window=4, since=35.0)
+        assert list(timestamps) == [40.0, 50.0]
+        timestamps, series = reader.load("shk", [OWNER_A], since=60.0)
+        assert len(timestamps) == 0
+        assert len(series[OWNER_A]) == 0
+
+
+if __name__ == "__main__":
+    test_stats_history_repair_drops_torn_sample()
+    test_stats_history_imports_json_aligned_to_latest()
+    test_stats_history_load_window_and_since()
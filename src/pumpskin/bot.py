@@ -24,6 +24,7 @@ from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
 from web3_utils.avax_web3_client import AvaxCWeb3Client
 from web3_utils.potn_web3_client import PotnWeb3Client
 from web3_utils.ppie_web3_client import PpieWeb3Client
+from web3_utils.rpc_counter import RpcCounter
 from pumpskin.config_manager_pumpskin import PumpskinConfigManager
 from pumpskin.game_stats import NULL_GAME_STATS, PumpskinLifetimeGameStatsLogger
 from pumpskin.lp_token_web3_client import PotnLpWeb3Client, PpieLpWeb3Client
@@ -39,6 +40,8 @@ from pumpskin.allocator import PotnAllocator, PpieAllocator
 from pumpskin.token_profit_lp import PumpskinTokenProfitManager
 from pumpskin.types import (
     Category,
+    LevelingStep,
+    PumpskinStateSnapshot,
     Rarity,
     StakedPumpskin,
     Tokens,
@@ -50,6 +53,9 @@ from pumpskin.utils import calc_ppie_earned_per_day, calc_potn_from_level
 class PumpskinBot:
 
     LOW_GAS_INTERVAL = 60.0 * 60.0 * 24
+    # send all the leveling txs of a tick back to back instead of waiting
+    # for each receipt, see _level_pumpskins_pipelined
+    PIPELINED_LEVELING = True
 
     def __init__(
         self,
@@ -135,6 +141,16 @@ class PumpskinBot:
             ),
         )
 
+        self.rpc_counter = RpcCounter()
+        for client in [
+            self.collection_w3,
+            self.game_w3,
+            self.nft_w3,
+            self.potn_w3,
+            self.ppie_w3,
+        ]:
+            self.rpc_counter.attach(client.w3)
+
         self.allocator: T.Dict[Tokens, TokenAllocator] = {
             Tokens.POTN: PotnAllocator(
                 self.potn_w3,
@@ -210,6 +226,7 @@ class PumpskinBot:
 
         if tx_receipt.get("status", 0) != 1:
             logger.print_fail(f"Failed to: {action_str}!")
+            self.stats_logger.lifetime_stats["avax_reverted_gas"] += gas
             return False
         else:
             logger.print_ok(f"Successfully: {action_str}")
@@ -465,9 +482,26 @@ class PumpskinBot:
         )
         return False
 
-    def _try_to_level_pumpskins(
+    def _plan_leveling(
         self, pumpskins: T.Dict[int, T.Dict[int, T.Any]]
-    ) -> None:
+    ) -> T.List[LevelingStep]:
+        """
+        Work out every level up we can afford this tick, in priority order,
+        before sending anything
+        """
+        plan: T.List[LevelingStep] = []
+
+        potn_available = self.allocator[Tokens.POTN].get_amount(
+            Category.LEVELLING
+        )
+
+        special_pumps = {
+            int(k): v
+            for k, v in self.config_mgr.config["game_specific_configs"][
+                "special_pumps"
+            ].items()
+        }
+
         self.are_all_pumpskins_level_as_desired = True
         for token_id, pumpskin in pumpskins.items():
             # check to see how much POTN needed to level up
@@ -479,12 +513,6 @@ class PumpskinBot:
                 level_potn - pumpskin.get("eaten_amount", 100000), 0
             )
 
-            special_pumps = {
-                int(k): v
-                for k, v in self.config_mgr.config["game_specific_configs"][
-                    "special_pumps"
-                ].items()
-            }
             is_special = token_id in special_pumps
 
             max_level = self.config_mgr.config["game_specific_configs"][
@@ -520,23 +548,162 @@ class PumpskinBot:
 
             self.are_all_pumpskins_level_as_desired = False
 
-            pton_available_to_level = self.allocator[Tokens.POTN].get_amount(
-                Category.LEVELLING
-            )
-
-            if pton_available_to_level < potn_to_level:
+            if potn_available < potn_to_level:
                 logger.print_warn(
-                    f"Not enough $POTN to level up {token_id} to {next_level}.\n\tHave: {pton_available_to_level:.2f} Need: {potn_to_level:.2f}. Skipping..."
+                    f"Not enough $POTN to level up {token_id} to {next_level}.\n\tHave: {potn_available:.2f} Need: {potn_to_level:.2f}. Skipping..."
                 )
                 continue
 
             if not self._is_cooled_down(token_id, pumpskin):
                 continue
 
-            if not self._drink_potion(token_id, potn_to_level):
-                continue
+            potn_available -= potn_to_level
+            plan.append(
+                LevelingStep(
+                    token_id=token_id,
+                    next_level=next_level,
+                    level_potn=level_potn,
+                    potn_to_level=potn_to_level,
+                    is_special=is_special,
+                )
+            )
 
-            self._level_pumpskins(token_id, next_level, is_special)
+        return plan
+
+    def _send_pipelined(
+        self,
+        action_str: str,
+        sends: T.List[T.Tuple[int, T.Callable[[int], str]]],
+        nonce: int,
+    ) -> T.Dict[int, str]:
+        """
+        Send txs back to back with consecutive nonces. Stops at the first
+        send that fails since every later nonce would be stuck behind it.
+        """
+        tx_hashes: T.Dict[int, str] = {}
+        for token_id, send in sends:
+            tx_hash = send(nonce)
+            if not tx_hash and not self.dry_run:
+                logger.print_warn(
+                    f"Failed to send {action_str} for {token_id}, "
+                    f"leaving the rest for the serial path"
+                )
+                break
+            tx_hashes[token_id] = tx_hash
+            nonce += 1
+        return tx_hashes
+
+    def _confirm_pipelined(
+        self, action_str: str, tx_hashes: T.Dict[int, str]
+    ) -> T.List[int]:
+        """Wait on a batch of sent txs, returns the tokens that succeeded"""
+        # the txs were all sent up front, so these receipts come back about
+        # one block apart at most rather than one block each
+        return [
+            token_id
+            for token_id, tx_hash in tx_hashes.items()
+            if self._process_w3_results(f"{action_str} {token_id}", tx_hash)
+        ]
+
+    def _did_drink(self, step: LevelingStep) -> bool:
+        """Check the chain in case the drink landed but we missed it"""
+        pumpskin = self.collection_w3.get_staked_pumpskin_info(step["token_id"])
+        return pumpskin.get("eaten_amount", 0) >= step["level_potn"]
+
+    def _did_level(self, step: LevelingStep) -> bool:
+        pumpskin = self.collection_w3.get_staked_pumpskin_info(step["token_id"])
+        return pumpskin.get("kg", 0) / 100 >= step["next_level"]
+
+    def _level_pumpskins_pipelined(self, plan: T.List[LevelingStep]) -> None:
+        """
+        Level up everything in `plan` in two rounds of confirmations instead
+        of two per pumpskin: all the potion drinks go out with consecutive
+        nonces and are confirmed together, then the same for the level ups.
+        The level ups have to wait since they revert (and can't have their
+        gas estimated) until the drink is mined. Anything that fails in a
+        batch is checked against the chain and retried on its own.
+        """
+        start = time.time()
+        steps = {step["token_id"]: step for step in plan}
+
+        to_drink = {
+            t: step
+            for t, step in steps.items()
+            if token_to_wei(step["potn_to_level"]) > 0
+        }
+        ready = [t for t in steps.keys() if t not in to_drink]
+
+        sends = [
+            (
+                t,
+                lambda nonce, t=t, step=step: self.game_w3.drink_potion(
+                    t, token_to_wei(step["potn_to_level"]), nonce=nonce
+                ),
+            )
+            for t, step in to_drink.items()
+        ]
+        tx_hashes = self._send_pipelined(
+            "drink", sends, self.game_w3.get_pending_nonce()
+        )
+        drank = self._confirm_pipelined("Pumpskin drink $POTN", tx_hashes)
+
+        for token_id, step in to_drink.items():
+            if token_id in drank or self._did_drink(step):
+                self.allocator[Tokens.POTN].maybe_subtract(
+                    step["potn_to_level"], Category.LEVELLING
+                )
+                ready.append(token_id)
+            elif self._drink_potion(token_id, step["potn_to_level"]):
+                ready.append(token_id)
+
+        sends = [
+            (
+                t,
+                lambda nonce, t=t: self.collection_w3.level_up_pumpkin(
+                    t, nonce=nonce
+                ),
+            )
+            for t in ready
+        ]
+        tx_hashes = self._send_pipelined(
+            "level up", sends, self.collection_w3.get_pending_nonce()
+        )
+        leveled = self._confirm_pipelined("Level up pumpskin", tx_hashes)
+
+        for token_id in ready:
+            step = steps[token_id]
+            if token_id in leveled or self._did_level(step):
+                self.current_stats["levels"] += 1
+                self._send_leveling_discord_activity_update(
+                    token_id, step["next_level"]
+                )
+            else:
+                self._level_pumpskins(
+                    token_id, step["next_level"], step["is_special"]
+                )
+
+        logger.print_ok_blue(
+            f"Pipelined leveling of {len(plan)} pumpskins took "
+            f"{get_pretty_seconds(int(time.time() - start))}"
+        )
+
+    def _try_to_level_pumpskins(
+        self, pumpskins: T.Dict[int, T.Dict[int, T.Any]]
+    ) -> None:
+        plan = self._plan_leveling(pumpskins)
+
+        if self.PIPELINED_LEVELING and len(plan) > 1:
+            self._level_pumpskins_pipelined(plan)
+        else:
+            for step in plan:
+                if not self._drink_potion(
+                    step["token_id"], step["potn_to_level"]
+                ):
+                    continue
+
+                self._level_pumpskins(
+                    step["token_id"], step["next_level"], step["is_special"]
+                )
 
         if self.are_all_pumpskins_level_as_desired:
             for allocator in self.allocator.values():
@@ -713,7 +880,28 @@ class PumpskinBot:
                 email_message,
             )
 
-    def _check_for_token_approvals(self) -> None:
+    def _get_state_snapshot(self) -> PumpskinStateSnapshot:
+        return self.collection_w3.get_state_snapshot(
+            self.address,
+            [self.potn_w3, self.ppie_w3],
+            self.game_w3.contract_checksum_address,
+        )
+
+    def _is_allowed(
+        self,
+        token_w3: AvalancheCWeb3Client,
+        snapshot: T.Optional[PumpskinStateSnapshot],
+    ) -> bool:
+        allowances = snapshot["allowances"] if snapshot else {}
+        if token_w3.contract_checksum_address in allowances:
+            return allowances[token_w3.contract_checksum_address] > 0
+        return token_w3.is_allowed(
+            approval_address=self.game_w3.contract_checksum_address
+        )
+
+    def _check_for_token_approvals(
+        self, snapshot: T.Optional[PumpskinStateSnapshot] = None
+    ) -> None:
         logger.print_bold(
             f"\n\nChecking PPIE and POTN approvals for {self.user}"
         )
@@ -721,9 +909,7 @@ class PumpskinBot:
         for _, v in self.profit_lp.items():
             self.txns.extend(v.check_and_approve_contracts())
 
-        if not self.potn_w3.is_allowed(
-            approval_address=self.game_w3.contract_checksum_address
-        ):
+        if not self._is_allowed(self.potn_w3, snapshot):
             action_str = f"Approving game contract to use POTN"
             self.txns.append(
                 self._process_w3_results(
@@ -736,9 +922,7 @@ class PumpskinBot:
         else:
             logger.print_ok_arrow(f"Game contract already approved to use POTN")
 
-        if not self.ppie_w3.is_allowed(
-            approval_address=self.game_w3.contract_checksum_address
-        ):
+        if not self._is_allowed(self.ppie_w3, snapshot):
             action_str = f"Approving game contract to use POTN"
             self.txns.append(
                 self._process_w3_results(
@@ -764,11 +948,21 @@ class PumpskinBot:
 
             self.txns.extend(v.check_swap_and_lp_and_stake())
 
-    def _print_balances(self) -> None:
-        balances = {
-            Tokens.POTN: self.potn_w3.get_balance(),
-            Tokens.PPIE: self.ppie_w3.get_balance(),
-        }
+    def _print_balances(
+        self, snapshot: T.Optional[PumpskinStateSnapshot] = None
+    ) -> None:
+        token_w3 = {Tokens.POTN: self.potn_w3, Tokens.PPIE: self.ppie_w3}
+        balances = {}
+        for token, client in token_w3.items():
+            if (
+                snapshot
+                and client.contract_checksum_address in snapshot["balances"]
+            ):
+                balances[token] = wei_to_token(
+                    snapshot["balances"][client.contract_checksum_address]
+                )
+            else:
+                balances[token] = client.get_balance()
 
         logger.print_bold(f"{self.user} Balances:")
 
@@ -780,16 +974,21 @@ class PumpskinBot:
                     f"{category} ({percent:.2f}%): {self.allocator[token].get_amount(category)}"
                 )
 
-    def _run_game_loop(self) -> None:
+    def _run_game_loop(
+        self, snapshot: T.Optional[PumpskinStateSnapshot] = None
+    ) -> None:
         logger.print_bold(f"\n\nAttempting leveling activities for {self.user}")
 
-        pumpskin_ids: T.List[int] = self.get_pumpskin_ids()
-        pumpskins = {}
-        for token_id in pumpskin_ids:
-            pumpskin: StakedPumpskin = (
-                self.collection_w3.get_staked_pumpskin_info(token_id)
+        if snapshot and snapshot["block_number"] > 0:
+            pumpskins = snapshot["pumpskins"]
+            logger.print_ok_blue(
+                f"Found {len(pumpskins)} Pumpskins for user {self.user}!"
+            )
+        else:
+            pumpskin_ids: T.List[int] = self.get_pumpskin_ids()
+            pumpskins = self.collection_w3.get_staked_pumpskins_info(
+                pumpskin_ids
             )
-            pumpskins[token_id] = pumpskin
 
         ordered_pumpskins = dict(
             sorted(
@@ -813,7 +1012,7 @@ class PumpskinBot:
 
         num_pumpskins = len(final_pumpskins.keys())
 
-        self._print_balances()
+        self._print_balances(snapshot)
 
         logger.print_ok_arrow(f"\U0001F383: {num_pumpskins}")
 
@@ -838,15 +1037,25 @@ class PumpskinBot:
         self.config_mgr.init()
 
     def run(self) -> None:
+        self.rpc_counter.reset()
+
         for allocator in self.allocator.values():
             allocator.maybe_update_full_balance()
 
-        self._check_for_token_approvals()
+        snapshot = self._get_state_snapshot()
+        snapshot_rpcs = self.rpc_counter.get_counts().get("eth_call", 0)
 
-        self._run_game_loop()
+        self._check_for_token_approvals(snapshot)
+
+        self._run_game_loop(snapshot)
 
         self.stats_logger.write()
 
+        logger.print_normal(
+            f"Tick used {self.rpc_counter.get_total()} rpcs "
+            f"({snapshot_rpcs} eth_calls up to the state snapshot)"
+        )
+
     def end(self) -> None:
         self.config_mgr.close()
         self.stats_logger.write()
@@ -0,0 +1,238 @@
+import json
+import os
+import threading
+import time
+import typing as T
+
+from config_admin import ADMIN_ADDRESS
+from pumpskin.pumpskin_web2_client import PumpskinWeb2Client
+from pumpskin.pumpskin_web3_client import (
+    PumpskinCollectionWeb3Client,
+    PumpskinNftWeb3Client,
+)
+from pumpskin.rarity import CollectionRarity
+from pumpskin.types import Pumpskin, Rarity, StakedPumpskin
+from pumpskin.utils import (
+    ATTRIBUTES_FILE,
+    COLLECTION_FILE,
+    MAX_PUMPSKINS,
+    MAX_TOTAL_SUPPLY,
+    calculate_rarity,
+    get_json_path,
+)
+from utils import logger
+from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
+
+
+class TokenInfo(T.TypedDict):
+    rarity: Rarity
+    image: str
+
+
+class PumpskinCollectionCache:
+    """
+    Process wide cache of everything the pumpskin commands need that doesn't
+    change between messages: the collection attribute stats, every token's
+    rarity and image, the mint totals and the web3 clients themselves. Token
+    metadata is fixed once minted so it is kept, rarities are rebuilt when
+    the stats are reloaded and the mint totals are re-read on a short ttl.
+
+    `run` keeps both fresh from a background thread, so with the cache warm
+    the only network call left in a reply is the staked pumpskin read.
+    """
+
+    STATS_TTL = 60.0 * 60.0
+    MINT_TTL = 60.0
+
+    def __init__(
+        self, stats_ttl: float = STATS_TTL, mint_ttl: float = MINT_TTL
+    ) -> None:
+        self.stats_ttl = stats_ttl
+        self.mint_ttl = mint_ttl
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+
+        self.stats: T.Dict[str, T.Dict[str, int]] = {}
+        self.stats_loaded_at = 0.0
+        self.tokens: T.Dict[int, TokenInfo] = {}
+        # metadata of tokens fetched one at a time, the crawl doesn't have
+        # them so their rarity is rebuilt from this on every warm
+        self.fetched: T.Dict[int, Pumpskin] = {}
+
+        self.minted = -1
+        self.minted_read_at = 0.0
+
+        self.w2: PumpskinWeb2Client = PumpskinWeb2Client()
+        self._collection_w3: T.Optional[PumpskinCollectionWeb3Client] = None
+        self._nft_w3: T.Optional[PumpskinNftWeb3Client] = None
+
+    def _get_collection_w3(self) -> PumpskinCollectionWeb3Client:
+        if self._collection_w3 is None:
+            self._collection_w3 = (
+                PumpskinCollectionWeb3Client()
+                .set_credentials(ADMIN_ADDRESS, "")
+                .set_node_uri(AvalancheCWeb3Client.NODE_URL)
+                .set_contract()
+                .set_dry_run(False)
+            )
+        return self._collection_w3
+
+    def _get_nft_w3(self) -> PumpskinNftWeb3Client:
+        if self._nft_w3 is None:
+            self._nft_w3 = (
+                PumpskinNftWeb3Client()
+                .set_credentials(ADMIN_ADDRESS, "")
+                .set_node_uri(AvalancheCWeb3Client.NODE_URL)
+                .set_contract()
+                .set_dry_run(False)
+            )
+        return self._nft_w3
+
+    def warm(self) -> None:
+        """
+        Load the attribute stats and, when the crawled collection is on disk,
+        the rarity and image of every token in one pass. Built on the side
+        and swapped in, so lookups keep being served meanwhile.
+        """
+        with open(get_json_path(ATTRIBUTES_FILE), "r") as infile:
+            stats = json.load(infile)
+
+        tokens: T.Dict[int, TokenInfo] = {}
+        collection_file = get_json_path(COLLECTION_FILE)
+        if os.path.isfile(collection_file):
+            with open(collection_file, "r") as infile:
+                collection_traits = json.load(infile)
+
+            rarity = CollectionRarity(
+                stats, collection_traits, range(MAX_TOTAL_SUPPLY)
+            )
+            for row, token_id in enumerate(rarity.token_ids.tolist()):
+                info = collection_traits.get(str(token_id), {})
+                image = PumpskinWeb2Client.get_image_from_info(info)
+                token_rarity = rarity.get_rarity(row)
+                if image and token_rarity:
+                    tokens[token_id] = TokenInfo(
+                        rarity=token_rarity, image=image
+                    )
+
+        with self.lock:
+            fetched = dict(self.fetched)
+        self._add_fetched(tokens, fetched, stats)
+
+        with self.lock:
+            # and any fetched while we were building
+            self._add_fetched(
+                tokens,
+                {k: v for k, v in self.fetched.items() if k not in fetched},
+                stats,
+            )
+            self.stats = stats
+            self.tokens = tokens
+            self.stats_loaded_at = time.time()
+
+        logger.print_ok_blue(f"Warmed pumpskin cache, {len(tokens)} tokens")
+
+    @staticmethod
+    def _add_fetched(
+        tokens: T.Dict[int, TokenInfo],
+        fetched: T.Dict[int, Pumpskin],
+        stats: T.Dict[str, T.Dict[str, int]],
+    ) -> None:
+        """Rarity of tokens the crawl didn't have against `stats`"""
+        for token_id, info in fetched.items():
+            if token_id in tokens:
+                continue
+            token_rarity = calculate_rarity(token_id, info, stats)
+            if token_rarity:
+                tokens[token_id] = TokenInfo(
+                    rarity=token_rarity,
+                    image=PumpskinWeb2Client.get_image_from_info(info),
+                )
+
+    def _is_stats_stale(self) -> bool:
+        return time.time() - self.stats_loaded_at > self.stats_ttl
+
+    def _is_mint_stale(self) -> bool:
+        return time.time() - self.minted_read_at > self.mint_ttl
+
+    def get_token_info(self, token_id: int) -> T.Optional[TokenInfo]:
+        # only the first lookup waits on a load, after that stale stats keep
+        # being served and the run() thread rebuilds them
+        if self.stats_loaded_at == 0.0:
+            self.warm()
+
+        with self.lock:
+            if token_id in self.tokens:
+                return self.tokens[token_id]
+            stats = self.stats
+
+        info = self.w2.get_pumpskin_info(token_id)
+        image = PumpskinWeb2Client.get_image_from_info(info)
+        token_rarity = calculate_rarity(token_id, info, stats)
+        if not image or not token_rarity:
+            # not revealed or the gateway failed, try again next time
+            return None
+
+        token = TokenInfo(rarity=token_rarity, image=image)
+        with self.lock:
+            self.fetched[token_id] = info
+            if self.stats is not stats:
+                # warm swapped in new stats while we were fetching
+                token["rarity"] = calculate_rarity(token_id, info, self.stats)
+            self.tokens[token_id] = token
+        return token
+
+    def get_mint_stats(self, force: bool = False) -> T.Tuple[int, int]:
+        with self.lock:
+            minted = self.minted
+            is_stale = self._is_mint_stale()
+        if not force and not is_stale and minted >= 0:
+            return (minted, MAX_PUMPSKINS)
+
+        # read without the lock so other lookups aren't held up on the rpc
+        minted = self._get_nft_w3().get_total_pumpskins_minted()
+        with self.lock:
+            if minted >= 0:
+                self.minted = minted
+                self.minted_read_at = time.time()
+            return (self.minted, MAX_PUMPSKINS)
+
+    def is_minted(self, token_id: int) -> bool:
+        with self.lock:
+            if token_id in self.tokens:
+                return True
+        minted, _ = self.get_mint_stats()
+        if token_id <= minted:
+            return True
+        # may have been minted since the last read
+        minted, _ = self.get_mint_stats(force=True)
+        return token_id <= minted
+
+    def get_staked_pumpskin_info(self, token_id: int) -> StakedPumpskin:
+        return self._get_collection_w3().get_staked_pumpskin_info(token_id)
+
+    def run(self, daemon: bool = True) -> None:
+        def loop() -> None:
+            while True:
+                try:
+                    if self._is_stats_stale():
+                        self.warm()
+                    if self._is_mint_stale():
+                        self.get_mint_stats(force=True)
+                except KeyboardInterrupt:
+                    raise
+                except:
+                    logger.print_fail("Failed to refresh pumpskin cache")
+                if self.stop_event.wait(min(self.mint_ttl, self.stats_ttl)):
+                    return
+
+        thread = threading.Thread(
+            name="pumpskin_collection_cache", target=loop, daemon=daemon
+        )
+        thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+PUMPSKIN_CACHE = PumpskinCollectionCache()
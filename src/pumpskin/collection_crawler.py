@@ -0,0 +1,182 @@
+import collections
+import copy
+import json
+import os
+import time
+import typing as T
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils import logger
+
+
+class CollectionCrawler:
+    """
+    Fetches the metadata of every token in a collection with a bounded
+    number of requests in flight. Results are appended in token order to a
+    json lines checkpoint as they complete, so a crash only loses what was
+    in flight and the next run picks up after the last token on disk. A
+    token that still fails after its retries ends the crawl there, so it's
+    the first one fetched on the next run rather than an empty entry.
+
+    Only the in flight window and the trait counts are held in memory, the
+    checkpoint is streamed when resuming and when writing the final
+    collection file.
+    """
+
+    CHECKPOINT_SUFFIX = ".partial.jsonl"
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 2.0
+
+    def __init__(
+        self,
+        fetch: T.Callable[[int], T.Dict[str, T.Any]],
+        total: int,
+        collection_file: str,
+        attributes_file: str,
+        attribute_types: T.Dict[str, T.Dict[str, int]],
+        max_workers: int = 8,
+        checkpoint_every: int = 100,
+    ) -> None:
+        self.fetch = fetch
+        self.total = total
+        self.collection_file = collection_file
+        self.attributes_file = attributes_file
+        self.checkpoint_file = collection_file + self.CHECKPOINT_SUFFIX
+        self.max_workers = max_workers
+        self.checkpoint_every = checkpoint_every
+
+        self.stats = copy.deepcopy(attribute_types)
+        self.next_token = 0
+
+    def _add_attributes(self, info: T.Dict[str, T.Any]) -> None:
+        for attribute in info.get("attributes", []):
+            if attribute["trait_type"] not in self.stats:
+                logger.print_fail(
+                    f"Unknown attribute: {attribute['trait_type']}"
+                )
+                continue
+            trait_type = attribute["trait_type"]
+            trait_value = attribute["value"]
+            self.stats[trait_type][trait_value] = (
+                self.stats[trait_type].get(trait_value, 0) + 1
+            )
+
+    def _resume(self) -> None:
+        """Rebuild the counts from the checkpoint, dropping it from a torn line"""
+        if not os.path.isfile(self.checkpoint_file):
+            return
+
+        good_bytes = 0
+        with open(self.checkpoint_file, "rb") as infile:
+            for line in infile:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    token_id, info = json.loads(line)
+                except ValueError:
+                    break
+                # an empty entry is a token that failed, fetch it again
+                if token_id != self.next_token or not info:
+                    break
+                self._add_attributes(info)
+                self.next_token += 1
+                good_bytes += len(line)
+
+        with open(self.checkpoint_file, "ab") as outfile:
+            outfile.truncate(good_bytes)
+
+        if self.next_token > 0:
+            logger.print_ok_blue(
+                f"Resuming crawl at token {self.next_token}/{self.total}"
+            )
+
+    def _fetch_with_retry(self, token_id: int) -> T.Dict[str, T.Any]:
+        info: T.Dict[str, T.Any] = {}
+        for attempt in range(self.MAX_RETRIES):
+            info = self.fetch(token_id)
+            if info:
+                return info
+            time.sleep(self.RETRY_BACKOFF * (attempt + 1))
+        logger.print_fail(f"Failed to get info for token {token_id}")
+        return info
+
+    def crawl(self) -> bool:
+        """Returns False if a token failed and the crawl needs to be re-run"""
+        self._resume()
+
+        start = time.time()
+        start_token = self.next_token
+        # enough queued work to keep every worker busy while we wait on the
+        # oldest request, which keeps the checkpoint in token order
+        window = self.max_workers * 2
+        pending: T.Deque[T.Tuple[int, Future]] = collections.deque()
+        next_submit = self.next_token
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool, open(
+            self.checkpoint_file, "a"
+        ) as outfile:
+            while pending or next_submit < self.total:
+                while next_submit < self.total and len(pending) < window:
+                    pending.append(
+                        (
+                            next_submit,
+                            pool.submit(self._fetch_with_retry, next_submit),
+                        )
+                    )
+                    next_submit += 1
+
+                token_id, future = pending.popleft()
+                info = future.result()
+                if not info:
+                    for _, queued in pending:
+                        queued.cancel()
+                    break
+                outfile.write(json.dumps([token_id, info]) + "\n")
+                self._add_attributes(info)
+                self.next_token = token_id + 1
+
+                if self.next_token % self.checkpoint_every == 0:
+                    outfile.flush()
+                    os.fsync(outfile.fileno())
+                    self._log_progress(start, start_token)
+
+        self._log_progress(start, start_token)
+        if self.next_token < self.total:
+            logger.print_fail(
+                f"Stopped crawl at token {self.next_token}, re-run to resume"
+            )
+            return False
+
+        self._write_outputs()
+        return True
+
+    def _log_progress(self, start: float, start_token: int) -> None:
+        elapsed = max(time.time() - start, 1e-3)
+        tokens_per_sec = (self.next_token - start_token) / elapsed
+        logger.print_normal(
+            f"Crawled {self.next_token}/{self.total} tokens "
+            f"({tokens_per_sec:.1f} tokens/sec)"
+        )
+
+    def _write_outputs(self) -> None:
+        with open(self.attributes_file, "w") as outfile:
+            json.dump(self.stats, outfile, indent=4, sort_keys=True)
+
+        # same layout as json.dump(..., indent=4, sort_keys=True) of the
+        # whole collection, but one token at a time
+        tmp_file = self.collection_file + ".tmp"
+        with open(self.checkpoint_file) as infile, open(
+            tmp_file, "w"
+        ) as outfile:
+            outfile.write("{")
+            for inx, line in enumerate(infile):
+                token_id, info = json.loads(line)
+                value = json.dumps(info, indent=4, sort_keys=True)
+                value = value.replace("\n", "\n    ")
+                outfile.write("," if inx > 0 else "")
+                outfile.write(f'\n    "{token_id}": {value}')
+            outfile.write("\n}")
+        os.replace(tmp_file, self.collection_file)
+
+        os.remove(self.checkpoint_file)
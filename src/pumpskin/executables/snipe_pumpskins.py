@@ -16,11 +16,14 @@ from utils import logger
 from utils.email import Email, get_email_accounts_from_password
 from utils.security import decrypt_secret
 from pumpskin.bot import PumpskinBot
+from pumpskin.mint_watcher import MintWatcher
 from pumpskin.pumpskin_web3_client import PumpskinNftWeb3Client
 from pumpskin.utils import ATTRIBUTES_FILE, calculate_rarity_for_collection
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
+from web3_utils.presigned_tx_queue import PresignedTransactionQueue
 
 MINT_MARGIN = 100
+MAX_PRESIGNED_MINTS = 5
 
 
 def parse_args() -> argparse.Namespace:
@@ -94,7 +97,18 @@ def snipe() -> None:
         .set_contract()
         .set_dry_run(False)
     )
-    minted = w3.get_total_pumpskins_minted()
+    watcher = MintWatcher(w3)
+    minted = watcher.minted
+
+    # keep the mint ready to go for the common quantities so buying is a
+    # single broadcast
+    mint_queue = PresignedTransactionQueue(
+        w3, lambda quantity: w3.get_mint_function(address, quantity)
+    )
+    if not args.dry_run:
+        for quantity in range(1, MAX_PRESIGNED_MINTS + 1):
+            mint_queue.prepare(quantity)
+        mint_queue.run()
 
     for pumpkin_id, rarities in sorted_rarity.items():
         if pumpkin_id < minted:
@@ -118,7 +132,6 @@ def snipe() -> None:
     )
 
     target_inx = 0
-    last_minted = 0
     mint_targets = sorted(sorted_rarity_unminted.keys(), key=lambda y: int(y))
     target_id = mint_targets[target_inx]
     last_alert = 0
@@ -126,15 +139,16 @@ def snipe() -> None:
     try:
         while True:
             try:
-                minted = w3.get_total_pumpskins_minted()
+                update = watcher.poll()
+                if update is None:
+                    wait(watcher.poll_interval)
+                    continue
+                minted = update.minted
 
-                if minted > target_id:
+                while minted > target_id and target_inx < len(mint_targets) - 1:
                     target_inx += 1
                     target_id = mint_targets[target_inx]
-
-                if last_minted == minted or minted == -1:
-                    wait(1.0)
-                    continue
+                decided_at = time.time()
 
                 logger.print_ok_arrow(f"Mint status: {minted} minted")
                 for i in range(min(len(mint_targets[target_inx:]), 10)):
@@ -151,7 +165,6 @@ def snipe() -> None:
                     printer(
                         f"Next target: {next_target_id} | rarity {rarity:.2f}% | rank: {rank} | mints till target: {next_target_id - minted}"
                     )
-                last_minted = minted
 
                 if (
                     minted + args.margin > target_id
@@ -177,17 +190,27 @@ def snipe() -> None:
                         f"Get ready to mint rare Pumpskin {target_id}, rarity {rarity:.2f}%"
                     )
                     last_alert = target_id
+
+                latency = watcher.record_decision(update, decided_at)
+                logger.print_normal(
+                    f"Mint in block {update.block_number} seen after {latency:.1f}s "
+                    f"(avg {watcher.get_avg_latency():.1f}s, max {watcher.max_latency:.1f}s)"
+                )
             except KeyboardInterrupt:
                 answer = input("Buy? Y/N")
                 if answer in ["Y", "y", "Yes", "YES"]:
                     buy_amount = input("Buy amount?")
                     try:
                         buy_num = int(buy_amount)
-                        logger.print_ok_blue(f"Minting {buy_num} pumps...")
-                        w3.mint(address, buy_num)
-                    except:
+                    except ValueError:
                         logger.print_warn(f"Invalid buy amount")
-                        pass
+                        continue
+                    logger.print_ok_blue(f"Minting {buy_num} pumps...")
+                    try:
+                        tx_hash = mint_queue.fire(buy_num)
+                        logger.print_ok_blue(f"Sent mint {tx_hash}")
+                    except Exception as e:
+                        logger.print_fail(f"Failed to mint {buy_num}: {e}")
                 else:
                     raise KeyboardInterrupt
 
@@ -207,6 +230,8 @@ def snipe() -> None:
                 to=TWILIO_CONFIG["admin_sms_number"],
             )
         logger.print_fail(traceback.format_exc())
+    finally:
+        mint_queue.stop()
 
 
 if __name__ == "__main__":
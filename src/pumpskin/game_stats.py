@@ -15,6 +15,7 @@ class LifetimeStats(T.TypedDict):
     levels: int
     commission_ppie: T.Dict[str, float]
     avax_gas: float
+    avax_reverted_gas: float
     avax_profits: float
     ppie_lp_tokens: float
     potn_lp_tokens: float
@@ -27,6 +28,7 @@ NULL_GAME_STATS = {
     "levels": 0,
     "commission_ppie": {},
     "avax_gas": 0.0,
+    "avax_reverted_gas": 0.0,
     "avax_profits": 0.0,
     "ppie_lp_tokens": 0.0,
     "potn_lp_tokens": 0.0,
@@ -64,7 +66,12 @@ class PumpskinLifetimeGameStatsLogger(LifetimeGameStatsLogger):
         self._migrate_new_stats()
 
     def _migrate_new_stats(self) -> None:
-        for k in ["ppie_lp_tokens", "ppie_lp_tokens", "avax_profits"]:
+        for k in [
+            "ppie_lp_tokens",
+            "ppie_lp_tokens",
+            "avax_profits",
+            "avax_reverted_gas",
+        ]:
             if k not in self.lifetime_stats:
                 self.lifetime_stats[k] = NULL_GAME_STATS[k]
 
@@ -107,6 +114,7 @@ class PumpskinLifetimeGameStatsLogger(LifetimeGameStatsLogger):
 
         for item in [
             "avax_gas",
+            "avax_reverted_gas",
             "ppie",
             "potn",
             "levels",
@@ -165,6 +173,7 @@ class PumpskinLifetimeGameStatsLogger(LifetimeGameStatsLogger):
 
         for item in [
             "avax_gas",
+            "avax_reverted_gas",
             "ppie",
             "potn",
             "levels",
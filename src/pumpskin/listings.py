@@ -1,4 +1,7 @@
 import json
+import threading
+import time
+import typing as T
 
 from config_admin import ADMIN_ADDRESS
 from joepegs.joepegs_api import JoePegsClient, JOEPEGS_URL
@@ -13,6 +16,60 @@ from utils import discord, logger
 from utils.price import wei_to_token
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
 
+STAKED_INFO_TTL = 60.0
+
+
+class StakedPumpskinCache:
+    """
+    Staked info of listed pumpskins for a short while. The same listings get
+    posted over and over and levels only move every few hours, so only
+    tokens we haven't seen lately are read, all in one multicall.
+    """
+
+    def __init__(self, ttl: float = STAKED_INFO_TTL) -> None:
+        self.ttl = ttl
+        self.entries: T.Dict[int, T.Tuple[float, StakedPumpskin]] = {}
+        self.lock = threading.Lock()
+        self.w3: T.Optional[PumpskinCollectionWeb3Client] = None
+
+    def _get_w3(self) -> PumpskinCollectionWeb3Client:
+        if self.w3 is None:
+            self.w3 = (
+                PumpskinCollectionWeb3Client()
+                .set_credentials(ADMIN_ADDRESS, "")
+                .set_node_uri(AvalancheCWeb3Client.NODE_URL)
+                .set_contract()
+                .set_dry_run(False)
+            )
+        return self.w3
+
+    def get_many(self, token_ids: T.List[int]) -> T.Dict[int, StakedPumpskin]:
+        now = time.time()
+        with self.lock:
+            missing = [
+                t
+                for t in token_ids
+                if t not in self.entries or now - self.entries[t][0] > self.ttl
+            ]
+
+        if missing:
+            fetched = self._get_w3().get_staked_pumpskins_info(missing)
+            with self.lock:
+                for token_id, pumpskin in fetched.items():
+                    if pumpskin:
+                        self.entries[token_id] = (now, pumpskin)
+
+        logger.print_normal(
+            f"Staked info: {len(token_ids) - len(missing)} cached, {len(missing)} read"
+        )
+        with self.lock:
+            return {
+                t: self.entries[t][1] for t in token_ids if t in self.entries
+            }
+
+
+STAKED_PUMPSKIN_CACHE = StakedPumpskinCache()
+
 
 def post_rarist_listings(
     max_rarity: float, max_price: float, quiet: bool = True
@@ -27,12 +84,9 @@ def post_rarist_listings(
     with open(rarity_file, "r") as infile:
         collection_rarity = json.load(infile)
 
-    w3: PumpskinCollectionWeb3Client = (
-        PumpskinCollectionWeb3Client()
-        .set_credentials(ADMIN_ADDRESS, "")
-        .set_node_uri(AvalancheCWeb3Client.NODE_URL)
-        .set_contract()
-        .set_dry_run(False)
+    start = time.time()
+    staked_pumpskins = STAKED_PUMPSKIN_CACHE.get_many(
+        [int(pump["tokenId"]) for pump in listings]
     )
 
     list_pricing = []
@@ -41,10 +95,16 @@ def post_rarist_listings(
         list_price_wei = int(pump["currentAsk"]["price"])
         price = float(wei_to_token(list_price_wei))
         rarity = collection_rarity[str(token_id)]["Overall"]["rarity"] * 100.0
-        pumpskin: StakedPumpskin = w3.get_staked_pumpskin_info(token_id)
+        pumpskin: StakedPumpskin = staked_pumpskins.get(token_id, {})
         level = pumpskin.get("kg", 10000) / 100
         list_pricing.append((price, rarity, token_id, level))
 
+    elapsed = max(time.time() - start, 1e-3)
+    logger.print_normal(
+        f"Processed {len(list_pricing)} listings in {elapsed:.2f}s "
+        f"({len(list_pricing) / elapsed:.1f} listings/sec)"
+    )
+
     sorted_listings = sorted(list_pricing, key=lambda p: (-p[3], p[1], p[0]))
 
     discord.get_discord_hook("PUMPSKIN_MARKET").send("**LISTINGS:**")
@@ -53,9 +113,8 @@ def post_rarist_listings(
     for listing in sorted_listings:
         if listing[0] > max_price:
             continue
-        url = (
-            JOEPEGS_URL.format(PumpskinNftWeb3Client.contract_address)
-            + listing[2]
+        url = JOEPEGS_URL.format(PumpskinNftWeb3Client.contract_address) + str(
+            listing[2]
         )
         text += f"**{listing[2]}** [ML {listing[3]}]: {listing[1]:.2f}% - {listing[0]:.2f} $AVAX | {url}\n"
         if len(text) > 1500:
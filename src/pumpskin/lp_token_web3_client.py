@@ -3,12 +3,56 @@ from __future__ import annotations
 import os
 import typing as T
 from eth_typing import Address
+from web3 import Web3
 
+from utils import logger
+from utils.price import TokenWei
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
 from web3_utils.web3_client import Web3Client
 
+this_dir = os.path.dirname(os.path.realpath(__file__))
+web3_utils_dir = os.path.join(os.path.dirname(this_dir), "web3_utils")
+# standard erc20 token abi so reusing tus, plus the pair reserve getters
+LP_ABI = Web3Client._get_contract_abi_from_file(
+    os.path.join(web3_utils_dir, "abi", "abi-tus.json")
+) + Web3Client._get_contract_abi_from_file(
+    os.path.join(web3_utils_dir, "abi", "abi-joe-pair.json")
+)
 
-class PotnLpWeb3Client(AvalancheCWeb3Client):
+
+class JoePairWeb3Client(AvalancheCWeb3Client):
+    """
+    Interact with a traderjoe LP token, which is also the pair contract
+    holding the reserves
+    """
+
+    abi = LP_ABI
+    token0: T.Optional[Address] = None
+
+    def get_reserves(
+        self, token_address: Address
+    ) -> T.Tuple[TokenWei, TokenWei]:
+        """
+        Reserves as (token, other) for `token_address` on one side of the
+        pair, (0, 0) if they can't be read
+        """
+        try:
+            if self.token0 is None:
+                # fixed when the pair is created
+                self.token0 = Web3.toChecksumAddress(
+                    self.contract.functions.token0().call()
+                )
+            reserve0, reserve1, _ = self.contract.functions.getReserves().call()
+        except Exception as e:
+            logger.print_fail(f"{e}")
+            return (0, 0)
+
+        if self.token0 == Web3.toChecksumAddress(token_address):
+            return (reserve0, reserve1)
+        return (reserve1, reserve0)
+
+
+class PotnLpWeb3Client(JoePairWeb3Client):
     """
     Interact with the POTN/LP token
     """
@@ -16,15 +60,9 @@ class PotnLpWeb3Client(AvalancheCWeb3Client):
     contract_address = T.cast(
         Address, "0xf45719FA196B37027d31A5509F84F7BD7096ea72"
     )
-    this_dir = os.path.dirname(os.path.realpath(__file__))
-    src_dir = os.path.dirname(this_dir)
-    web3_utils_dir = os.path.join(src_dir, "web3_utils")
-    # standard erc20 token abi so reusing tus
-    abi_dir = os.path.join(web3_utils_dir, "abi", "abi-tus.json")
-    abi = Web3Client._get_contract_abi_from_file(abi_dir)
 
 
-class PpieLpWeb3Client(AvalancheCWeb3Client):
+class PpieLpWeb3Client(JoePairWeb3Client):
     """
     Interact with the PPIE/LP token
     """
@@ -32,9 +70,3 @@ class PpieLpWeb3Client(AvalancheCWeb3Client):
     contract_address = T.cast(
         Address, "0x06Ca569b7C3053Fa885B37006bFA0eE24a38aECA"
     )
-    this_dir = os.path.dirname(os.path.realpath(__file__))
-    src_dir = os.path.dirname(this_dir)
-    web3_utils_dir = os.path.join(src_dir, "web3_utils")
-    # standard erc20 token abi so reusing tus
-    abi_dir = os.path.join(web3_utils_dir, "abi", "abi-tus.json")
-    abi = Web3Client._get_contract_abi_from_file(abi_dir)
@@ -0,0 +1,134 @@
+import time
+import typing as T
+
+from pumpskin.pumpskin_web3_client import PumpskinNftWeb3Client
+from utils import logger
+
+
+class MintUpdate:
+    def __init__(
+        self, minted: int, block_number: int, detected_at: float
+    ) -> None:
+        self.minted = minted
+        self.block_number = block_number
+        self.detected_at = detected_at
+
+
+class MintWatcher:
+    """
+    Follows the mint count from the `TokensClaimed` logs of the pumpskin
+    contract instead of reading `totalSupply` on a timer. Polling the log
+    filter is one cheap call that only returns something when a claim lands
+    in a new block, and the claim itself says how far the mint got.
+
+    If the node won't keep a filter for us we fall back to watching the block
+    number and only read `totalSupply` when a new block shows up.
+
+    Detection latency is measured from the timestamp of the block with the
+    claim to when the caller made its decision. Block timestamps are whole
+    seconds so the numbers are only good to about a second.
+    """
+
+    POLL_INTERVAL = 0.2
+
+    def __init__(
+        self, w3: PumpskinNftWeb3Client, poll_interval: float = POLL_INTERVAL
+    ) -> None:
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.minted = w3.get_total_pumpskins_minted()
+        self.last_block = w3.w3.eth.block_number
+
+        self.num_decisions = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+        self.claim_filter = None
+        self._make_filter()
+
+    def _make_filter(self) -> None:
+        try:
+            self.claim_filter = (
+                self.w3.contract.events.TokensClaimed.createFilter(
+                    fromBlock="latest"
+                )
+            )
+        except:
+            logger.print_warn("No log filter support, watching block heads")
+            self.claim_filter = None
+
+    def _poll_claims(self) -> T.Optional[MintUpdate]:
+        try:
+            events = self.claim_filter.get_new_entries()
+        except:
+            # filters expire on some nodes if not polled, start over and
+            # catch up with a single read
+            logger.print_warn("Lost mint log filter, re-creating")
+            self._make_filter()
+            return self._poll_blocks(force=True)
+        detected_at = time.time()
+
+        minted = self.minted
+        block_number = self.last_block
+        for event in events:
+            claimed = event.args.startTokenId + event.args.quantityClaimed
+            if claimed > minted:
+                minted = claimed
+                block_number = event.blockNumber
+
+        if minted <= self.minted:
+            return None
+        self.minted = minted
+        self.last_block = block_number
+        return MintUpdate(minted, block_number, detected_at)
+
+    def _poll_blocks(self, force: bool = False) -> T.Optional[MintUpdate]:
+        block_number = self.w3.w3.eth.block_number
+        if block_number == self.last_block and not force:
+            return None
+        self.last_block = block_number
+
+        minted = self.w3.get_total_pumpskins_minted()
+        detected_at = time.time()
+        if minted <= self.minted:
+            return None
+        self.minted = minted
+        return MintUpdate(minted, block_number, detected_at)
+
+    def poll(self) -> T.Optional[MintUpdate]:
+        """New mint count if it went up since the last poll"""
+        if self.claim_filter is None:
+            return self._poll_blocks()
+        return self._poll_claims()
+
+    def wait_for_update(self) -> MintUpdate:
+        while True:
+            update = self.poll()
+            if update is not None:
+                return update
+            time.sleep(self.poll_interval)
+
+    def record_decision(
+        self, update: MintUpdate, decided_at: T.Optional[float] = None
+    ) -> float:
+        """
+        Latency from the block with the mint to `decided_at`. Call it once the
+        decision is made, the block lookup stays off the critical path.
+        """
+        decided_at = time.time() if decided_at is None else decided_at
+        try:
+            block = self.w3.w3.eth.get_block(update.block_number)
+            latency = decided_at - block.timestamp
+        except:
+            logger.print_warn(f"Failed to get block {update.block_number}")
+            return -1.0
+
+        self.num_decisions += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        return latency
+
+    def get_avg_latency(self) -> float:
+        if self.num_decisions == 0:
+            return 0.0
+        return self.total_latency / self.num_decisions
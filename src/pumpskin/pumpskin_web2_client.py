@@ -8,6 +8,7 @@ from eth_typing import Address
 from web3 import Web3
 
 from utils import logger
+from utils.rate_limiter import RATE_LIMITER
 from pumpskin.types import Pumpskin
 
 TIMESTAMP_FORMAT = "%Y-%m-%d"
@@ -17,6 +18,9 @@ class PumpskinWeb2Client:
     """Access api endpoints of Pumpskin Game"""
 
     BASE_URL = "https://gateway.ipfscdn.io/ipfs"
+    # shared by every thread crawling the gateway, see HostRateLimiter
+    RATE_LIMIT_DELAY = 0.25
+    RATE_LIMIT_BURST = 8
 
     def __init__(self) -> None:
         self.session_token = None
@@ -29,14 +33,34 @@ class PumpskinWeb2Client:
         headers: T.Dict[str, T.Any] = {},
         params: T.Dict[str, T.Any] = {},
     ) -> T.Any:
+        wait_time = RATE_LIMITER.acquire(
+            url, self.RATE_LIMIT_DELAY, burst=self.RATE_LIMIT_BURST
+        )
+        if wait_time > 0.0:
+            time.sleep(wait_time)
+
+        start = time.monotonic()
         try:
-            return requests.request(
+            response = requests.request(
                 "GET", url, params=params, headers=headers, timeout=5.0
-            ).json()
+            )
         except KeyboardInterrupt:
             raise
         except:
             return {}
+        finally:
+            RATE_LIMITER.get_stats(url).update(
+                wait_time, time.monotonic() - start
+            )
+
+        if response.status_code == 429:
+            RATE_LIMITER.throttle(url, response.headers.get("Retry-After"))
+            return {}
+
+        try:
+            return response.json()
+        except:
+            return {}
 
     def _post_request(
         self,
@@ -85,6 +109,15 @@ class PumpskinWeb2Client:
             )
             return {}
 
+    @classmethod
+    def get_image_from_info(cls, pumpskin_info: Pumpskin) -> str:
+        """Gateway url of the image in already fetched token metadata"""
+        try:
+            image_path = pumpskin_info["image"].split("://")[1]
+        except:
+            return ""
+        return cls.BASE_URL + "/" + image_path
+
     def get_pumpskin_image(
         self, token_id: int, params: T.Dict[str, T.Any] = {}
     ) -> Pumpskin:
@@ -5,13 +5,15 @@ import typing as T
 from eth_typing import Address
 from eth_typing.encoding import HexStr
 from web3 import Web3
+from web3.contract import ContractFunction
 from web3.types import TxParams, Wei
 
 from utils import logger
 from utils.price import wei_to_token, TokenWei
 from web3_utils.web3_client import Web3Client
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
-from pumpskin.types import StakedPumpskin
+from web3_utils.multicall import MULTICALL_AVAX_ADDRESS, Multicall
+from pumpskin.types import PumpskinStateSnapshot, StakedPumpskin
 
 
 class PumpskinCollectionWeb3Client(AvalancheCWeb3Client):
@@ -32,14 +34,18 @@ class PumpskinCollectionWeb3Client(AvalancheCWeb3Client):
     )
     abi = Web3Client._get_contract_abi_from_file(abi_dir)
     NODE_URL = "https://rpc.ankr.com/avalanche"
+    # max calls aggregated into a single eth_call
+    MULTICALL_BATCH_SIZE = 100
 
-    def level_up_pumpkin(self, token_id: int) -> HexStr:
+    def level_up_pumpkin(
+        self, token_id: int, nonce: T.Optional[int] = None
+    ) -> HexStr:
         """
         Level up a pumpskin
         """
         try:
             tx: TxParams = self.build_contract_transaction(
-                self.contract.functions.levelUpPumpkin(token_id)
+                self.contract.functions.levelUpPumpkin(token_id), nonce=nonce
             )
             return self.sign_and_send_transaction(tx)
         except Exception as e:
@@ -90,18 +96,99 @@ class PumpskinCollectionWeb3Client(AvalancheCWeb3Client):
             pumpskin_info = self.contract.functions.stakedPumpskins(
                 token_id
             ).call()
-            pumpskin: StakedPumpskin = StakedPumpskin(
-                kg=pumpskin_info[0],
-                since_ts=pumpskin_info[1],
-                last_skipped_ts=pumpskin_info[2],
-                eaten_amount=pumpskin_info[3],
-                cooldown_ts=pumpskin_info[4],
-            )
-            return pumpskin
+            return self._to_staked_pumpskin(pumpskin_info)
         except Exception as e:
             logger.print_fail(f"{e}")
             return {}
 
+    @staticmethod
+    def _to_staked_pumpskin(pumpskin_info: T.List[int]) -> StakedPumpskin:
+        return StakedPumpskin(
+            kg=pumpskin_info[0],
+            since_ts=pumpskin_info[1],
+            last_skipped_ts=pumpskin_info[2],
+            eaten_amount=pumpskin_info[3],
+            cooldown_ts=pumpskin_info[4],
+        )
+
+    def _get_multicall(self) -> Multicall:
+        return Multicall(self.w3.eth, MULTICALL_AVAX_ADDRESS)
+
+    def get_staked_pumpskins_info(
+        self, token_ids: T.List[int]
+    ) -> T.Dict[int, StakedPumpskin]:
+        """
+        Staked info for all `token_ids` with one eth_call per
+        MULTICALL_BATCH_SIZE tokens instead of one per token
+        """
+        multicall = self._get_multicall()
+        pumpskins: T.Dict[int, StakedPumpskin] = {}
+        for i in range(0, len(token_ids), self.MULTICALL_BATCH_SIZE):
+            batch = token_ids[i : i + self.MULTICALL_BATCH_SIZE]
+            try:
+                aggregate = multicall.aggregate(
+                    [self.contract.functions.stakedPumpskins(t) for t in batch]
+                )
+                for token_id, result in zip(batch, aggregate.results):
+                    pumpskins[token_id] = self._to_staked_pumpskin(
+                        result.results
+                    )
+            except Exception as e:
+                logger.print_fail(f"Multicall failed, falling back: {e}")
+                for token_id in batch:
+                    pumpskins[token_id] = self.get_staked_pumpskin_info(
+                        token_id
+                    )
+        return pumpskins
+
+    def get_state_snapshot(
+        self,
+        user_address: Address,
+        tokens: T.List[AvalancheCWeb3Client],
+        approval_address: Address,
+    ) -> PumpskinStateSnapshot:
+        """
+        Everything a game loop tick reads up front in two eth_calls: the
+        staked token ids plus token balances and allowances in the first,
+        and the staked info of every token in the second
+        """
+        address = Web3.toChecksumAddress(user_address)
+        approval_address = Web3.toChecksumAddress(approval_address)
+
+        calls = [self.contract.functions.getStakedTokens(address)]
+        for token in tokens:
+            calls.append(token.contract.functions.balanceOf(address))
+            calls.append(
+                token.contract.functions.allowance(address, approval_address)
+            )
+
+        snapshot: PumpskinStateSnapshot = PumpskinStateSnapshot(
+            block_number=0,
+            token_ids=[],
+            pumpskins={},
+            balances={},
+            allowances={},
+        )
+
+        try:
+            aggregate = self._get_multicall().aggregate(calls)
+        except Exception as e:
+            logger.print_fail(f"Failed to get pumpskin state snapshot: {e}")
+            return snapshot
+
+        results = [r.results[0] for r in aggregate.results]
+        snapshot["block_number"] = aggregate.block_number
+        snapshot["token_ids"] = list(results[0])
+        for inx, token in enumerate(tokens):
+            key = token.contract_checksum_address
+            snapshot["balances"][key] = results[1 + inx * 2]
+            snapshot["allowances"][key] = results[2 + inx * 2]
+
+        snapshot["pumpskins"] = self.get_staked_pumpskins_info(
+            snapshot["token_ids"]
+        )
+        return snapshot
+
     def get_staked_pumpskins(self, user_address: Address) -> T.List[int]:
         """
         Get the token ID at given index for the user. We use this as a hack way to get all the
@@ -134,13 +221,16 @@ class PumpskinContractWeb3Client(AvalancheCWeb3Client):
     abi = Web3Client._get_contract_abi_from_file(abi_dir)
     NODE_URL = "https://rpc.ankr.com/avalanche"
 
-    def drink_potion(self, token_id: int, num_potn_wei: Wei) -> HexStr:
+    def drink_potion(
+        self, token_id: int, num_potn_wei: Wei, nonce: T.Optional[int] = None
+    ) -> HexStr:
         """
         Drink potion for a pumpskin
         """
         try:
             tx: TxParams = self.build_contract_transaction(
-                self.contract.functions.potionPumpkin(token_id, num_potn_wei)
+                self.contract.functions.potionPumpkin(token_id, num_potn_wei),
+                nonce=nonce,
             )
             return self.sign_and_send_transaction(tx)
         except Exception as e:
@@ -257,16 +347,21 @@ class PumpskinNftWeb3Client(AvalancheCWeb3Client):
             logger.print_fail(f"{e}")
             return -1
 
+    def get_mint_function(
+        self, user_address: Address, quantity: int
+    ) -> ContractFunction:
+        address = Web3.toChecksumAddress(user_address)
+        return self.contract.functions.claim(
+            address, quantity, self.PT_TOKEN_ADDRESS, 1, [], 0
+        )
+
     def mint(self, user_address: Address, quantity: int) -> HexStr:
         """
         Mint pumpskin[s]
         """
         try:
-            address = Web3.toChecksumAddress(user_address)
             tx: TxParams = self.build_contract_transaction(
-                self.contract.functions.claim(
-                    address, quantity, self.PT_TOKEN_ADDRESS, 1, [], 0
-                )
+                self.get_mint_function(user_address, quantity)
             )
             return self.sign_and_send_transaction(tx)
         except Exception as e:
@@ -0,0 +1,131 @@
+import typing as T
+
+import numpy as np
+
+from pumpskin.types import Rarity
+
+# sort key used for tokens with no attributes, keeps them at the end
+MISSING_RARITY = 1000.0
+
+
+class CollectionRarity:
+    """
+    Columnar version of `pumpskin.utils.calculate_rarity` for the whole
+    collection at once. Every token's traits are encoded as integer category
+    codes, one column per trait, so rarity becomes a couple of array lookups
+    instead of re-summing every trait's value counts for every token.
+
+    Scores are computed with the same integer sums and float divisions as the
+    per token version so they match it exactly.
+    """
+
+    def __init__(
+        self,
+        pumpskin_stats: T.Dict[str, T.Dict[str, int]],
+        collection_traits: T.Dict[str, T.Dict[str, T.Any]],
+        token_ids: T.Iterable[int],
+    ) -> None:
+        self.traits = list(pumpskin_stats.keys())
+        self.token_ids = np.fromiter(token_ids, dtype=np.int64)
+
+        # code 0 is "no matching value" with a count of 0, real values start
+        # at 1 in the attributes file order
+        self.values: T.List[T.List[T.Any]] = []
+        self.codes_for_trait: T.List[T.Dict[str, int]] = []
+        self.counts: T.List[np.ndarray] = []
+        for values in pumpskin_stats.values():
+            self.values.append([None] + list(values.keys()))
+            self.codes_for_trait.append(
+                {v: inx + 1 for inx, v in enumerate(values.keys())}
+            )
+            self.counts.append(
+                np.array([0] + list(values.values()), dtype=np.int64)
+            )
+        self.totals = np.array([c.sum() for c in self.counts], dtype=np.int64)
+
+        # trait values that aren't in the attributes file, only needed to
+        # report them back in the per token dicts
+        self.raw_values: T.Dict[T.Tuple[int, str], T.Any] = {}
+        self.codes, self.has_attributes = self._encode(collection_traits)
+
+        self.trait_counts = np.zeros(self.codes.shape, dtype=np.int64)
+        for inx, counts in enumerate(self.counts):
+            self.trait_counts[:, inx] = counts[self.codes[:, inx]]
+
+        self.trait_rarity = self.trait_counts.astype(np.float64) / self.totals
+        # the per token version divides by the total of the last trait it
+        # looped over, keep that so scores don't move
+        overall_denominator = int(self.totals[-1]) * len(self.traits)
+        self.overall = (
+            self.trait_counts.sum(axis=1).astype(np.float64)
+            / overall_denominator
+        )
+        self.sort_key = np.where(
+            self.has_attributes, self.overall, MISSING_RARITY
+        )
+
+    def _encode(
+        self, collection_traits: T.Dict[str, T.Dict[str, T.Any]]
+    ) -> T.Tuple[np.ndarray, np.ndarray]:
+        codes = np.zeros(
+            (len(self.token_ids), len(self.traits)), dtype=np.int32
+        )
+        has_attributes = np.zeros(len(self.token_ids), dtype=bool)
+        trait_column = {trait: inx for inx, trait in enumerate(self.traits)}
+
+        for row, token_id in enumerate(self.token_ids):
+            info = collection_traits.get(str(token_id), {})
+            if "attributes" not in info:
+                continue
+            has_attributes[row] = True
+            for attribute in info["attributes"]:
+                column = trait_column.get(attribute["trait_type"])
+                if column is None:
+                    continue
+                value = attribute["value"]
+                code = self.codes_for_trait[column].get(value, 0)
+                codes[row, column] = code
+                if code == 0:
+                    self.raw_values[(row, attribute["trait_type"])] = value
+                else:
+                    self.raw_values.pop((row, attribute["trait_type"]), None)
+        return codes, has_attributes
+
+    def get_rank_order(self) -> np.ndarray:
+        """Token ids from rarest to most common"""
+        # stable so ties keep token order like the sorted() over the dict did
+        order = np.argsort(self.sort_key, kind="stable")
+        return self.token_ids[order].astype(np.int32)
+
+    def save_ranks(self, ranks_file: str) -> None:
+        np.save(ranks_file, self.get_rank_order())
+
+    @staticmethod
+    def load_ranks(ranks_file: str) -> np.ndarray:
+        return np.load(ranks_file)
+
+    def get_rarity(self, row: int) -> Rarity:
+        if not self.has_attributes[row]:
+            return {}
+
+        rarity = {}
+        for column, trait in enumerate(self.traits):
+            code = int(self.codes[row, column])
+            if code > 0:
+                value = self.values[column][code]
+            else:
+                value = self.raw_values.get((row, trait), 0.0)
+            rarity[trait] = {
+                "trait": value,
+                "rarity": float(self.trait_rarity[row, column]),
+            }
+        rarity["Overall"] = {
+            "trait": None,
+            "rarity": float(self.overall[row]),
+        }
+        return rarity
+
+    def to_sorted_dict(self) -> T.Dict[int, Rarity]:
+        """Same shape as `calculate_rarity_for_collection` always returned"""
+        order = np.argsort(self.sort_key, kind="stable")
+        return {int(self.token_ids[row]): self.get_rarity(row) for row in order}
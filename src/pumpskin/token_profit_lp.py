@@ -64,6 +64,7 @@ class PumpskinTokenProfitManager:
         }
         self.min_token_amount_to_swap = min_token_amount_to_swap
         self.max_avax_multiplier = 1.0
+        self.num_reverts_avoided = 0
 
     @classmethod
     def create_token_profit_lp_class(
@@ -190,9 +191,13 @@ class PumpskinTokenProfitManager:
             f"From {self.allocator[self.token].get_total():.2f} {self.token} available, testing {avax_token:.4f} {self.token} in..."
         )
 
-        avax_out_wei = self.tj_w3.get_amounts_out(
-            token_to_wei(avax_token), path
-        )[-1]
+        # quote locally off the pair reserves rather than asking the router
+        reserve_token, reserve_avax = self.lp_w3.get_reserves(
+            self.token_w3.contract_checksum_address
+        )
+        avax_out_wei = TraderJoeWeb3Client.get_amount_out_from_reserves(
+            token_to_wei(avax_token), reserve_token, reserve_avax
+        )
         amount_out_min_wei = int(avax_out_wei / 100 * 99.5)
 
         profit_avax = (
@@ -239,6 +244,11 @@ class PumpskinTokenProfitManager:
             logger.print_normal(
                 f"Attempting to swap AVAX with {self.SLIPPAGE_INCREMENT_PERCENT * i:.2f}% slippage..."
             )
+            if not self.tj_w3.can_swap_exact_tokens_for_avax(
+                token_to_wei(avax_token), amount_out_min_wei, path
+            ):
+                self._log_revert_avoided(action_str)
+                continue
             if self._process_w3_results(
                 action_str,
                 self.tj_w3.swap_exact_tokens_for_avax(
@@ -332,6 +342,7 @@ class PumpskinTokenProfitManager:
 
         if tx_receipt.get("status", 0) != 1:
             logger.print_fail(f"Failed to: {action_str}!")
+            self.stats_logger.lifetime_stats["avax_reverted_gas"] += gas
             return False
         else:
             logger.print_ok(f"Successfully: {action_str}")
@@ -341,6 +352,38 @@ class PumpskinTokenProfitManager:
             )
             return True
 
+    def _log_revert_avoided(self, action_str: str) -> None:
+        self.num_reverts_avoided += 1
+        logger.print_warn(
+            f"Not sending, would revert: {action_str} "
+            f"({self.num_reverts_avoided} reverts avoided, "
+            f"{self.stats_logger.lifetime_stats['avax_reverted_gas']:.4f} AVAX lost to reverts)"
+        )
+
+    def _get_balanced_lp_amounts(
+        self, amount_token_wei: int, amount_avax_wei: int
+    ) -> T.Tuple[int, int]:
+        """
+        The router only takes the amounts that match the pool ratio, so aim
+        the minimums at those rather than at what we offer it
+        """
+        reserve_token, reserve_avax = self.lp_w3.get_reserves(
+            self.token_w3.contract_checksum_address
+        )
+        token_for_avax = TraderJoeWeb3Client.quote_from_reserves(
+            amount_avax_wei, reserve_avax, reserve_token
+        )
+        if 0 < token_for_avax <= amount_token_wei:
+            return (token_for_avax, amount_avax_wei)
+
+        avax_for_token = TraderJoeWeb3Client.quote_from_reserves(
+            amount_token_wei, reserve_token, reserve_avax
+        )
+        if 0 < avax_for_token <= amount_avax_wei:
+            return (amount_token_wei, avax_for_token)
+
+        return (amount_token_wei, amount_avax_wei)
+
     def _buy_and_stake_token_lp(
         self, amount_avax: float, amount_token: float
     ) -> float:
@@ -351,17 +394,28 @@ class PumpskinTokenProfitManager:
         max_slippage_percent = 95.0
         action_str = f"Buying {self.token}/AVAX LP Token"
 
+        balanced_token_wei, balanced_avax_wei = self._get_balanced_lp_amounts(
+            token_to_wei(amount_token), token_to_wei(amount_avax)
+        )
+
         for i in range(
             int(self.MAX_SLIPPAGE_PERCENT / self.SLIPPAGE_INCREMENT_PERCENT)
         ):
             slippage = 100.0 - self.SLIPPAGE_INCREMENT_PERCENT * i
-            amount_token_min = int(
-                token_to_wei(amount_token) / 100.0 * slippage
-            )
-            amount_avax_min = int(token_to_wei(amount_avax) / 100.0 * slippage)
+            amount_token_min = int(balanced_token_wei / 100.0 * slippage)
+            amount_avax_min = int(balanced_avax_wei / 100.0 * slippage)
             logger.print_normal(
                 f"Attempting to buy LP with {slippage:.2f}% slippage..."
             )
+            if not self.tj_w3.can_buy_lp_token(
+                self.token_w3.contract_checksum_address,
+                token_to_wei(amount_token),
+                token_to_wei(amount_avax),
+                amount_token_min,
+                amount_avax_min,
+            ):
+                self._log_revert_avoided(action_str)
+                continue
             if not self._process_w3_results(
                 action_str,
                 self.tj_w3.buy_lp_token(
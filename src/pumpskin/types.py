@@ -43,6 +43,24 @@ class StakedPumpskin(T.TypedDict):
     cooldown_ts: int
 
 
+class LevelingStep(T.TypedDict):
+    token_id: int
+    next_level: int
+    level_potn: int
+    potn_to_level: int
+    is_special: bool
+
+
+class PumpskinStateSnapshot(T.TypedDict):
+    block_number: int
+    token_ids: T.List[int]
+    pumpskins: T.Dict[int, StakedPumpskin]
+    # token contract address -> wei
+    balances: T.Dict[str, int]
+    # token contract address -> wei approved for the game contract
+    allowances: T.Dict[str, int]
+
+
 class Pumpskin(T.TypedDict):
     name: str
     description: str
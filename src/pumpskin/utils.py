@@ -1,12 +1,16 @@
-import copy
 import json
 import os
 import typing as T
 
+import numpy as np
+
 from config_admin import ADMIN_ADDRESS
+from pumpskin.collection_crawler import CollectionCrawler
 from pumpskin.pumpskin_web2_client import PumpskinWeb2Client
 from pumpskin.pumpskin_web3_client import PumpskinNftWeb3Client
+from pumpskin.rarity import CollectionRarity
 from pumpskin.types import Rarity, Tokens
+from utils import logger
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
 
 MAX_PUMPSKINS = 6666
@@ -15,6 +19,7 @@ MAX_TOTAL_SUPPLY = 6666
 ATTRIBUTES_FILE = "attributes.json"
 COLLECTION_FILE = "collection.json"
 RARITY_FILE = "rarity.json"
+RARITY_RANKS_FILE = "rarity_ranks.npy"
 
 PUMPSKIN_ATTRIBUTES = {
     "Background": {},
@@ -55,40 +60,72 @@ def calc_ppie_earned_per_day(pumpskins: T.Dict[int, T.Dict[int, T.Any]]) -> int:
     )
 
 
+class LevelingTables:
+    """
+    Cumulative leveling economics of a single pumpskin from a fresh mint,
+    one row per level: days spent leveling, POTN needed per day and PPIE
+    earned along the way. Built once with the same float math the per call
+    loop used, so ROI lookups are a search over the PPIE column.
+    """
+
+    MAX_LEVEL = 100
+
+    def __init__(self, max_level: int = MAX_LEVEL) -> None:
+        days = [2.1]
+        ppie = [8.0]
+        potn = [12.0]
+        for level in range(2, max_level + 1):
+            potn_per_day = 3 * calc_ppie_per_day_from_level(level)
+            potn.append(potn[-1] + potn_per_day)
+
+            days_to_level = calc_potn_from_level(level) / potn[-1]
+            ppie.append(
+                ppie[-1] + days_to_level * calc_ppie_per_day_from_level(level)
+            )
+            days.append(days[-1] + days_to_level)
+
+        self.levels = np.arange(1, max_level + 1)
+        self.days = np.array(days, dtype=np.float64)
+        self.ppie = np.array(ppie, dtype=np.float64)
+        self.potn = np.array(potn, dtype=np.float64)
+
+    def get_roi_days(
+        self, ppie_per_pumpskin: T.Union[float, np.ndarray]
+    ) -> np.ndarray:
+        """
+        Days until the first level that has earned more PPIE than each
+        pumpskin cost, or the days to max level if none does
+        """
+        # PPIE only goes up with level, "right" finds the first level that is
+        # strictly more than the cost
+        inx = np.searchsorted(self.ppie, ppie_per_pumpskin, side="right")
+        return self.days[np.minimum(inx, len(self.days) - 1)]
+
+
+LEVELING_TABLES = LevelingTables()
+
+
 def calc_roi_from_mint(
     ppie_price_usd: float, avax_usd: float, pumpskin_price_avax: float
 ) -> float:
-    ppie_accumulations = {1: {"days": 2.1, Tokens.PPIE: 8, Tokens.POTN: 12}}
-    for level in range(2, 101):
-        ppie_accumulations[level] = {}
-
-        potn_per_day = 3 * calc_ppie_per_day_from_level(level)
-        ppie_accumulations[level][Tokens.POTN] = (
-            ppie_accumulations[level - 1][Tokens.POTN] + potn_per_day
-        )
-
-        cost_to_level = calc_potn_from_level(level)
-        days_to_level = cost_to_level / ppie_accumulations[level][Tokens.POTN]
-        ppie_while_waiting_to_level = (
-            days_to_level * calc_ppie_per_day_from_level(level)
-        )
-        ppie_accumulations[level][Tokens.PPIE] = (
-            ppie_accumulations[level - 1][Tokens.PPIE]
-            + ppie_while_waiting_to_level
-        )
-        ppie_accumulations[level]["days"] = (
-            ppie_accumulations[level - 1]["days"] + days_to_level
-        )
-
-    pumpskin_price_usd = pumpskin_price_avax * avax_usd
-    ppie_per_pumpskin = pumpskin_price_usd / ppie_price_usd
-
-    roi_days = ppie_accumulations[100]["days"]
-    for level, stats in ppie_accumulations.items():
-        if stats[Tokens.PPIE] > ppie_per_pumpskin:
-            roi_days = stats["days"]
-            break
-    return roi_days
+    return float(
+        calc_roi_from_mint_batch(
+            ppie_price_usd, avax_usd, [pumpskin_price_avax]
+        )[0]
+    )
+
+
+def calc_roi_from_mint_batch(
+    ppie_price_usd: float,
+    avax_usd: float,
+    pumpskin_prices_avax: T.Iterable[float],
+) -> np.ndarray:
+    """ROI in days for every price, e.g. a whole page of listings at once"""
+    pumpskin_prices_usd = (
+        np.fromiter(pumpskin_prices_avax, dtype=np.float64) * avax_usd
+    )
+    ppie_per_pumpskin = pumpskin_prices_usd / ppie_price_usd
+    return LEVELING_TABLES.get_roi_days(ppie_per_pumpskin)
 
 
 def get_mint_stats() -> T.Tuple[int, int]:
@@ -107,40 +144,24 @@ def get_mint_stats() -> T.Tuple[int, int]:
 def update_nft_collection_attributes(
     attributes_file: str,
     pumpskin_collection: str,
-) -> T.Dict[int, float]:
+    max_workers: int = 8,
+) -> None:
+    """
+    Crawl the metadata of the whole collection. Progress is checkpointed
+    next to `pumpskin_collection` so an interrupted crawl resumes where it
+    left off. The workers share the gateway's rate limit bucket, so
+    `max_workers` only sets how many requests can be waiting on it.
+    """
     pumpskin_w2: PumpskinWeb2Client = PumpskinWeb2Client()
-    pumpskins_info = {}
-    pumpskins_stats = copy.deepcopy(PUMPSKIN_ATTRIBUTES)
-
-    for pumpskin in range(MAX_TOTAL_SUPPLY):
-        pumpskins_info[pumpskin] = pumpskin_w2.get_pumpskin_info(pumpskin)
-        logger.print_normal(f"Processing pumpskin {pumpskin}...")
-        for attribute in pumpskins_info[pumpskin].get("attributes", []):
-            if attribute["trait_type"] not in pumpskins_stats:
-                logger.print_fail(
-                    f"Unknown attribute: {attribute['trait_type']}"
-                )
-                continue
-            trait_type = attribute["trait_type"]
-            trait_value = attribute["value"]
-            pumpskins_stats[trait_type][trait_value] = (
-                pumpskins_stats[trait_type].get(trait_value, 0) + 1
-            )
 
-    with open(attributes_file, "w") as outfile:
-        json.dump(
-            pumpskins_stats,
-            outfile,
-            indent=4,
-            sort_keys=True,
-        )
-    with open(pumpskin_collection, "w") as outfile:
-        json.dump(
-            pumpskins_info,
-            outfile,
-            indent=4,
-            sort_keys=True,
-        )
+    CollectionCrawler(
+        pumpskin_w2.get_pumpskin_info,
+        MAX_TOTAL_SUPPLY,
+        pumpskin_collection,
+        attributes_file,
+        PUMPSKIN_ATTRIBUTES,
+        max_workers=max_workers,
+    ).crawl()
 
 
 def calculate_rarity(
@@ -196,8 +217,6 @@ def calculate_rarity_for_collection(
     rarity_file: str = None,
     save_to_disk: bool = False,
 ) -> T.Dict[int, float]:
-    pumpskins_rarity = {}
-
     attributes_file = get_json_path(ATTRIBUTES_FILE)
     with open(attributes_file, "r") as infile:
         pumpskin_stats = json.load(infile)
@@ -206,17 +225,10 @@ def calculate_rarity_for_collection(
     with open(collections_file, "r") as infile:
         collection_traits = json.load(infile)
 
-    for pumpskin in range(MAX_TOTAL_SUPPLY):
-        pumpskins_rarity[pumpskin] = calculate_rarity(
-            pumpskin, collection_traits[str(pumpskin)], pumpskin_stats
-        )
-
-    sorted_pumpskins_rarity = dict(
-        sorted(
-            pumpskins_rarity.items(),
-            key=lambda y: y[1].get("Overall", {"rarity": 1000.0})["rarity"],
-        )
+    rarity = CollectionRarity(
+        pumpskin_stats, collection_traits, range(MAX_TOTAL_SUPPLY)
     )
+    sorted_pumpskins_rarity = rarity.to_sorted_dict()
 
     if save_to_disk and rarity_file is not None:
         with open(rarity_file, "w") as outfile:
@@ -225,5 +237,6 @@ def calculate_rarity_for_collection(
                 outfile,
                 indent=4,
             )
+        rarity.save_ranks(get_json_path(RARITY_RANKS_FILE))
 
     return sorted_pumpskins_rarity
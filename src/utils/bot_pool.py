@@ -0,0 +1,135 @@
+import threading
+import time
+import typing as T
+
+from concurrent.futures import ThreadPoolExecutor
+
+from health_monitor.health_monitor import HealthMonitor
+from utils import logger
+from utils.rate_limiter import TokenBucket
+
+
+class BotRunStats:
+    def __init__(self) -> None:
+        self.runs = 0
+        self.failures = 0
+        self.total_time = 0.0
+        self.last_latency = 0.0
+        self.first_run = time.time()
+
+    def update(self, latency: float, failed: bool) -> None:
+        self.runs += 1
+        self.failures += 1 if failed else 0
+        self.total_time += latency
+        self.last_latency = latency
+
+    def get_avg_latency(self) -> float:
+        if self.runs == 0:
+            return 0.0
+        return self.total_time / self.runs
+
+    def get_runs_per_hour(self) -> float:
+        elapsed = time.time() - self.first_run
+        if elapsed <= 0.0:
+            return 0.0
+        return self.runs / elapsed * 60.0 * 60.0
+
+    def as_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_latency": self.last_latency,
+            "avg_latency": self.get_avg_latency(),
+            "runs_per_hour": self.get_runs_per_hour(),
+        }
+
+
+class BotPoolRunner:
+    """
+    Runs a round of bots on a bounded thread pool instead of one after the
+    other. Every bot gets its own budget so an account is never run more than
+    once per `account_period` seconds, and every api host gets a budget of
+    how many bots may be talking to it at once. Request level pacing is still
+    done by the shared per host rate limiter in the web2 clients.
+    """
+
+    def __init__(
+        self,
+        bots: T.List[T.Any],
+        max_workers: int = 4,
+        account_period: float = 0.0,
+        host_budgets: T.Optional[T.Dict[str, int]] = None,
+        get_hosts: T.Optional[T.Callable[[T.Any], T.List[str]]] = None,
+        health_monitor: T.Optional[HealthMonitor] = None,
+    ) -> None:
+        self.bots = bots
+        self.max_workers = max(1, min(max_workers, len(bots)))
+        self.get_hosts = get_hosts
+        self.health_monitor = health_monitor
+
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.account_budgets = {
+            b.user: TokenBucket(account_period, burst=1) for b in bots
+        }
+        self.host_budgets = {
+            host: threading.BoundedSemaphore(limit)
+            for host, limit in (host_budgets or {}).items()
+        }
+        self.stats = {b.user: BotRunStats() for b in bots}
+        self.stats_lock = threading.Lock()
+
+    def _get_host_budgets(self, bot: T.Any) -> T.List[threading.Semaphore]:
+        if self.get_hosts is None:
+            return []
+        # sorted so bots sharing hosts always take them in the same order
+        hosts = sorted(set(self.get_hosts(bot)))
+        return [self.host_budgets[h] for h in hosts if h in self.host_budgets]
+
+    def _run_bot(self, bot: T.Any) -> None:
+        wait_time = self.account_budgets[bot.user].reserve()
+        if wait_time > 0.0:
+            time.sleep(wait_time)
+
+        budgets = self._get_host_budgets(bot)
+        for budget in budgets:
+            budget.acquire()
+
+        start = time.time()
+        failed = True
+        try:
+            bot.run()
+            failed = False
+        finally:
+            for budget in reversed(budgets):
+                budget.release()
+            self._record(bot.user, time.time() - start, failed)
+
+    def _record(self, user: str, latency: float, failed: bool) -> None:
+        with self.stats_lock:
+            self.stats[user].update(latency, failed)
+            stats = self.stats[user].as_dict()
+
+        if self.health_monitor is not None:
+            self.health_monitor.set_user_stats(user, stats)
+
+    def run_round(self) -> float:
+        """Run every bot once, returns the round time in seconds"""
+        start = time.time()
+        futures = [self.pool.submit(self._run_bot, bot) for bot in self.bots]
+        # surface bot exceptions in the caller like the serial loop did
+        for future in futures:
+            future.result()
+        round_time = time.time() - start
+
+        logger.print_bold(
+            f"Ran {len(self.bots)} bots in {round_time:.1f}s "
+            f"on {self.max_workers} workers"
+        )
+        return round_time
+
+    def get_stats(self) -> T.Dict[str, T.Dict[str, T.Any]]:
+        with self.stats_lock:
+            return {user: s.as_dict() for user, s in self.stats.items()}
+
+    def stop(self) -> None:
+        self.pool.shutdown(wait=False)
@@ -1,3 +1,4 @@
+import collections
 import time
 import typing as T
 
@@ -6,13 +7,50 @@ from utils.general import get_pretty_seconds
 
 
 class CircuitBreaker:
-    def __init__(self, min_delta: float, backoff: float = 1.0):
+    """
+    Paces a bot loop. In the default mode a loop that finishes faster than
+    `min_delta` trips the breaker and sleeps an exponentially growing backoff.
+
+    In adaptive mode the sleep is picked from the recent loop durations, the
+    recent error rate and the next known deadline: the loop is padded out to
+    `min_delta`, errors grow the backoff, successes decay it gradually, and
+    we never sleep past a deadline set with `set_deadline`.
+    """
+
+    def __init__(
+        self,
+        min_delta: float,
+        backoff: float = 1.0,
+        adaptive: bool = False,
+        max_backoff: float = 60.0 * 10.0,
+        backoff_decay: float = 0.75,
+        window: int = 20,
+    ):
         self.backoff = backoff
         self.start_time = 0.0
         self.min_delta = min_delta
 
+        self.adaptive = adaptive
+        self.initial_backoff = backoff
+        self.max_backoff = max_backoff
+        self.backoff_decay = backoff_decay
+        self.durations: T.Deque[float] = collections.deque(maxlen=window)
+        self.errors: T.Deque[bool] = collections.deque(maxlen=window)
+        self.loop_errors = 0
+        self.next_deadline: T.Optional[float] = None
+        self.last_sleep = 0.0
+
     def start(self):
         self.start_time = time.time()
+        self.loop_errors = 0
+
+    def record_error(self) -> None:
+        self.loop_errors += 1
+
+    def set_deadline(self, deadline: float) -> None:
+        """Epoch time of the next thing the loop must not sleep through"""
+        if self.next_deadline is None or deadline < self.next_deadline:
+            self.next_deadline = deadline
 
     def trip(self):
         logger.print_fail_arrow(f"Trigger tripped!")
@@ -22,6 +60,60 @@ class CircuitBreaker:
     def reset(self):
         self.backoff = 1.0
 
+    def get_error_rate(self) -> float:
+        if not self.errors:
+            return 0.0
+        return sum(self.errors) / float(len(self.errors))
+
+    def get_avg_duration(self) -> float:
+        if not self.durations:
+            return 0.0
+        return sum(self.durations) / float(len(self.durations))
+
+    def get_state(self) -> T.Dict[str, T.Any]:
+        return {
+            "adaptive": self.adaptive,
+            "backoff": self.backoff,
+            "error_rate": self.get_error_rate(),
+            "avg_duration": self.get_avg_duration(),
+            "last_sleep": self.last_sleep,
+            "next_deadline": self.next_deadline,
+        }
+
+    def _get_adaptive_sleep(self, now: float, duration: float) -> float:
+        if self.loop_errors > 0:
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            penalty = self.backoff
+        else:
+            self.backoff = max(
+                self.initial_backoff, self.backoff * self.backoff_decay
+            )
+            penalty = self.backoff * self.get_error_rate()
+
+        sleep_time = max(self.min_delta - duration, 0.0) + penalty
+
+        if self.next_deadline is not None:
+            if self.next_deadline <= now:
+                self.next_deadline = None
+            else:
+                sleep_time = min(sleep_time, self.next_deadline - now)
+
+        return sleep_time
+
+    def _end_adaptive(self, now: float, duration: float) -> None:
+        self.durations.append(duration)
+        self.errors.append(self.loop_errors > 0)
+
+        self.last_sleep = self._get_adaptive_sleep(now, duration)
+        if self.last_sleep <= 0.0:
+            return
+
+        logger.print_normal(
+            f"Pacing for {get_pretty_seconds(int(self.last_sleep))} "
+            f"(error rate {self.get_error_rate() * 100.0:.0f}%)"
+        )
+        time.sleep(self.last_sleep)
+
     def end(self):
         now = time.time()
 
@@ -29,7 +121,9 @@ class CircuitBreaker:
             f"Start->End: {get_pretty_seconds(int(now - self.start_time))}"
         )
 
-        if now - self.start_time < self.min_delta:
+        if self.adaptive:
+            self._end_adaptive(now, now - self.start_time)
+        elif now - self.start_time < self.min_delta:
             self.trip()
         else:
             self.reset()
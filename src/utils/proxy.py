@@ -1,5 +1,6 @@
 import random
 import requests
+import typing as T
 
 from utils import logger
 
@@ -33,3 +34,12 @@ class Proxies:
 
         index = random.randrange(len(self.proxies))
         return self.proxies[index]
+
+    def get_proxies(self, count: int) -> T.List[str]:
+        """Pick up to `count` distinct proxies, e.g. to seed a session pool"""
+        if not self.proxies:
+            logger.print_fail(f"No proxies available!")
+            return []
+
+        picks = random.sample(self.proxies, min(count, len(self.proxies)))
+        return [f"http://{p}" for p in picks]
@@ -0,0 +1,175 @@
+import threading
+import time
+import typing as T
+
+from urllib.parse import urlparse
+
+from utils import logger
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket. A token is added every `refill_period` seconds
+    up to `burst` tokens, so short bursts go out immediately and sustained
+    traffic is paced at 1 request per `refill_period`.
+    """
+
+    def __init__(self, refill_period: float, burst: int = 1) -> None:
+        self.refill_period = refill_period
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.refill_period <= 0.0:
+            self.tokens = float(self.burst)
+            return
+        elapsed = now - self.last_refill
+        self.tokens = min(
+            float(self.burst), self.tokens + elapsed / self.refill_period
+        )
+        self.last_refill = now
+
+    def reserve(self) -> float:
+        """
+        Take a token and return how long the caller must sleep before using
+        it. Tokens are allowed to go negative so that concurrent callers queue
+        up behind each other instead of all waking up at the same time.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1.0
+            wait_time = 0.0
+            if self.tokens < 0.0:
+                wait_time = -self.tokens * self.refill_period
+            return max(wait_time, self.blocked_until - now)
+
+    def tighten(self, refill_period: float, burst: int) -> None:
+        """Apply a stricter pace or a smaller burst, looser ones are ignored"""
+        with self.lock:
+            now = time.monotonic()
+            # tokens earned so far count at the old pace
+            self._refill(now)
+            self.refill_period = max(self.refill_period, refill_period)
+            self.burst = min(self.burst, max(1, burst))
+            self.tokens = min(self.tokens, float(self.burst))
+
+    def block_for(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds`, e.g. on a 429"""
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = min(self.tokens, 0.0)
+            self.last_refill = now
+
+
+class RateLimitStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+        self.request_time = 0.0
+        self.lock = threading.Lock()
+
+    def update(self, wait_time: float, request_time: float) -> None:
+        with self.lock:
+            self.requests += 1
+            self.wait_time += wait_time
+            self.request_time += request_time
+
+    def add_throttle(self) -> None:
+        with self.lock:
+            self.throttled += 1
+
+    def get_wait_ratio(self) -> float:
+        """Fraction of total time spent waiting on the limiter"""
+        total = self.wait_time + self.request_time
+        if total <= 0.0:
+            return 0.0
+        return self.wait_time / total
+
+    def as_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "wait_time": self.wait_time,
+            "request_time": self.request_time,
+            "wait_ratio": self.get_wait_ratio(),
+        }
+
+
+class HostRateLimiter:
+    """
+    Process wide registry of one token bucket per host, so every client
+    instance (and thread) talking to the same api shares one budget. When
+    callers configure different limits for a host the strictest one wins.
+    """
+
+    DEFAULT_BURST = 3
+    DEFAULT_RETRY_AFTER = 30.0
+
+    def __init__(self) -> None:
+        self.buckets: T.Dict[str, TokenBucket] = {}
+        self.stats: T.Dict[str, RateLimitStats] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    def get_bucket(
+        self, url: str, refill_period: float, burst: int = DEFAULT_BURST
+    ) -> TokenBucket:
+        host = self.get_host(url)
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(refill_period, burst)
+                self.buckets[host] = bucket
+                return bucket
+        bucket.tighten(refill_period, burst)
+        return bucket
+
+    def get_stats(self, url: str) -> RateLimitStats:
+        host = self.get_host(url)
+        with self.lock:
+            if host not in self.stats:
+                self.stats[host] = RateLimitStats()
+            return self.stats[host]
+
+    def acquire(
+        self, url: str, refill_period: float, burst: int = DEFAULT_BURST
+    ) -> float:
+        """Returns how long to wait before sending a request to `url`"""
+        if refill_period <= 0.0:
+            # unpaced callers still wait on a limit someone else set
+            with self.lock:
+                bucket = self.buckets.get(self.get_host(url))
+            return 0.0 if bucket is None else bucket.reserve()
+        return self.get_bucket(url, refill_period, burst).reserve()
+
+    def throttle(self, url: str, retry_after: T.Optional[str] = None) -> None:
+        """Server told us to slow down, block the bucket for this host"""
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = self.DEFAULT_RETRY_AFTER
+
+        host = self.get_host(url)
+        logger.print_warn(f"Rate limited by {host}, backing off {delay:.1f}s")
+
+        self.get_stats(url).add_throttle()
+        with self.lock:
+            bucket = self.buckets.get(host)
+        if bucket is not None:
+            bucket.block_for(delay)
+
+    def get_all_stats(self) -> T.Dict[str, T.Dict[str, T.Any]]:
+        with self.lock:
+            return {host: s.as_dict() for host, s in self.stats.items()}
+
+
+RATE_LIMITER = HostRateLimiter()
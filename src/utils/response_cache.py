@@ -0,0 +1,185 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+import typing as T
+
+from collections import OrderedDict
+
+from utils import logger
+from utils.file_util import make_sure_path_exists
+
+
+class CacheEntry:
+    def __init__(
+        self,
+        data: T.Any,
+        ttl: float,
+        etag: T.Optional[str] = None,
+        last_modified: T.Optional[str] = None,
+    ) -> None:
+        self.data = data
+        self.expires_at = time.time() + ttl
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def refresh(self, ttl: float) -> None:
+        self.expires_at = time.time() + ttl
+
+    def get_validators(self) -> T.Dict[str, str]:
+        """Conditional request headers so the server can answer with a 304"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "data": self.data,
+            "expires_at": self.expires_at,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+
+    @staticmethod
+    def from_dict(raw: T.Dict[str, T.Any]) -> "CacheEntry":
+        entry = CacheEntry(
+            raw["data"], 0.0, raw.get("etag"), raw.get("last_modified")
+        )
+        entry.expires_at = raw["expires_at"]
+        return entry
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def get_hit_rate(self) -> float:
+        total = self.hits + self.misses + self.revalidated
+        if total == 0:
+            return 0.0
+        return (self.hits + self.revalidated) / total
+
+    def as_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "hit_rate": self.get_hit_rate(),
+        }
+
+
+class ResponseCache:
+    """
+    In memory LRU of json responses with an optional on disk tier so that
+    static data survives a restart. Entries are handed out as copies so
+    callers are free to mutate what they get back.
+    """
+
+    def __init__(
+        self, max_entries: int = 256, cache_dir: T.Optional[str] = None
+    ) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries: T.OrderedDict[str, CacheEntry] = OrderedDict()
+        self.stats: T.Dict[str, EndpointStats] = {}
+        self.lock = threading.Lock()
+
+        if self.cache_dir is not None:
+            make_sure_path_exists(self.cache_dir)
+
+    @staticmethod
+    def get_key(url: str, params: T.Dict[str, T.Any]) -> str:
+        return url + "?" + json.dumps(params, sort_keys=True, default=str)
+
+    def _get_disk_path(self, key: str) -> str:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _load_from_disk(self, key: str) -> T.Optional[CacheEntry]:
+        if self.cache_dir is None:
+            return None
+
+        path = self._get_disk_path(key)
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            with open(path) as infile:
+                return CacheEntry.from_dict(json.load(infile))
+        except:
+            logger.print_warn(f"Failed to load cached response {path}")
+            return None
+
+    def _save_to_disk(self, key: str, entry: CacheEntry) -> None:
+        if self.cache_dir is None:
+            return
+
+        path = self._get_disk_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w") as outfile:
+                json.dump(entry.to_dict(), outfile)
+            os.replace(tmp_path, path)
+        except:
+            logger.print_warn(f"Failed to save cached response {path}")
+
+    def _get_stats(self, endpoint: str) -> EndpointStats:
+        if endpoint not in self.stats:
+            self.stats[endpoint] = EndpointStats()
+        return self.stats[endpoint]
+
+    def get(self, key: str) -> T.Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+
+        entry = self._load_from_disk(key)
+        if entry is not None:
+            self._insert(key, entry)
+        return entry
+
+    def get_data(self, entry: CacheEntry) -> T.Any:
+        return copy.deepcopy(entry.data)
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        self._insert(key, entry)
+        self._save_to_disk(key, entry)
+
+    def record_hit(self, endpoint: str) -> None:
+        with self.lock:
+            self._get_stats(endpoint).hits += 1
+
+    def record_miss(self, endpoint: str) -> None:
+        with self.lock:
+            self._get_stats(endpoint).misses += 1
+
+    def record_revalidated(self, endpoint: str) -> None:
+        with self.lock:
+            self._get_stats(endpoint).revalidated += 1
+
+    def get_stats(self) -> T.Dict[str, T.Dict[str, T.Any]]:
+        with self.lock:
+            return {k: v.as_dict() for k, v in self.stats.items()}
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,254 @@
+import random
+import socket
+import struct
+import threading
+import time
+import typing as T
+from unittest import mock
+
+from utils import tor
+from utils.circuit_breaker import CircuitBreaker
+from utils.rate_limiter import HostRateLimiter
+
+# host the stand-in proxy refuses to connect to
+FAIL_HOST = "fail.test"
+
+
+class FakeSocksServer:
+    """
+    Local stand-in for the tor SOCKS port. Speaks just enough SOCKS5 with
+    username/password auth to accept a CONNECT, then answers the http request
+    itself with the username it was given, so tests can see which circuit a
+    request used. Connects to FAIL_HOST are refused.
+    """
+
+    def __init__(self) -> None:
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(16)
+        self.port = self.server.getsockname()[1]
+        self.usernames: T.List[str] = []
+        self.tor_socks_port = tor.TOR_SOCKS_PORT
+
+    def _recv_exact(self, conn: socket.socket, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client went away")
+            data += chunk
+        return data
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            _, num_methods = self._recv_exact(conn, 2)
+            self._recv_exact(conn, num_methods)
+            # username/password
+            conn.sendall(b"\x05\x02")
+
+            _, user_len = self._recv_exact(conn, 2)
+            username = self._recv_exact(conn, user_len).decode()
+            (pass_len,) = self._recv_exact(conn, 1)
+            self._recv_exact(conn, pass_len)
+            self.usernames.append(username)
+            conn.sendall(b"\x01\x00")
+
+            _, _, _, address_type = self._recv_exact(conn, 4)
+            assert address_type == 3, "Expected the proxy to resolve names"
+            (host_len,) = self._recv_exact(conn, 1)
+            host = self._recv_exact(conn, host_len).decode()
+            self._recv_exact(conn, 2)
+
+            bound = (
+                b"\x01" + socket.inet_aton("127.0.0.1") + struct.pack(">H", 0)
+            )
+            if host == FAIL_HOST:
+                conn.sendall(b"\x05\x05\x00" + bound)
+                return
+            conn.sendall(b"\x05\x00\x00" + bound)
+
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(1024)
+            body = username.encode()
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\nConnection: close\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+
+    def run(self) -> None:
+        def loop() -> None:
+            while True:
+                try:
+                    conn, _ = self.server.accept()
+                except OSError:
+                    return
+                threading.Thread(
+                    target=self._handle, args=(conn,), daemon=True
+                ).start()
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.close()
+        tor.TOR_SOCKS_PORT = self.tor_socks_port
+
+
+def _start_fake_tor() -> FakeSocksServer:
+    server = FakeSocksServer()
+    server.run()
+    tor.TOR_SOCKS_PORT = server.port
+    return server
+
+
+def test_tor_pool_sessions_use_separate_circuits() -> None:
+    server = _start_fake_tor()
+    try:
+        pool = tor.TorSessionPool(size=4)
+        seen = [
+            pooled.session.get("http://ok.test/", timeout=5.0).text
+            for pooled in pool.sessions
+        ]
+        assert len(set(seen)) == len(pool.sessions), f"Shared creds: {seen}"
+        assert seen == server.usernames
+    finally:
+        server.stop()
+
+
+def test_tor_pool_prefers_low_latency() -> None:
+    server = _start_fake_tor()
+    try:
+        pool = tor.TorSessionPool(size=2)
+        fast, slow = pool.sessions
+        fast.latency = 0.1
+        slow.latency = 1.0
+
+        random.seed(0)
+        picks = [pool.get_session() for _ in range(1000)]
+        num_fast = len([p for p in picks if p is fast])
+        # weights are 10:1
+        assert 850 < num_fast < 970, f"Fast session picked {num_fast} times"
+
+        # a request through the pool moves the average towards what it saw
+        pool.sessions = [slow]
+        pool.get("http://ok.test/", timeout=5.0)
+        assert slow.latency < 1.0
+    finally:
+        server.stop()
+
+
+def test_tor_pool_marks_failing_session_unhealthy() -> None:
+    server = _start_fake_tor()
+    try:
+        pool = tor.TorSessionPool(size=2)
+        failing, other = pool.sessions
+        pool.sessions = [failing]
+        for inx in range(pool.MAX_FAILURES):
+            assert failing.healthy, f"Unhealthy after {inx} failures"
+            try:
+                pool.get(f"http://{FAIL_HOST}/", timeout=5.0)
+                assert False, "Request through a refused connect succeeded"
+            except Exception:
+                pass
+        assert not failing.healthy
+        assert failing.failures == pool.MAX_FAILURES
+
+        pool.sessions = [failing, other]
+        picks = {id(pool.get_session()) for _ in range(100)}
+        assert picks == {id(other)}, "Picked an unhealthy session"
+    finally:
+        server.stop()
+
+
+def test_tor_pool_refresh_moves_to_new_circuit() -> None:
+    server = _start_fake_tor()
+    try:
+        pool = tor.TorSessionPool(
+            size=1, health_check_url=f"http://{FAIL_HOST}/"
+        )
+        pooled = pool.sessions[0]
+        before = pooled.session.get("http://ok.test/", timeout=5.0).text
+        old_session = pooled.session
+
+        # a failed health check moves the session to a fresh circuit
+        pooled.failures = 2
+        pool.check_health()
+        assert pooled.healthy
+        assert pooled.failures == 0
+        assert pooled.session is not old_session
+
+        after = pooled.session.get("http://ok.test/", timeout=5.0).text
+        assert before != after, "Refresh kept the same SOCKS credentials"
+    finally:
+        server.stop()
+
+
+def test_rate_limiter_one_bucket_per_host() -> None:
+    limiter = HostRateLimiter()
+    fast_url = "https://api.example.com/fast"
+    slow_url = "https://api.example.com/slow"
+
+    # burst of 1 so every request after the first waits a full period
+    assert limiter.acquire(fast_url, 1.0, burst=1) == 0.0
+    wait_time = limiter.acquire(slow_url, 5.0, burst=1)
+    assert len(limiter.buckets) == 1, f"Buckets: {list(limiter.buckets)}"
+    # the slow caller's 5s pace is the host's pace now, for both callers
+    assert 4.0 < wait_time <= 5.0, f"Waited {wait_time}"
+    wait_time = limiter.acquire(fast_url, 1.0, burst=3)
+    assert 9.0 < wait_time <= 10.0, f"Waited {wait_time}"
+
+    # unpaced callers on the host queue up too, other hosts don't
+    assert limiter.acquire(fast_url, 0.0) > 10.0
+    assert limiter.acquire("https://other.example.com/", 1.0) == 0.0
+
+    limiter.throttle(slow_url, "60")
+    assert limiter.acquire(fast_url, 1.0) >= 59.0
+
+
+def test_circuit_breaker_adaptive_backoff_and_deadline() -> None:
+    cb = CircuitBreaker(10.0, backoff=1.0, adaptive=True, max_backoff=8.0)
+    sleeps: T.List[float] = []
+
+    def run_loop(error: bool = False) -> float:
+        cb.start()
+        if error:
+            cb.record_error()
+        cb.end()
+        return sleeps[-1] if sleeps else 0.0
+
+    with mock.patch.object(time, "sleep", side_effect=sleeps.append):
+        # errors double the backoff up to the cap and add it to the pad
+        for backoff in [2.0, 4.0, 8.0, 8.0]:
+            sleep_time = run_loop(error=True)
+            assert cb.backoff == backoff
+            assert 10.0 + backoff - 0.5 < sleep_time <= 10.0 + backoff
+
+        # successes decay it a step at a time, not straight back to 1s
+        backoffs = []
+        for _ in range(10):
+            run_loop()
+            backoffs.append(cb.backoff)
+        assert backoffs[0] == 8.0 * 0.75
+        assert all(a > b for a, b in zip(backoffs, backoffs[1:]) if a > 1.0)
+        assert backoffs[-1] == 1.0
+
+        # the pace never sleeps through the next deadline, the soonest wins
+        cb.set_deadline(time.time() + 3.0)
+        cb.set_deadline(time.time() + 5.0)
+        assert run_loop() <= 3.0
+        assert cb.get_state()["last_sleep"] <= 3.0
+
+        # and a deadline that has gone by is dropped
+        cb.next_deadline = time.time() - 1.0
+        assert run_loop() > 9.0
+        assert cb.get_state()["next_deadline"] is None
+
+
+if __name__ == "__main__":
+    test_tor_pool_sessions_use_separate_circuits()
+    test_tor_pool_prefers_low_latency()
+    test_tor_pool_marks_failing_session_unhealthy()
+    test_tor_pool_refresh_moves_to_new_circuit()
+    test_rate_limiter_one_bucket_per_host()
+    test_circuit_breaker_adaptive_backoff_and_deadline()
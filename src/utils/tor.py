@@ -1,12 +1,24 @@
+import random
 import requests
+import threading
+import time
+import typing as T
+import uuid
 
 from stem import Signal
 from stem.control import Controller
 
+from utils import logger
+
+TOR_SOCKS_HOST = "127.0.0.1"
+TOR_SOCKS_PORT = 9050
+TOR_CONTROL_PORT = 9051
+HEALTH_CHECK_URL = "http://icanhazip.com/"
+
 
 def renew_connection(password: str):
     # signal TOR for a new connection
-    with Controller.from_port(port=9051) as controller:
+    with Controller.from_port(port=TOR_CONTROL_PORT) as controller:
         controller.authenticate(password=password)
         controller.signal(Signal.NEWNYM)
 
@@ -14,7 +26,178 @@ def renew_connection(password: str):
 def get_tor_session() -> requests.Session:
     session = requests.Session()
     session.proxies = {
-        "http": "socks5://127.0.0.1:9050",
-        "https": "socks5://127.0.0.1:9050",
+        "http": f"socks5://{TOR_SOCKS_HOST}:{TOR_SOCKS_PORT}",
+        "https": f"socks5://{TOR_SOCKS_HOST}:{TOR_SOCKS_PORT}",
     }
     return session
+
+
+class PooledSession:
+    """
+    A requests session pinned to its own circuit. Tor isolates streams that
+    use different SOCKS credentials (IsolateSOCKSAuth), so changing the
+    credentials is enough to move the session onto a fresh circuit.
+    """
+
+    # weight of the newest sample in the latency moving average
+    LATENCY_ALPHA = 0.3
+
+    def __init__(self, proxy: T.Optional[str] = None) -> None:
+        self.proxy = proxy
+        self.session = requests.Session()
+        self.latency = 1.0
+        self.failures = 0
+        self.healthy = True
+        self.created = time.time()
+        self.refresh()
+
+    def can_refresh(self) -> bool:
+        """Only tor sessions can be moved to a new circuit"""
+        return self.proxy is None
+
+    def refresh(self) -> None:
+        if self.proxy is None:
+            isolation = uuid.uuid4().hex[:16]
+            proxy = f"socks5h://{isolation}:x@{TOR_SOCKS_HOST}:{TOR_SOCKS_PORT}"
+        else:
+            proxy = self.proxy
+        # requests in flight on other threads still hold the old session, it
+        # is left to be collected once the last of them is done with it
+        self.session = requests.Session()
+        self.session.proxies = {"http": proxy, "https": proxy}
+        self.created = time.time()
+        self.failures = 0
+        self.healthy = True
+
+    def record(self, latency: T.Optional[float]) -> None:
+        """Record a request outcome, None means the request failed"""
+        if latency is None:
+            self.failures += 1
+            return
+        self.failures = 0
+        self.latency = (
+            self.LATENCY_ALPHA * latency
+            + (1.0 - self.LATENCY_ALPHA) * self.latency
+        )
+
+
+class TorSessionPool:
+    """
+    Pool of sessions on separate tor circuits (or separate http proxies) so
+    requests can go out in parallel instead of sharing one circuit. Sessions
+    are picked weighted by inverse latency, and a session that keeps failing
+    or gets too old is moved onto a new circuit.
+
+    Opt-in, pass one to `Web2Client(session_pool=...)`.
+    """
+
+    MAX_FAILURES = 3
+    MAX_CIRCUIT_AGE = 60.0 * 10.0
+    HEALTH_CHECK_PERIOD = 60.0
+
+    def __init__(
+        self,
+        size: int = 4,
+        proxies: T.Optional[T.List[str]] = None,
+        health_check_url: str = HEALTH_CHECK_URL,
+        verbose: bool = False,
+    ) -> None:
+        self.health_check_url = health_check_url
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+        if proxies:
+            self.sessions = [PooledSession(p) for p in proxies[:size]]
+        else:
+            self.sessions = [PooledSession() for _ in range(size)]
+
+    def get_session(self) -> PooledSession:
+        with self.lock:
+            candidates = [s for s in self.sessions if s.healthy]
+            if not candidates:
+                logger.print_warn("No healthy sessions, refreshing pool")
+                for pooled in self.sessions:
+                    pooled.refresh()
+                candidates = self.sessions
+            weights = [1.0 / max(s.latency, 1e-3) for s in candidates]
+            return random.choices(candidates, weights=weights)[0]
+
+    def record(self, pooled: PooledSession, latency: T.Optional[float]) -> None:
+        with self.lock:
+            pooled.record(latency)
+            if pooled.failures >= self.MAX_FAILURES:
+                pooled.healthy = False
+
+    def request(self, method: str, url: str, **kwargs: T.Any) -> T.Any:
+        """Drop-in for requests.request that goes through the pool"""
+        pooled = self.get_session()
+        # keep our own reference, a refresh may swap the session meanwhile
+        session = pooled.session
+        start = time.monotonic()
+        try:
+            response = session.request(method, url, **kwargs)
+        except:
+            self.record(pooled, None)
+            raise
+        self.record(pooled, time.monotonic() - start)
+        return response
+
+    def get(self, url: str, **kwargs: T.Any) -> T.Any:
+        return self.request("GET", url, **kwargs)
+
+    def check_health(self) -> None:
+        for pooled in list(self.sessions):
+            age = time.time() - pooled.created
+            if pooled.can_refresh() and age > self.MAX_CIRCUIT_AGE:
+                with self.lock:
+                    pooled.refresh()
+
+            start = time.monotonic()
+            try:
+                ip = pooled.session.get(
+                    self.health_check_url, timeout=10.0
+                ).text.strip()
+                latency = time.monotonic() - start
+            except KeyboardInterrupt:
+                raise
+            except:
+                ip = ""
+                latency = None
+
+            with self.lock:
+                pooled.record(latency)
+                pooled.healthy = latency is not None
+                if not pooled.healthy and pooled.can_refresh():
+                    pooled.refresh()
+
+            if self.verbose:
+                logger.print_normal(
+                    f"Session {ip or 'down'}: latency {pooled.latency:.2f}s"
+                )
+
+    def get_stats(self) -> T.List[T.Dict[str, T.Any]]:
+        with self.lock:
+            return [
+                {
+                    "latency": s.latency,
+                    "failures": s.failures,
+                    "healthy": s.healthy,
+                    "age": time.time() - s.created,
+                }
+                for s in self.sessions
+            ]
+
+    def run(self, daemon: bool = True) -> None:
+        def loop() -> None:
+            while not self.stop_event.is_set():
+                self.check_health()
+                self.stop_event.wait(self.HEALTH_CHECK_PERIOD)
+
+        thread = threading.Thread(
+            name="tor_session_pool_health", target=loop, daemon=daemon
+        )
+        thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
@@ -2,9 +2,12 @@ import requests
 import time
 import typing as T
 
+from urllib.parse import urlparse
 from yaspin import yaspin
 
 from utils import logger, tor
+from utils.rate_limiter import RATE_LIMITER
+from utils.response_cache import CacheEntry, ResponseCache
 
 
 @yaspin(text="Waiting...")
@@ -16,6 +19,11 @@ MY_IP_URL = "http://icanhazip.com/"
 
 
 class Web2Client:
+    # opt-in response caching, maps an endpoint path suffix to a ttl in seconds
+    CACHE_TTLS: T.Dict[str, float] = {}
+    # query params that don't change the response, e.g. cache busters
+    CACHE_IGNORE_PARAMS: T.List[str] = []
+
     def __init__(
         self,
         base_url: str,
@@ -23,15 +31,27 @@ class Web2Client:
         use_proxy: bool = False,
         dry_run: bool = False,
         verbose: bool = False,
+        rate_limit_burst: int = RATE_LIMITER.DEFAULT_BURST,
+        cache_dir: T.Optional[str] = None,
+        session_pool: T.Optional[tor.TorSessionPool] = None,
     ) -> None:
         self.dry_run = dry_run
         self.base_url = base_url
         self.rate_limit_delay = rate_limit_delay
+        self.rate_limit_burst = rate_limit_burst
+        self.cache = ResponseCache(cache_dir=cache_dir)
+        # requests sent by this client, cache hits don't count
+        self.num_requests = 0
+        # ask the server about every cached response, with its etag, instead
+        # of trusting it until the ttl runs out
+        self.revalidate_cache = False
 
         if dry_run:
             logger.print_warn("Web2Client in dry run mode...")
 
-        if use_proxy:
+        if session_pool is not None:
+            self.requests = session_pool
+        elif use_proxy:
             self.requests = tor.get_tor_session()
         else:
             self.requests = requests
@@ -41,6 +61,104 @@ class Web2Client:
                 f"Web2Client IP (proxy={use_proxy}): {self.requests.get(MY_IP_URL).text.strip()}"
             )
 
+    def _wait_for_token(self, url: str, refill_period: float) -> float:
+        wait_time = RATE_LIMITER.acquire(
+            url, refill_period, burst=self.rate_limit_burst
+        )
+        if wait_time > 0.0:
+            wait(wait_time)
+        return wait_time
+
+    def _request(
+        self, method: str, url: str, refill_period: float, **kwargs: T.Any
+    ) -> requests.Response:
+        wait_time = self._wait_for_token(url, refill_period)
+
+        self.num_requests += 1
+        start = time.monotonic()
+        try:
+            response = self.requests.request(method, url, **kwargs)
+        finally:
+            RATE_LIMITER.get_stats(url).update(
+                wait_time, time.monotonic() - start
+            )
+
+        if response.status_code == 429:
+            RATE_LIMITER.throttle(url, response.headers.get("Retry-After"))
+
+        return response
+
+    @staticmethod
+    def get_rate_limit_stats() -> T.Dict[str, T.Dict[str, T.Any]]:
+        """Per host wait time vs request time, shared by all clients"""
+        return RATE_LIMITER.get_all_stats()
+
+    def get_cache_stats(self) -> T.Dict[str, T.Dict[str, T.Any]]:
+        """Hits, misses, 304 revalidations and hit rate per endpoint"""
+        return self.cache.get_stats()
+
+    def _get_cache_ttl(self, url: str) -> T.Tuple[str, float]:
+        path = urlparse(url).path
+        for endpoint, ttl in self.CACHE_TTLS.items():
+            if path.endswith(endpoint):
+                return endpoint, ttl
+        return "", 0.0
+
+    def _get_cached_request(
+        self,
+        url: str,
+        endpoint: str,
+        ttl: float,
+        headers: T.Dict[str, T.Any],
+        params: T.Dict[str, T.Any],
+        timeout: float,
+    ) -> T.Any:
+        key = ResponseCache.get_key(
+            url,
+            {
+                k: v
+                for k, v in params.items()
+                if k not in self.CACHE_IGNORE_PARAMS
+            },
+        )
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh() and not self.revalidate_cache:
+            self.cache.record_hit(endpoint)
+            return self.cache.get_data(entry)
+
+        request_headers = dict(headers)
+        if entry is not None:
+            request_headers.update(entry.get_validators())
+
+        response = self._request(
+            "GET",
+            url,
+            self.rate_limit_delay,
+            params=params,
+            headers=request_headers,
+            timeout=timeout,
+        )
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.record_revalidated(endpoint)
+            entry.refresh(ttl)
+            self.cache.put(key, entry)
+            return self.cache.get_data(entry)
+
+        self.cache.record_miss(endpoint)
+        data = response.json()
+        if response.ok:
+            self.cache.put(
+                key,
+                CacheEntry(
+                    data,
+                    ttl,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                ),
+            )
+        return data
+
     def _get_request(
         self,
         url: str,
@@ -48,12 +166,20 @@ class Web2Client:
         params: T.Dict[str, T.Any] = {},
         timeout: float = 5.0,
     ) -> T.Any:
-        if self.rate_limit_delay > 0.0:
-            wait(self.rate_limit_delay)
-
+        endpoint, ttl = self._get_cache_ttl(url)
         try:
-            return self.requests.request(
-                "GET", url, params=params, headers=headers, timeout=timeout
+            if ttl > 0.0:
+                return self._get_cached_request(
+                    url, endpoint, ttl, headers, params, timeout
+                )
+
+            return self._request(
+                "GET",
+                url,
+                self.rate_limit_delay,
+                params=params,
+                headers=headers,
+                timeout=timeout,
             ).json()
         except KeyboardInterrupt:
             raise
@@ -72,13 +198,11 @@ class Web2Client:
         if self.dry_run:
             return {}
 
-        if delay > 0.0:
-            wait(delay)
-
         try:
-            return self.requests.request(
+            return self._request(
                 "POST",
                 url,
+                delay,
                 json=json_data,
                 params=params,
                 headers=headers,
@@ -49,11 +49,13 @@ class FunctionResult(object):
         function_name: str,
         inputs: T.List[FunctionInput],
         results: T.List[T.Any],
+        success: bool = True,
     ):
         self.contract_address = contract_address
         self.function_name = function_name
         self.inputs = inputs
         self.results = results
+        self.success = success
 
 
 class AggregateResult(object):
@@ -176,6 +178,64 @@ abi = [
         "stateMutability": "nonpayable",
         "type": "function",
     },
+    {
+        "inputs": [
+            {
+                "internalType": "bool",
+                "name": "requireSuccess",
+                "type": "bool",
+            },
+            {
+                "components": [
+                    {
+                        "internalType": "address",
+                        "name": "target",
+                        "type": "address",
+                    },
+                    {
+                        "internalType": "bytes",
+                        "name": "callData",
+                        "type": "bytes",
+                    },
+                ],
+                "internalType": "struct Multicall3.Call[]",
+                "name": "calls",
+                "type": "tuple[]",
+            },
+        ],
+        "name": "tryBlockAndAggregate",
+        "outputs": [
+            {
+                "internalType": "uint256",
+                "name": "blockNumber",
+                "type": "uint256",
+            },
+            {
+                "internalType": "bytes32",
+                "name": "blockHash",
+                "type": "bytes32",
+            },
+            {
+                "components": [
+                    {
+                        "internalType": "bool",
+                        "name": "success",
+                        "type": "bool",
+                    },
+                    {
+                        "internalType": "bytes",
+                        "name": "returnData",
+                        "type": "bytes",
+                    },
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            },
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
     {
         "inputs": [
             {
@@ -276,3 +336,29 @@ class Multicall(object):
                 for func, output in zip(funcs, outputs)
             ],
         )
+
+    def try_aggregate(self, calls: T.List[ContractFunction]) -> AggregateResult:
+        """
+        Like `aggregate` but a reverting call doesn't fail the batch, its
+        result comes back with `success` False and no results. Needs the
+        Multicall3 contract.
+        """
+        funcs = [Function(call) for call in calls]
+
+        block_number, _, outputs = self.contract.functions.tryBlockAndAggregate(
+            False, [[func.address, func.data] for func in funcs]
+        ).call()
+
+        return AggregateResult(
+            block_number=block_number,
+            results=[
+                FunctionResult(
+                    contract_address=func.address,
+                    function_name=func.name,
+                    inputs=func.inputs,
+                    results=list(func.decode_output(output)) if success else [],
+                    success=success,
+                )
+                for func, (success, output) in zip(funcs, outputs)
+            ],
+        )
@@ -0,0 +1,159 @@
+import threading
+import typing as T
+
+from eth_account.datastructures import SignedTransaction
+from eth_typing.encoding import HexStr
+from web3.contract import ContractFunction
+from web3.types import TxParams
+
+from utils import logger
+from web3_utils.web3_client import Web3Client
+
+
+class PresignedTransactionQueue:
+    """
+    Keeps signed transactions for a contract call ready to broadcast, so
+    firing one is a single `sendRawTransaction` instead of a gas estimate,
+    fee lookup, nonce read and signature on the critical path.
+
+    Every variant of the call (one per set of args passed to `prepare`) is
+    signed for the next pending nonce at the current fee level. `refresh`
+    reads both and only re-signs when one of them moved, gas is estimated
+    once per variant and reused. Run it from the background thread with
+    `run` or call it yourself whenever a block goes by.
+    """
+
+    REFRESH_PERIOD = 2.0
+
+    def __init__(
+        self,
+        w3: Web3Client,
+        build_call: T.Callable[..., ContractFunction],
+        refresh_period: float = REFRESH_PERIOD,
+    ) -> None:
+        self.w3 = w3
+        self.build_call = build_call
+        self.refresh_period = refresh_period
+
+        self.variants: T.Dict[T.Tuple[T.Any, ...], ContractFunction] = {}
+        self.gas: T.Dict[T.Tuple[T.Any, ...], int] = {}
+        self.ready: T.Dict[T.Tuple[T.Any, ...], SignedTransaction] = {}
+        self.signed_for: T.Dict[T.Tuple[T.Any, ...], T.Tuple[T.Any, ...]] = {}
+
+        self.num_signed = 0
+        self.num_fired = 0
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+
+    def prepare(self, *args: T.Any, replace: bool = False) -> None:
+        """
+        Keep a transaction for `build_call(*args)` signed, with `replace`
+        dropping every other variant, e.g. when a price moved
+        """
+        with self.lock:
+            if replace:
+                for key in [k for k in self.variants if k != args]:
+                    self._drop(key)
+            if args not in self.variants:
+                self.variants[args] = self.build_call(*args)
+            if args not in self.ready:
+                self.refresh()
+
+    def _drop(self, key: T.Tuple[T.Any, ...]) -> None:
+        self.variants.pop(key, None)
+        self.gas.pop(key, None)
+        self.ready.pop(key, None)
+        self.signed_for.pop(key, None)
+
+    def _get_gas(self, key: T.Tuple[T.Any, ...]) -> int:
+        if key in self.gas:
+            return self.gas[key]
+        try:
+            gas = self.variants[key].estimateGas({"from": self.w3.user_address})
+        except:
+            # calls like mints revert until they're allowed, sign with the
+            # client's limit and estimate again on the next re-sign
+            return self.w3.gas_limit
+        self.gas[key] = gas
+        return gas
+
+    def refresh(self) -> int:
+        """Re-sign every variant whose nonce or fee is stale, returns count"""
+        if self.w3.dry_run:
+            return 0
+
+        with self.lock:
+            if not self.variants:
+                return 0
+
+            nonce = self.w3.get_pending_nonce()
+            base_tx = self.w3.build_base_transaction(nonce=nonce)
+            fee_level = (
+                nonce,
+                base_tx.get("maxFeePerGas"),
+                base_tx.get("gasPrice"),
+            )
+
+            num_signed = 0
+            for key, call in self.variants.items():
+                if self.signed_for.get(key) == fee_level:
+                    continue
+                tx: TxParams = dict(base_tx)
+                tx["gas"] = self._get_gas(key)
+                tx = call.buildTransaction(tx)
+                signed_tx = self.w3.sign_transaction(tx)
+                if signed_tx is None:
+                    # left stale so the next refresh tries again
+                    logger.print_warn(f"Failed to sign tx for {key}")
+                    continue
+                self.ready[key] = signed_tx
+                self.signed_for[key] = fee_level
+                num_signed += 1
+
+            self.num_signed += num_signed
+            return num_signed
+
+    def fire(self, *args: T.Any) -> HexStr:
+        """Broadcast the signed transaction for `args`, signing it if needed"""
+        if self.w3.dry_run:
+            return ""
+
+        with self.lock:
+            if args not in self.ready:
+                logger.print_warn(f"No pre-signed tx for {args}, signing now")
+                self.prepare(*args)
+
+            tx_hash = ""
+            for _ in range(2):
+                if args not in self.ready:
+                    logger.print_fail(f"Unable to sign tx for {args}")
+                    break
+                tx_hash = self.w3.send_signed_transaction(self.ready[args])
+                # every variant was signed for the nonce we just sent, and if
+                # that was already used by another tx we need to re-sign too
+                self.ready.clear()
+                self.signed_for.clear()
+                if tx_hash:
+                    self.num_fired += 1
+                    break
+                logger.print_warn("Pre-signed tx was stale, re-signing")
+                self.refresh()
+        return tx_hash
+
+    def run(self, daemon: bool = True) -> None:
+        def loop() -> None:
+            while not self.stop_event.wait(self.refresh_period):
+                try:
+                    self.refresh()
+                except KeyboardInterrupt:
+                    raise
+                except:
+                    logger.print_warn("Failed to refresh pre-signed txs")
+
+        thread = threading.Thread(
+            name="presigned_tx_queue", target=loop, daemon=daemon
+        )
+        thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
@@ -0,0 +1,41 @@
+import collections
+import threading
+import typing as T
+
+from web3 import Web3
+
+
+class RpcCounter:
+    """
+    Counts the json rpc requests sent through every web3 instance it is
+    attached to, e.g. to see how many calls one bot tick costs.
+    """
+
+    def __init__(self) -> None:
+        self.counts: T.Counter[str] = collections.Counter()
+        self.lock = threading.Lock()
+
+    def _middleware(
+        self, make_request: T.Callable[[str, T.Any], T.Any], _: Web3
+    ) -> T.Callable[[str, T.Any], T.Any]:
+        def middleware(method: str, params: T.Any) -> T.Any:
+            with self.lock:
+                self.counts[method] += 1
+            return make_request(method, params)
+
+        return middleware
+
+    def attach(self, w3: Web3) -> None:
+        w3.middleware_onion.add(self._middleware, name="rpc_counter")
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts.clear()
+
+    def get_total(self) -> int:
+        with self.lock:
+            return sum(self.counts.values())
+
+    def get_counts(self) -> T.Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
@@ -0,0 +1,149 @@
+import typing as T
+
+from web3_utils.presigned_tx_queue import PresignedTransactionQueue
+
+
+class FakeCall:
+    def __init__(self, arg: int) -> None:
+        self.arg = arg
+        self.num_estimates = 0
+
+    def estimateGas(self, tx: T.Dict[str, T.Any]) -> int:
+        self.num_estimates += 1
+        return 21000 + self.arg
+
+    def buildTransaction(self, tx: T.Dict[str, T.Any]) -> T.Dict[str, T.Any]:
+        return dict(tx, data=self.arg)
+
+
+class FakeWeb3Client:
+    """Just the parts of Web3Client the queue uses, nothing is sent"""
+
+    def __init__(self) -> None:
+        self.dry_run = False
+        self.user_address = "0x0000000000000000000000000000000000000001"
+        self.gas_limit = 500000
+        self.nonce = 0
+        self.max_fee = 25
+        self.signed: T.List[T.Dict[str, T.Any]] = []
+        self.sent: T.List[T.Dict[str, T.Any]] = []
+        # hashes handed back by the next sends, then every send succeeds
+        self.send_results: T.List[str] = []
+        # number of upcoming signs that fail, like Web3Client returning None
+        self.sign_failures = 0
+
+    def get_pending_nonce(self) -> int:
+        return self.nonce
+
+    def build_base_transaction(self, nonce: int) -> T.Dict[str, T.Any]:
+        return {"nonce": nonce, "maxFeePerGas": self.max_fee}
+
+    def sign_transaction(
+        self, tx: T.Dict[str, T.Any]
+    ) -> T.Optional[T.Dict[str, T.Any]]:
+        if self.sign_failures > 0:
+            self.sign_failures -= 1
+            return None
+        self.signed.append(tx)
+        return tx
+
+    def send_signed_transaction(self, signed_tx: T.Dict[str, T.Any]) -> str:
+        self.sent.append(signed_tx)
+        if self.send_results:
+            return self.send_results.pop(0)
+        return f"0x{len(self.sent)}"
+
+
+def _get_queue() -> T.Tuple[
+    FakeWeb3Client, T.Dict[int, FakeCall], PresignedTransactionQueue
+]:
+    w3 = FakeWeb3Client()
+    calls: T.Dict[int, FakeCall] = {}
+
+    def build_call(arg: int) -> FakeCall:
+        calls[arg] = FakeCall(arg)
+        return calls[arg]
+
+    return w3, calls, PresignedTransactionQueue(w3, build_call)
+
+
+def test_presigned_queue_resigns_only_when_stale() -> None:
+    w3, calls, queue = _get_queue()
+
+    queue.prepare(1)
+    queue.prepare(2)
+    assert len(w3.signed) == 2
+    assert [tx["gas"] for tx in w3.signed] == [21001, 21002]
+
+    # nothing moved, nothing to sign
+    assert queue.refresh() == 0
+    assert len(w3.signed) == 2
+
+    w3.nonce += 1
+    assert queue.refresh() == 2
+    assert queue.ready[(1,)]["nonce"] == 1
+    assert queue.refresh() == 0
+
+    w3.max_fee += 5
+    assert queue.refresh() == 2
+    assert queue.ready[(2,)]["maxFeePerGas"] == 30
+
+    # gas is estimated once per variant and reused on every re-sign
+    assert [c.num_estimates for c in calls.values()] == [1, 1]
+    assert queue.num_signed == 6
+
+    # replacing drops the other variants so they aren't signed any more
+    queue.prepare(3, replace=True)
+    assert list(queue.variants) == [(3,)]
+    w3.nonce += 1
+    assert queue.refresh() == 1
+
+
+def test_presigned_queue_fire_retries_once_on_empty_hash() -> None:
+    w3, _, queue = _get_queue()
+    queue.prepare(1)
+
+    # the first send was for a nonce another tx used, the re-signed one goes
+    w3.send_results = [""]
+    w3.nonce = 7
+    assert queue.fire(1) == "0x2"
+    assert len(w3.sent) == 2
+    assert w3.sent[0]["nonce"] == 0
+    assert w3.sent[1]["nonce"] == 7
+    assert queue.num_fired == 1
+
+    # only retried the once
+    w3.send_results = ["", ""]
+    assert queue.fire(1) == ""
+    assert len(w3.sent) == 4
+    assert queue.num_fired == 1
+
+    # a variant nobody prepared is signed on the spot
+    num_signed = len(w3.signed)
+    assert queue.fire(2) == "0x5"
+    assert len(w3.signed) == num_signed + 1
+    assert w3.sent[-1]["data"] == 2
+
+
+def test_presigned_queue_skips_failed_signatures() -> None:
+    w3, _, queue = _get_queue()
+
+    w3.sign_failures = 1
+    queue.prepare(1)
+    assert (1,) not in queue.ready
+    assert (1,) not in queue.signed_for
+
+    # nothing was marked as signed, so the next refresh tries again
+    assert queue.refresh() == 1
+    assert queue.fire(1) == "0x1"
+
+    # a variant that can't be signed at all isn't sent
+    w3.sign_failures = 2
+    assert queue.fire(2) == ""
+    assert len(w3.sent) == 1
+
+
+if __name__ == "__main__":
+    test_presigned_queue_resigns_only_when_stale()
+    test_presigned_queue_fire_retries_once_on_empty_hash()
+    test_presigned_queue_skips_failed_signatures()
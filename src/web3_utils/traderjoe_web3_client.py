@@ -6,6 +6,7 @@ from eth_account import Account
 from eth_typing import Address
 from eth_typing.encoding import HexStr
 from web3 import Web3
+from web3.contract import ContractFunction
 from web3.types import TxParams
 
 from utils import logger
@@ -28,6 +29,33 @@ class TraderJoeWeb3Client(AvalancheCWeb3Client):
         os.path.dirname(this_dir), "web3_utils", "abi", "abi-trader-joe.json"
     )
     abi = Web3Client._get_contract_abi_from_file(abi_dir)
+    # 0.3% swap fee, as parts per thousand kept by the pool
+    FEE_NUMERATOR = 997
+    FEE_DENOMINATOR = 1000
+
+    @classmethod
+    def get_amount_out_from_reserves(
+        cls, amount_in: TokenWei, reserve_in: TokenWei, reserve_out: TokenWei
+    ) -> TokenWei:
+        """
+        Local version of the router's getAmountOut, same integer math, so a
+        quote only costs reading the pair reserves
+        """
+        if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+            return 0
+        amount_in_with_fee = amount_in * cls.FEE_NUMERATOR
+        numerator = amount_in_with_fee * reserve_out
+        denominator = reserve_in * cls.FEE_DENOMINATOR + amount_in_with_fee
+        return numerator // denominator
+
+    @staticmethod
+    def quote_from_reserves(
+        amount_a: TokenWei, reserve_a: TokenWei, reserve_b: TokenWei
+    ) -> TokenWei:
+        """Local version of the router's quote, used to balance liquidity"""
+        if amount_a <= 0 or reserve_a <= 0 or reserve_b <= 0:
+            return 0
+        return amount_a * reserve_b // reserve_a
 
     def get_amounts_out(
         self, amount_in: TokenWei, path: T.List[str]
@@ -54,12 +82,10 @@ class TraderJoeWeb3Client(AvalancheCWeb3Client):
         if len(path) < 2:
             return ""
 
-        # deadline is 2 min
-        deadline = int(time.time() + (2 * 60))
         try:
             tx: TxParams = self.build_contract_transaction(
-                self.contract.functions.swapExactTokensForAVAX(
-                    amount_in, amount_out_min, path, self.user_address, deadline
+                self._get_swap_exact_tokens_for_avax_function(
+                    amount_in, amount_out_min, path
                 )
             )
             return self.sign_and_send_transaction(tx)
@@ -67,6 +93,24 @@ class TraderJoeWeb3Client(AvalancheCWeb3Client):
             logger.print_fail(f"{e}")
             return ""
 
+    def _get_swap_exact_tokens_for_avax_function(
+        self, amount_in: TokenWei, amount_out_min: TokenWei, path: T.List[str]
+    ) -> ContractFunction:
+        # deadline is 2 min
+        deadline = int(time.time() + (2 * 60))
+        return self.contract.functions.swapExactTokensForAVAX(
+            amount_in, amount_out_min, path, self.user_address, deadline
+        )
+
+    def can_swap_exact_tokens_for_avax(
+        self, amount_in: TokenWei, amount_out_min: TokenWei, path: T.List[str]
+    ) -> bool:
+        return self.simulate_contract_transaction(
+            self._get_swap_exact_tokens_for_avax_function(
+                amount_in, amount_out_min, path
+            )
+        )
+
     def buy_lp_token(
         self,
         non_avax_token_address: Address,
@@ -75,16 +119,13 @@ class TraderJoeWeb3Client(AvalancheCWeb3Client):
         amount_token_min: TokenWei,
         amount_avax_min: TokenWei,
     ) -> HexStr:
-        deadline = int(time.time() + (2 * 60))
         try:
             tx: TxParams = self.build_contract_transaction(
-                self.contract.functions.addLiquidityAVAX(
-                    Web3.toChecksumAddress(non_avax_token_address),
+                self._get_add_liquidity_avax_function(
+                    non_avax_token_address,
                     amount_token,
                     amount_token_min,
                     amount_avax_min,
-                    self.user_address,
-                    deadline,
                 ),
                 amount_avax,
             )
@@ -92,3 +133,38 @@ class TraderJoeWeb3Client(AvalancheCWeb3Client):
         except Exception as e:
             logger.print_fail(f"{e}")
             return ""
+
+    def _get_add_liquidity_avax_function(
+        self,
+        non_avax_token_address: Address,
+        amount_token: TokenWei,
+        amount_token_min: TokenWei,
+        amount_avax_min: TokenWei,
+    ) -> ContractFunction:
+        deadline = int(time.time() + (2 * 60))
+        return self.contract.functions.addLiquidityAVAX(
+            Web3.toChecksumAddress(non_avax_token_address),
+            amount_token,
+            amount_token_min,
+            amount_avax_min,
+            self.user_address,
+            deadline,
+        )
+
+    def can_buy_lp_token(
+        self,
+        non_avax_token_address: Address,
+        amount_token: TokenWei,
+        amount_avax: TokenWei,
+        amount_token_min: TokenWei,
+        amount_avax_min: TokenWei,
+    ) -> bool:
+        return self.simulate_contract_transaction(
+            self._get_add_liquidity_avax_function(
+                non_avax_token_address,
+                amount_token,
+                amount_token_min,
+                amount_avax_min,
+            ),
+            amount_avax,
+        )
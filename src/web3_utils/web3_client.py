@@ -73,11 +73,12 @@ class Web3Client:
     # Build Tx
     ####################
 
-    def build_base_transaction(self) -> TxParams:
+    def build_base_transaction(self, nonce: T.Optional[int] = None) -> TxParams:
         """
         Build a basic EIP-1559 transaction with just nonce, chain ID and gas;
         before invoking this method you need to have specified a chain_id and
-        called set_node_uri().
+        called set_node_uri(). Pass `nonce` to queue up several transactions
+        without waiting for the previous ones to be mined.
 
         Gas is estimated according to the formula
         maxMaxFeePerGas = 2 * baseFee + maxPriorityFeePerGas.
@@ -101,7 +102,7 @@ class Web3Client:
                 self.max_priority_fee_per_gas_in_gwei, "gwei"
             )
 
-        tx["nonce"] = self.get_nonce()
+        tx["nonce"] = self.get_nonce() if nonce is None else nonce
 
         return tx
 
@@ -139,7 +140,10 @@ class Web3Client:
         return tx
 
     def build_contract_transaction(
-        self, contract_function: ContractFunction, value_in_wei: Wei = None
+        self,
+        contract_function: ContractFunction,
+        value_in_wei: Wei = None,
+        nonce: T.Optional[int] = None,
     ) -> TxParams:
         """
         Build a transaction that involves a contract interation.
@@ -147,11 +151,37 @@ class Web3Client:
         Requires passing the contract function as detailed in the docs:
         https://web3py.readthedocs.io/en/stable/web3.eth.account.html#sign-a-contract-transaction
         """
-        base_tx = self.build_base_transaction()
+        base_tx = self.build_base_transaction(nonce=nonce)
         if value_in_wei:
             base_tx["value"] = value_in_wei
         return contract_function.buildTransaction(base_tx)
 
+    def simulate_contract_transaction(
+        self,
+        contract_function: ContractFunction,
+        value_in_wei: Wei = None,
+    ) -> bool:
+        """
+        Run the contract function as an eth_call from our address against
+        the latest state and return whether it would go through, so a tx
+        that is going to revert never gets sent and never costs gas.
+        """
+        if self.dry_run:
+            return True
+
+        tx: TxParams = {"from": self.user_address}
+        if value_in_wei:
+            tx["value"] = value_in_wei
+        try:
+            contract_function.call(tx)
+            return True
+        except exceptions.ContractLogicError as e:
+            logger.print_warn(f"Simulation reverted: {e}")
+            return False
+        except ValueError as e:
+            logger.print_warn(f"Simulation failed: {e}")
+            return False
+
     ####################
     # Sign & send Tx
     ####################
@@ -229,6 +259,15 @@ class Web3Client:
         except:
             return 0
 
+    def get_pending_nonce(self) -> Nonce:
+        """Next nonce counting transactions still in the mempool"""
+        try:
+            return self.w3.eth.get_transaction_count(
+                self.user_address, "pending"
+            )
+        except:
+            return self.get_nonce()
+
     def get_gas_price(self, unit: str = "gwei") -> T.Optional[int]:
         try:
             if unit == "wei":
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+import typing as T
+
+from utils import logger
+from utils.file_util import make_sure_path_exists
+
+AUTH_CACHE_FILE = "wyndblast_auth.json"
+
+
+class AuthToken:
+    def __init__(
+        self,
+        session_token: str,
+        object_id: str,
+        username: str,
+        expires_at: float,
+    ) -> None:
+        self.session_token = session_token
+        self.object_id = object_id
+        self.username = username
+        self.expires_at = expires_at
+
+    def get_time_left(self) -> float:
+        return self.expires_at - time.time()
+
+    def to_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "session_token": self.session_token,
+            "object_id": self.object_id,
+            "username": self.username,
+            "expires_at": self.expires_at,
+        }
+
+    @staticmethod
+    def from_dict(raw: T.Dict[str, T.Any]) -> "AuthToken":
+        return AuthToken(
+            raw["session_token"],
+            raw["object_id"],
+            raw["username"],
+            raw["expires_at"],
+        )
+
+
+class WyndblastAuthCache:
+    """
+    Session tokens per account and api, persisted to the log dir so a
+    restart doesn't sign in every account again. The sign in response
+    doesn't say when a token expires, so tokens are given a fixed lifetime
+    and a background thread re-signs any registered client `refresh_margin`
+    seconds before that, keeping the sign in out of the bots' hot loop.
+    """
+
+    TOKEN_TTL = 60.0 * 60.0 * 12.0
+    REFRESH_MARGIN = 60.0 * 10.0
+    CHECK_PERIOD = 60.0
+
+    def __init__(
+        self,
+        log_dir: str,
+        ttl: float = TOKEN_TTL,
+        refresh_margin: float = REFRESH_MARGIN,
+    ) -> None:
+        self.cache_file = os.path.join(log_dir, AUTH_CACHE_FILE)
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.tokens: T.Dict[str, AuthToken] = {}
+        self.refreshers: T.Dict[str, T.Callable[[], bool]] = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+        self._load()
+
+    @staticmethod
+    def get_key(address: str, base_url: str) -> str:
+        return f"{address.lower()}@{base_url}"
+
+    def _load(self) -> None:
+        if not os.path.isfile(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as infile:
+                raw = json.load(infile)
+            self.tokens = {k: AuthToken.from_dict(v) for k, v in raw.items()}
+        except:
+            logger.print_warn(f"Failed to load {self.cache_file}, ignoring")
+            self.tokens = {}
+
+    def _save(self) -> None:
+        make_sure_path_exists(self.cache_file)
+        tmp_file = self.cache_file + ".tmp"
+        with self.lock:
+            raw = {k: v.to_dict() for k, v in self.tokens.items()}
+        try:
+            with open(tmp_file, "w") as outfile:
+                json.dump(raw, outfile, indent=4)
+            os.replace(tmp_file, self.cache_file)
+        except:
+            logger.print_warn(f"Failed to save {self.cache_file}")
+
+    def get(self, key: str) -> T.Optional[AuthToken]:
+        """Token for `key` if it is still good to use"""
+        with self.lock:
+            token = self.tokens.get(key)
+        if token is None or token.get_time_left() <= 0.0:
+            return None
+        return token
+
+    def put(
+        self,
+        key: str,
+        session_token: str,
+        object_id: str,
+        username: str,
+        ttl: T.Optional[float] = None,
+    ) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        token = AuthToken(session_token, object_id, username, time.time() + ttl)
+        with self.lock:
+            self.tokens[key] = token
+        self._save()
+
+    def invalidate(self, key: str) -> None:
+        with self.lock:
+            if key not in self.tokens:
+                return
+            del self.tokens[key]
+        self._save()
+
+    def register(self, key: str, refresher: T.Callable[[], bool]) -> None:
+        """`refresher` signs in again and returns whether it succeeded"""
+        with self.lock:
+            self.refreshers[key] = refresher
+
+    def refresh_expiring(self) -> None:
+        with self.lock:
+            expiring = [
+                (key, refresher)
+                for key, refresher in self.refreshers.items()
+                if key not in self.tokens
+                or self.tokens[key].get_time_left() < self.refresh_margin
+            ]
+
+        for key, refresher in expiring:
+            logger.print_normal(f"Refreshing wyndblast auth for {key}")
+            try:
+                if not refresher():
+                    self.invalidate(key)
+            except KeyboardInterrupt:
+                raise
+            except:
+                logger.print_fail(f"Failed to refresh wyndblast auth {key}")
+                self.invalidate(key)
+
+    def run(self, daemon: bool = True) -> None:
+        def loop() -> None:
+            while not self.stop_event.wait(self.CHECK_PERIOD):
+                self.refresh_expiring()
+
+        thread = threading.Thread(
+            name="wyndblast_auth_cache", target=loop, daemon=daemon
+        )
+        thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
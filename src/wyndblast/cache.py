@@ -1,82 +1,215 @@
+import hashlib
 import json
 import os
+import threading
+import time
 import typing as T
 
+from concurrent.futures import ThreadPoolExecutor
+
 from utils import logger
 from wyndblast.pve_google_storage_web2_client import PveGoogleStorageWeb2Client
 from wyndblast.types import (
     AccountLevels,
     LevelsInformation,
+    StageDifficulty,
     WyndLevelsStats,
     Skills,
 )
 from wyndblast.wyndblast_web2_client import WyndblastWeb2Client
 
+# name -> file it is persisted to in the log dir
+CACHE_FILES = {
+    "stages_info": "stages_info.json",
+    "account_info": "account_info.json",
+    "enemy_info": "enemy_info.json",
+    "skills_info": "skills_info.json",
+    "wynd_info": "wynd_level_info.json",
+}
+
+
+def get_content_hash(data: T.Any) -> str:
+    raw = json.dumps(data, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class StaticDataVersion:
+    """
+    Immutable snapshot of the static game data plus the lookup indexes built
+    from it. A new snapshot is created whenever the content changes and then
+    swapped in as a whole, so readers never see a half updated view.
+    """
+
+    def __init__(self, version: int, data: T.Dict[str, T.Any]) -> None:
+        self.version = version
+        self.created = time.time()
+
+        self.stages_info: T.List[LevelsInformation] = data["stages_info"]
+        self.account_info: T.List[AccountLevels] = data["account_info"]
+        self.enemy_info: T.Any = data["enemy_info"]
+        self.skills_info: T.List[Skills] = data["skills_info"]
+        self.wynd_info: WyndLevelsStats = data["wynd_info"]
+
+        self.hashes = {k: get_content_hash(v) for k, v in data.items()}
+
+        self.stage_difficulties: T.Dict[str, StageDifficulty] = {}
+        self.account_levels: T.Dict[int, AccountLevels] = {}
+        self._build_indexes()
+
+    def _build_indexes(self) -> None:
+        for stages in self.stages_info or []:
+            for stage in stages.get("stages", []):
+                for stage_difficulty_info in stage.get(
+                    "difficulties", {}
+                ).values():
+                    stage_id = stage_difficulty_info.get("id", "")
+                    if stage_id:
+                        self.stage_difficulties[
+                            stage_id
+                        ] = stage_difficulty_info
+
+        for level in self.account_info or []:
+            self.account_levels[level.get("level", -1)] = level
+
+    def as_dict(self) -> T.Dict[str, T.Any]:
+        return {
+            "stages_info": self.stages_info,
+            "account_info": self.account_info,
+            "enemy_info": self.enemy_info,
+            "skills_info": self.skills_info,
+            "wynd_info": self.wynd_info,
+        }
+
+
+class WyndblastStaticCache:
+    """
+    Versioned cache of the static wyndblast json files on google storage.
+    The files are downloaded in parallel, persisted to the log dir and
+    refreshed in the background every `ttl` seconds. A new version is only
+    published if the content hash of any file changed.
+    """
+
+    REFRESH_TTL = 60.0 * 60.0
+
+    def __init__(
+        self, log_dir: str, ttl: float = REFRESH_TTL, dry_run: bool = False
+    ) -> None:
+        self.log_dir = log_dir
+        self.ttl = ttl
+        self.google_w2: PveGoogleStorageWeb2Client = PveGoogleStorageWeb2Client(
+            dry_run=dry_run
+        )
+        # the response cache ttl matches our refresh period, without this a
+        # refresh is mostly answered with a response up to an hour old. With
+        # the etag an unchanged file is still only a 304.
+        self.google_w2.revalidate_cache = True
+        self.pool = ThreadPoolExecutor(max_workers=len(CACHE_FILES))
+        self.stop_event = threading.Event()
+        self.current: T.Optional[StaticDataVersion] = None
+        self.update_lock = threading.Lock()
+
+    def _get_file(self, name: str) -> str:
+        return os.path.join(self.log_dir, CACHE_FILES[name])
+
+    def _get_downloaders(self) -> T.Dict[str, T.Callable[[], T.Any]]:
+        return {
+            "stages_info": self.google_w2.get_level_data,
+            "account_info": self.google_w2.get_account_stats,
+            "enemy_info": self.google_w2.get_enemy_data,
+            "skills_info": self.google_w2.get_skill_data,
+            "wynd_info": self.google_w2.get_wynd_level_stats_data,
+        }
+
+    def _load_from_disk(self) -> T.Optional[T.Dict[str, T.Any]]:
+        data = {}
+        for name in CACHE_FILES.keys():
+            json_file = self._get_file(name)
+            if not os.path.isfile(json_file):
+                return None
+            with open(json_file) as infile:
+                data[name] = json.load(infile)["data"]
+        return data
+
+    def _save_to_disk(self, data: T.Dict[str, T.Any]) -> None:
+        for name, value in data.items():
+            json_file = self._get_file(name)
+            tmp_file = json_file + ".tmp"
+            with open(tmp_file, "w") as outfile:
+                json.dump({"data": value}, outfile, indent=4)
+            os.replace(tmp_file, json_file)
+
+    def _download(self) -> T.Optional[T.Dict[str, T.Any]]:
+        futures = {
+            name: self.pool.submit(download)
+            for name, download in self._get_downloaders().items()
+        }
+        data = {}
+        for name, future in futures.items():
+            result = future.result()
+            if not result:
+                logger.print_warn(f"Failed to download {name}, keeping cache")
+                return None
+            data[name] = result
+        return data
+
+    def _publish(self, data: T.Dict[str, T.Any]) -> StaticDataVersion:
+        version = 1 if self.current is None else self.current.version + 1
+        new_version = StaticDataVersion(version, data)
+        # single reference swap, readers hold on to whichever version they got
+        self.current = new_version
+        return new_version
+
+    def load(self) -> StaticDataVersion:
+        with self.update_lock:
+            data = self._load_from_disk()
+            if data is None:
+                logger.print_normal("Caching wyndblast static data...")
+                data = self._download()
+                if data is None:
+                    raise Exception("Unable to download wyndblast static data")
+                self._save_to_disk(data)
+            return self._publish(data)
+
+    def refresh(self) -> bool:
+        """Re-download the static data, returns True if a new version was published"""
+        with self.update_lock:
+            data = self._download()
+            if data is None:
+                return False
+
+            if self.current is not None:
+                hashes = {k: get_content_hash(v) for k, v in data.items()}
+                if hashes == self.current.hashes:
+                    return False
+
+            self._save_to_disk(data)
+            new_version = self._publish(data)
+
+        logger.print_ok_blue(
+            f"Updated wyndblast static data to version {new_version.version}"
+        )
+        return True
+
+    def get(self) -> StaticDataVersion:
+        if self.current is None:
+            return self.load()
+        return self.current
+
+    def run(self, daemon: bool = True) -> None:
+        def loop() -> None:
+            while not self.stop_event.wait(self.ttl):
+                try:
+                    self.refresh()
+                except KeyboardInterrupt:
+                    raise
+                except:
+                    logger.print_fail("Failed to refresh wyndblast static data")
+
+        thread = threading.Thread(
+            name="wyndblast_static_cache", target=loop, daemon=daemon
+        )
+        thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
 
-def get_cache_info(
-    log_dir: str,
-) -> T.Tuple[
-    T.List[LevelsInformation],
-    T.List[AccountLevels],
-    T.Any,
-    WyndLevelsStats,
-    T.List[Skills],
-]:
-    google_w2: PveGoogleStorageWeb2Client = PveGoogleStorageWeb2Client()
-
-    json_file = os.path.join(log_dir, "stages_info.json")
-    if os.path.isfile(json_file):
-        with open(json_file) as infile:
-            stages_info: T.List[LevelsInformation] = json.load(infile)["data"]
-    else:
-        logger.print_normal("Caching stages info...")
-        stages_info: T.List[LevelsInformation] = google_w2.get_level_data()
-        with open(json_file, "w") as outfile:
-            data = {"data": stages_info}
-            json.dump(data, outfile, indent=4)
-
-    account_info_file = os.path.join(log_dir, "account_info.json")
-    if os.path.isfile(account_info_file):
-        with open(account_info_file) as infile:
-            account_info: T.List[AccountLevels] = json.load(infile)["data"]
-    else:
-        logger.print_normal("Caching account info...")
-        account_info: T.List[AccountLevels] = google_w2.get_account_stats()
-        with open(account_info_file, "w") as outfile:
-            data = {"data": account_info}
-            json.dump(data, outfile, indent=4)
-
-    json_file = os.path.join(log_dir, "enemy_info.json")
-    if os.path.isfile(json_file):
-        with open(json_file) as infile:
-            enemy_info: T.Any = json.load(infile)["data"]
-    else:
-        logger.print_normal("Caching enemy data info...")
-        enemy_info: T.Any = google_w2.get_enemy_data()
-        with open(json_file, "w") as outfile:
-            data = {"data": enemy_info}
-            json.dump(data, outfile, indent=4)
-
-    json_file = os.path.join(log_dir, "skills_info.json")
-    if os.path.isfile(json_file):
-        with open(json_file) as infile:
-            skills_info: WyndLevelsStats = json.load(infile)["data"]
-    else:
-        logger.print_normal("Caching skills info...")
-        skills_info: WyndLevelsStats = google_w2.get_skill_data()
-        with open(json_file, "w") as outfile:
-            data = {"data": skills_info}
-            json.dump(data, outfile, indent=4)
-
-    json_file = os.path.join(log_dir, "wynd_level_info.json")
-    if os.path.isfile(json_file):
-        with open(json_file) as infile:
-            wynd_info: T.List[Skills] = json.load(infile)["data"]
-    else:
-        logger.print_normal("Caching wynd level info...")
-        wynd_info: T.List[Skills] = google_w2.get_wynd_level_stats_data()
-        with open(json_file, "w") as outfile:
-            data = {"data": wynd_info}
-            json.dump(data, outfile, indent=4)
-
-    return stages_info, account_info, enemy_info, skills_info, wynd_info
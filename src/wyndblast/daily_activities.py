@@ -2,8 +2,10 @@ import copy
 import datetime
 import json
 import random
+import threading
 import time
 import typing as T
+from concurrent.futures import ThreadPoolExecutor
 from discord import Color
 from discord_webhook import DiscordEmbed, DiscordWebhook
 
@@ -12,6 +14,7 @@ from utils import discord
 from utils import logger
 from utils.config_types import UserConfig
 from utils.email import Email, send_email
+from utils.general import get_pretty_seconds
 from utils.price import wei_to_token
 from wyndblast.assets import WYNDBLAST_ASSETS
 from wyndblast.database.models.daily_activities import (
@@ -48,6 +51,11 @@ class DailyActivitiesGame:
     MAX_NUM_ROUNDS = 3
     MIN_CLAIM_CHRO = 400
     DAYS_BETWEEN_CLAIM = 1
+    ITEMS_PER_PAGE = 5
+    # requests are still paced by the per-host rate limiter in Web2Client,
+    # these only bound how many can be waiting on the server at once
+    MAX_PAGE_WORKERS = 3
+    MAX_ROUND_WORKERS = 3
 
     def __init__(
         self,
@@ -70,6 +78,9 @@ class DailyActivitiesGame:
 
         self.current_stats = copy.deepcopy(NULL_GAME_STATS)
 
+        self.stats_lock = threading.Lock()
+        self.auth_lock = threading.Lock()
+
         logger.print_ok_blue(f"\nStarting for user {user}...")
 
     def check_and_claim_if_needed(self) -> bool:
@@ -117,15 +128,17 @@ class DailyActivitiesGame:
             self.is_deactivated = False
             return False
 
+        with self.auth_lock:
+            return self._check_and_auth_account()
+
+    def _check_and_auth_account(self) -> bool:
+        # a cached token only saves the sign in, the server still checks it
+        self.wynd_w2.has_valid_auth()
         if self.wynd_w2.update_account():
             self.is_deactivated = False
             return self.is_deactivated
 
-        if not self.wynd_w2.authorize_user():
-            self.is_deactivated = True
-            return self.is_deactivated
-
-        if not self.wynd_w2.update_account():
+        if not self.wynd_w2.reauthorize():
             self.is_deactivated = True
             return self.is_deactivated
 
@@ -159,84 +172,115 @@ class DailyActivitiesGame:
             f"Found {available_wynds}/{total} Wynds available for daily activities\n\n"
         )
 
-        wynds: T.List[WyndStatus] = []
-        ITEMS_PER_PAGE = 5
-        total_pages = int((total + ITEMS_PER_PAGE) / ITEMS_PER_PAGE)
-        logger.print_normal(f"Searching through {total_pages} pages of NFTs...")
-        for page in range(1, total_pages + 2):
-            params = {"page": page, "limit": ITEMS_PER_PAGE}
-            new_wynds = self.wynd_w2.get_all_wynds_activity(params=params)
-            if not new_wynds:
-                logger.print_warn(f"Didn't find any new winds on page {page}")
-            wynds.extend(new_wynds)
+        start = time.time()
+
+        wynds: T.List[WyndStatus] = self._get_all_wynds(total)
 
         if not wynds:
             self.check_and_auth_account()
             return
 
-        rounds_completed = 0
-        for wynd in wynds:
-            wynd_id = int(wynd["product_id"].split(":")[1])
-            wynd_faction = wynd["product_metadata"]["faction"]
-            wynd_element = wynd["product_metadata"]["element"]
-            wynd_class = wynd["product_metadata"]["class"]
+        with ThreadPoolExecutor(max_workers=self.MAX_ROUND_WORKERS) as pool:
+            results = list(pool.map(self._play_wynd, wynds))
 
-            most_recent_activity: DayLog = wynd["days"][-1]
+        wynds_played = len([r for r in results if r is not None])
+        rounds_played = sum([r for r in results if r is not None])
 
-            rounds_remaining = self._get_rounds_remaining(
-                day_log=most_recent_activity
-            )
+        pass_time = time.time() - start
+        rounds_per_minute = rounds_played / max(pass_time / 60.0, 1e-6)
+        logger.print_ok_blue(
+            f"Daily activities pass for {self.user}: {wynds_played} wynds, "
+            f"{rounds_played} rounds in {get_pretty_seconds(int(pass_time))} "
+            f"({rounds_per_minute:.2f} rounds/min)"
+        )
 
-            if most_recent_activity["round_completed"] or rounds_remaining == 0:
-                logger.print_normal(
-                    f"Skipping {wynd_id} for daily activities b/c already completed..."
-                )
-                continue
+        if wynds_played <= 0:
+            return
 
-            logger.print_normal(
-                f"\nWynd[{wynd_id}]: {rounds_remaining} rounds left to play..."
-            )
+        self.check_and_auth_account()
 
-            logger.print_bold(f"Wynd[{wynd_id}]: starting daily activities")
-            stats_fmt = logger.format_ok_blue(
-                f"Faction: {wynd_faction.upper()}\t"
-            )
-            stats_fmt += logger.format_normal(
-                f"Class: {wynd_class} Element: {wynd_element}\n"
+        self.check_and_claim_if_needed()
+
+        self._send_summary_email(len(wynds))
+        self._update_stats()
+
+    def _get_all_wynds(self, total: int) -> T.List[WyndStatus]:
+        total_pages = int((total + self.ITEMS_PER_PAGE) / self.ITEMS_PER_PAGE)
+        logger.print_normal(f"Searching through {total_pages} pages of NFTs...")
+
+        def get_page(page: int) -> T.List[WyndStatus]:
+            params = {"page": page, "limit": self.ITEMS_PER_PAGE}
+            new_wynds = self.wynd_w2.get_all_wynds_activity(params=params)
+            if not new_wynds:
+                logger.print_warn(f"Didn't find any new winds on page {page}")
+            return new_wynds
+
+        wynds: T.List[WyndStatus] = []
+        with ThreadPoolExecutor(max_workers=self.MAX_PAGE_WORKERS) as pool:
+            for new_wynds in pool.map(get_page, range(1, total_pages + 2)):
+                wynds.extend(new_wynds)
+        return wynds
+
+    def _play_wynd(self, wynd: WyndStatus) -> T.Optional[int]:
+        """
+        Play the remaining rounds for a single wynd. Rounds for one wynd
+        depend on each other so they run in order, different wynds run in
+        parallel. Returns the number of rounds played, counting the loss that
+        ends the run, or None if skipped.
+        """
+        wynd_id = int(wynd["product_id"].split(":")[1])
+        wynd_faction = wynd["product_metadata"]["faction"]
+        wynd_element = wynd["product_metadata"]["element"]
+        wynd_class = wynd["product_metadata"]["class"]
+
+        most_recent_activity: DayLog = wynd["days"][-1]
+
+        rounds_remaining = self._get_rounds_remaining(
+            day_log=most_recent_activity
+        )
+
+        if most_recent_activity["round_completed"] or rounds_remaining == 0:
+            logger.print_normal(
+                f"Skipping {wynd_id} for daily activities b/c already completed..."
             )
-            logger.print_normal("{}".format(stats_fmt))
+            return None
 
-            activities_completed = most_recent_activity.get("activities")
+        logger.print_normal(
+            f"\nWynd[{wynd_id}]: {rounds_remaining} rounds left to play..."
+        )
 
-            rounds_completed += 1
+        logger.print_bold(f"Wynd[{wynd_id}]: starting daily activities")
+        stats_fmt = logger.format_ok_blue(f"Faction: {wynd_faction.upper()}\t")
+        stats_fmt += logger.format_normal(
+            f"Class: {wynd_class} Element: {wynd_element}\n"
+        )
+        logger.print_normal("{}".format(stats_fmt))
 
-            if len(activities_completed) > 0:
-                stage = activities_completed[-1]["stage"]["level"]
-            else:
-                stage = 0
-
-            for attempt in range(rounds_remaining, 0, -1):
-                stage += 1
-
-                if not self._play_round(
-                    wynd_id,
-                    current_stage=stage,
-                    wynd_info=wynd["product_metadata"],
-                ):
-                    logger.print_warn(
-                        f"We lost, unable to proceed to next round"
-                    )
-                    break
+        activities_completed = most_recent_activity.get("activities")
 
-        if rounds_completed <= 0:
-            return
+        if len(activities_completed) > 0:
+            stage = activities_completed[-1]["stage"]["level"]
+        else:
+            stage = 0
 
-        self.check_and_auth_account()
+        rounds_played = 0
+        for attempt in range(rounds_remaining, 0, -1):
+            stage += 1
 
-        self.check_and_claim_if_needed()
+            won = self._play_round(
+                wynd_id,
+                current_stage=stage,
+                wynd_info=wynd["product_metadata"],
+            )
+            if won is None:
+                logger.print_warn(f"Unable to play round, stopping")
+                break
+            rounds_played += 1
+            if not won:
+                logger.print_warn(f"We lost, unable to proceed to next round")
+                break
 
-        self._send_summary_email(len(wynds))
-        self._update_stats()
+        return rounds_played
 
     def _send_close_game_discord_activity_update(self) -> None:
         webhook = DiscordWebhook(
@@ -294,6 +338,10 @@ class DailyActivitiesGame:
         webhook.execute()
 
     def _update_stats(self) -> None:
+        with self.stats.unit_of_work():
+            self._update_stats_in_session()
+
+    def _update_stats_in_session(self) -> None:
         chro_rewards = self.current_stats["chro"]
 
         for address, commission_percent in self.config[
@@ -353,14 +401,15 @@ class DailyActivitiesGame:
         current_stage: int,
         wynd_info: ProductMetadata,
         verbose: bool = False,
-    ) -> bool:
+    ) -> T.Optional[bool]:
+        """Whether we won the round, None if it couldn't be played"""
         options: DailyActivitySelection = self.wynd_w2.get_activity_selection(
             wynd_id
         )
 
         if not options or not isinstance(options, dict):
             self.check_and_auth_account()
-            return False
+            return None
 
         if current_stage > 1:
             actions: Action = options["selection_detail"]
@@ -370,7 +419,7 @@ class DailyActivitiesGame:
             ).get(wynd_info.get("faction", ""), [])
 
             if not faction_options:
-                return False
+                return None
 
             actions: Action = faction_options[0]
 
@@ -379,7 +428,7 @@ class DailyActivitiesGame:
         )
 
         if not selection:
-            return False
+            return None
 
         selection["product_ids"] = [self.wynd_w2._get_product_id(wynd_id)]
 
@@ -390,13 +439,39 @@ class DailyActivitiesGame:
 
         if not result:
             self.check_and_auth_account()
-            return False
+            return None
 
         did_succeed = result["stage"]["success"]
 
         level = int(result["stage"]["level"])
         rewards = result["stage"]["rewards"]
 
+        with self.stats_lock:
+            with self.stats.unit_of_work():
+                self._add_round_stats(did_succeed, level, rewards)
+
+        outcome_emoji = "\U0001F389" if did_succeed else "\U0001F915"
+
+        if level < 3:
+            logger.print_ok_blue(f"Finished stage {level}")
+            logger.print_ok_blue_arrow(
+                f"CHRO: {rewards['chro']} WAMS: {rewards['wams']}\nELEMENTAL STONES:\n{rewards['elemental_stones']}"
+            )
+            if not did_succeed:
+                logger.print_ok(f"Finished stage, we lost {outcome_emoji}")
+        else:
+            logger.print_ok(
+                f"Finished round, we {'won!' if did_succeed else 'lost.'} {outcome_emoji}"
+            )
+            logger.print_ok_arrow(
+                f"CHRO: {rewards['chro']} WAMS: {rewards['wams']}\nELEMENTAL STONES:\n {rewards['elemental_stones']}"
+            )
+
+        return did_succeed
+
+    def _add_round_stats(
+        self, did_succeed: bool, level: int, rewards: T.Dict[str, T.Any]
+    ) -> None:
         with self.stats.user() as user:
             self.current_stats["chro"] += rewards["chro"]
             user.chro += rewards["chro"]
@@ -420,23 +495,6 @@ class DailyActivitiesGame:
                         previous_value + 1,
                     )
 
-        outcome_emoji = "\U0001F389" if did_succeed else "\U0001F915"
-
-        if level < 3:
-            logger.print_ok_blue(f"Finished stage {level}")
-            logger.print_ok_blue_arrow(
-                f"CHRO: {rewards['chro']} WAMS: {rewards['wams']}\nELEMENTAL STONES:\n{rewards['elemental_stones']}"
-            )
-            if not did_succeed:
-                logger.print_ok(f"Finished stage, we lost {outcome_emoji}")
-        else:
-            logger.print_ok(
-                f"Finished round, we {'won!' if did_succeed else 'lost.'} {outcome_emoji}"
-            )
-            logger.print_ok_arrow(
-                f"CHRO: {rewards['chro']} WAMS: {rewards['wams']}\nELEMENTAL STONES:\n {rewards['elemental_stones']}"
-            )
-
         stage_key = f"stage_{level}"
         with self.stats.winloss(level) as winloss:
             if did_succeed:
@@ -446,8 +504,6 @@ class DailyActivitiesGame:
                 self.current_stats[stage_key]["losses"] += 1
                 winloss.losses += 1
 
-        return did_succeed
-
     def _get_best_action(
         self,
         current_stage: int,
@@ -10,6 +10,7 @@ from wyndblast.api_headers import (
     WYNDBLAST_AUTHORIZATION_HEADER_KEY_FORMAT,
     WYNDBLAST_DAILY_ACTIVITIES_HEADERS,
 )
+from wyndblast.auth_cache import WyndblastAuthCache
 from wyndblast.types import (
     AccountOverview,
     ActivityResult,
@@ -31,6 +32,7 @@ class DailyActivitiesWyndblastWeb2Client(WyndblastWeb2Client):
         user_address: Address,
         base_url: str,
         dry_run: bool = False,
+        auth_cache: T.Optional[WyndblastAuthCache] = None,
     ) -> None:
         super().__init__(
             private_key,
@@ -39,6 +41,7 @@ class DailyActivitiesWyndblastWeb2Client(WyndblastWeb2Client):
             rate_limit_delay=2.0,
             use_proxy=False,
             dry_run=dry_run,
+            auth_cache=auth_cache,
         )
 
     def _get_daily_activity_headers(self) -> T.Dict[str, str]:
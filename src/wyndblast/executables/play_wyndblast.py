@@ -5,6 +5,7 @@ import logging
 import os
 import time
 import traceback
+import typing as T
 
 from twilio.rest import Client
 from yaspin import yaspin
@@ -16,16 +17,23 @@ from database.connect import init_database
 from database.models.account import Account
 from health_monitor.health_monitor import HealthMonitor
 from utils import discord, file_util, logger
+from utils.bot_pool import BotPoolRunner
 from utils.email import Email, get_email_accounts_from_password
+from utils.rate_limiter import RATE_LIMITER
 from utils.security import decrypt_secret
 from wyndblast import types
-from wyndblast.cache import get_cache_info
+from wyndblast.auth_cache import WyndblastAuthCache
+from wyndblast.cache import WyndblastStaticCache
 from wyndblast.daily_activities import DailyActivitiesGame
 from wyndblast.database.models.user import WyndblastUser
 from wyndblast.wynd_bot import WyndBot
 
-TIME_BETWEEN_PLAYERS = 5.0
 TIME_BETWEEN_RUNS = 5.0
+# an account is never started more than once per this many seconds
+MIN_TIME_PER_ACCOUNT = 60.0
+MAX_WORKERS = 4
+# max bots talking to the same wyndblast api host at once
+MAX_BOTS_PER_HOST = 3
 
 
 def parse_args() -> argparse.Namespace:
@@ -45,6 +53,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--log-dir", default=log_dir)
     parser.add_argument("--groups", nargs="+", default=USER_GROUPS)
     parser.add_argument("--server-url", default="http://localhost:8080/monitor")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
     parser.add_argument(
         "--clean-non-group-user-stats",
         action="store_true",
@@ -58,6 +67,13 @@ def wait(wait_time) -> None:
     time.sleep(wait_time)
 
 
+def get_bot_hosts(bot: WyndBot) -> T.List[str]:
+    return [
+        RATE_LIMITER.get_host(bot.wynd_w2.base_url),
+        RATE_LIMITER.get_host(bot.pve_w2.base_url),
+    ]
+
+
 def run_bot() -> None:
     args = parse_args()
 
@@ -81,7 +97,12 @@ def run_bot() -> None:
             encrypt_password, GMAIL
         )
 
-    stages_info, account_info, _, _, _ = get_cache_info(log_dir)
+    static_cache = WyndblastStaticCache(log_dir)
+    static_cache.load()
+    static_cache.run(daemon=True)
+
+    auth_cache = WyndblastAuthCache(log_dir)
+    auth_cache.run(daemon=True)
 
     init_database(log_dir, STATS_DB, WyndblastUser)
 
@@ -107,11 +128,11 @@ def run_bot() -> None:
             email_accounts,
             encrypt_password,
             log_dir,
-            stages_info,
-            account_info,
+            static_cache,
             human_mode=args.human_mode,
             dry_run=args.dry_run,
             ignore_utc_time=args.ignore_utc,
+            auth_cache=auth_cache,
         )
         bot.init()
         bots.append(bot)
@@ -119,16 +140,22 @@ def run_bot() -> None:
     alerts_enabled = not args.quiet and not args.dry_run
 
     usernames = [b.user for b in bots]
-    health_monitor = HealthMonitor(args.server_url, "wyndblast", usernames).run(
-        daemon=True
+    health_monitor = HealthMonitor(args.server_url, "wyndblast", usernames)
+    health_monitor.run(daemon=True)
+
+    hosts = set([h for b in bots for h in get_bot_hosts(b)])
+    runner = BotPoolRunner(
+        bots,
+        max_workers=args.workers,
+        account_period=MIN_TIME_PER_ACCOUNT,
+        host_budgets={h: MAX_BOTS_PER_HOST for h in hosts},
+        get_hosts=get_bot_hosts,
+        health_monitor=health_monitor,
     )
 
     try:
         while True:
-            for bot in bots:
-                bot.run()
-                logger.print_normal(f"Waiting before next user...")
-                wait(TIME_BETWEEN_PLAYERS)
+            runner.run_round()
             logger.print_normal(f"Waiting for next round of botting...")
             wait(TIME_BETWEEN_RUNS)
     except KeyboardInterrupt:
@@ -139,6 +166,9 @@ def run_bot() -> None:
         logger.print_fail(stop_message)
         logger.print_fail(traceback.format_exc())
     finally:
+        static_cache.stop()
+        auth_cache.stop()
+        runner.stop()
         for bot in bots:
             bot.end()
 
@@ -1,7 +1,9 @@
+import threading
 import time
 import typing as T
 
 from contextlib import contextmanager
+from sqlalchemy.orm import joinedload
 from sqlalchemy.sql import func
 
 from config_admin import STATS_DB
@@ -68,6 +70,51 @@ NULL_GAME_STATS = {
 }
 
 
+class WyndblastStatsGraph:
+    """
+    A user's stats rows loaded in one query and bound to one session. Used by
+    WyndblastLifetimeGameStats.unit_of_work so a batch of updates costs a
+    single load and a single commit.
+    """
+
+    def __init__(
+        self, db: T.Any, user: WyndblastUser, address: str, pve_id: int
+    ) -> None:
+        self.db = db
+        self.user = user
+        self.address = address
+        self.pve_id = pve_id
+
+    @property
+    def pve(self) -> Pve:
+        for pve in self.user.pve_stats:
+            if pve.address == self.address:
+                return pve
+        return None
+
+    @property
+    def daily(self) -> DailyActivities:
+        for daily in self.user.daily_activity_stats:
+            if daily.address == self.address:
+                return daily
+        return None
+
+    def get_commission(self, address: str) -> Commission:
+        for commission in self.user.commission:
+            if commission.address == address:
+                return commission
+        return None
+
+    def get_winloss(self, stage: int) -> WinLoss:
+        for winloss in self.daily.stages:
+            if winloss.stage == stage:
+                return winloss
+        return None
+
+    def add_stage(self, level: str) -> None:
+        self.db.add(Level(pve_id=self.pve_id, level=level))
+
+
 class WyndblastLifetimeGameStats:
     def __init__(
         self,
@@ -85,6 +132,8 @@ class WyndblastLifetimeGameStats:
         self._add_dailies_wallet()
         self._add_pve_wallet()
         self.user_id = None
+        self.pve_id = None
+        self.local = threading.local()
 
         with ManagedSession(self.db_str) as db:
             user = (
@@ -95,8 +144,62 @@ class WyndblastLifetimeGameStats:
             assert user is not None, f"User {self.alias} not in DB!"
             self.user_id = user.id
 
+            pve = (
+                db.query(Pve)
+                .filter(Pve.user_id == self.user_id)
+                .filter(Pve.address == self.address)
+                .first()
+            )
+            self.pve_id = pve.id if pve is not None else None
+
+    def _get_unit_of_work(self) -> T.Optional[WyndblastStatsGraph]:
+        return getattr(self.local, "graph", None)
+
+    @contextmanager
+    def unit_of_work(self) -> T.Iterator[WyndblastStatsGraph]:
+        """
+        Load the user's stats graph once and apply every mutation made in
+        the block, including through user()/pve()/daily()/commission()/
+        winloss()/add_stage(), in a single commit. Re-entrant per thread.
+        """
+        graph = self._get_unit_of_work()
+        if graph is not None:
+            yield graph
+            return
+
+        with ManagedSession(self.db_str) as db:
+            user = (
+                db.query(WyndblastUser)
+                .options(
+                    joinedload(WyndblastUser.commission),
+                    joinedload(WyndblastUser.pve_stats),
+                    joinedload(WyndblastUser.daily_activity_stats).joinedload(
+                        DailyActivities.stages
+                    ),
+                    joinedload(WyndblastUser.daily_activity_stats).joinedload(
+                        DailyActivities.elemental_stones
+                    ),
+                )
+                .filter(WyndblastUser.id == self.user_id)
+                .first()
+            )
+            assert user is not None, f"User {self.alias} not in DB!"
+
+            self.local.graph = WyndblastStatsGraph(
+                db, user, self.address, self.pve_id
+            )
+            try:
+                yield self.local.graph
+            finally:
+                self.local.graph = None
+
     @contextmanager
     def user(self) -> T.Iterator[WyndblastUser]:
+        graph = self._get_unit_of_work()
+        if graph is not None:
+            yield graph.user
+            return
+
         with ManagedSession(self.db_str) as db:
             user = (
                 db.query(WyndblastUser)
@@ -114,6 +217,11 @@ class WyndblastLifetimeGameStats:
 
     @contextmanager
     def pve(self) -> T.Iterator[Pve]:
+        graph = self._get_unit_of_work()
+        if graph is not None:
+            yield graph.pve
+            return
+
         with ManagedSession(self.db_str) as db:
             pve = (
                 db.query(Pve)
@@ -130,6 +238,11 @@ class WyndblastLifetimeGameStats:
 
     @contextmanager
     def daily(self) -> T.Iterator[DailyActivities]:
+        graph = self._get_unit_of_work()
+        if graph is not None:
+            yield graph.daily
+            return
+
         with ManagedSession(self.db_str) as db:
             daily = (
                 db.query(DailyActivities)
@@ -146,6 +259,13 @@ class WyndblastLifetimeGameStats:
 
     @contextmanager
     def commission(self, address: str) -> T.Iterator[Commission]:
+        graph = self._get_unit_of_work()
+        if graph is not None:
+            commission = graph.get_commission(address)
+            assert commission is not None, f"{address} not in commission DB!"
+            yield commission
+            return
+
         with ManagedSession(self.db_str) as db:
             commission = (
                 db.query(Commission)
@@ -164,6 +284,13 @@ class WyndblastLifetimeGameStats:
 
     @contextmanager
     def winloss(self, stage: int) -> T.Iterator[WinLoss]:
+        graph = self._get_unit_of_work()
+        if graph is not None:
+            winloss = graph.get_winloss(stage)
+            assert winloss is not None, f"{stage} not in winloss DB!"
+            yield winloss
+            return
+
         with ManagedSession(self.db_str) as db:
             winloss = (
                 db.query(WinLoss)
@@ -185,11 +312,13 @@ class WyndblastLifetimeGameStats:
                 logger.print_fail("Failed to store db item!")
 
     def add_stage(self, level: str) -> None:
-        with self.pve() as pve:
-            pve_id = pve.id
+        graph = self._get_unit_of_work()
+        if graph is not None:
+            graph.add_stage(level)
+            return
 
         with ManagedSession(self.db_str) as db:
-            level = Level(pve_id=pve_id, level=level)
+            level = Level(pve_id=self.pve_id, level=level)
             try:
                 db.add(level)
             except:
@@ -11,6 +11,7 @@ from yaspin import yaspin
 
 from config_wyndblast import COMMISSION_WALLET_ADDRESS
 from joepegs.joepegs_api import JoePegsClient
+from database.connect import QueryCounter
 from utils import discord
 from utils import logger
 from utils.config_types import UserConfig
@@ -21,6 +22,7 @@ from utils.user import get_alias_from_user
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
 from web3_utils.chro_web3_client import ChroWeb3Client
 from wyndblast.assets import WYNDBLAST_ASSETS
+from wyndblast.cache import StaticDataVersion, WyndblastStaticCache
 from wyndblast.database.models.pve import PveSchema
 from wyndblast.game_stats import NULL_GAME_STATS
 from wyndblast.game_stats import WyndblastLifetimeGameStats
@@ -74,8 +76,7 @@ class PveGame:
         wynd_w2: PveWyndblastWeb2Client,
         wynd_w3: WyndblastGameWeb3Client,
         stats: WyndblastLifetimeGameStats,
-        stages_info: T.List[types.LevelsInformation],
-        account_info: T.List[types.AccountLevels],
+        static_cache: WyndblastStaticCache,
         human_mode: bool,
         allow_deactivate: bool,
         ignore_utc_time: bool = False,
@@ -124,21 +125,68 @@ class PveGame:
         self.last_mission = None
         self.units_last_used = []
 
-        self.stages_info: T.List[types.LevelsInformation] = stages_info
-        self.account_info: T.List[types.AccountLevels] = account_info
+        self.stamina: T.Optional[int] = None
+        self.num_battles = 0
+
+        self.static_cache = static_cache
+        self.static_data: T.Optional[StaticDataVersion] = None
+        self.stages_info: T.List[types.LevelsInformation] = []
+        self.account_info: T.List[types.AccountLevels] = []
+        self.sorted_levels: T.List[str] = []
+        self.level_positions: T.Dict[str, int] = {}
+        self.levels_by_difficulty: T.Dict[str, T.List[str]] = {}
+        self.enemy_lineups: T.Dict[str, T.List[types.BattleUnit]] = {}
+        self._check_for_static_data_update()
+
+        with self.stats.pve() as pve:
+            self.completed = set([p.level for p in pve.levels_completed])
+
+        self.did_tutorial = len(self.completed) > 0
+
+        logger.print_ok_blue(f"\nStarting PVE game for user {user}...")
+
+    def _check_for_static_data_update(self) -> None:
+        """
+        Pick up a new version of the static game data if the cache has
+        refreshed since we last looked
+        """
+        static_data = self.static_cache.get()
+        if (
+            self.static_data is not None
+            and static_data.version == self.static_data.version
+        ):
+            return
+
+        self.static_data = static_data
+        self.stages_info = static_data.stages_info
+        self.account_info = static_data.account_info
 
         self.sorted_levels = []
         for level in self._get_all_levels_from_cache(exclude_difficulty=True):
             self.sorted_levels.extend(
                 [level + d for d in LEVEL_HIERARCHY.keys()]
             )
+        self._build_level_indexes()
 
-        with self.stats.pve() as pve:
-            self.completed = set([p.level for p in pve.levels_completed])
+    def _build_level_indexes(self) -> None:
+        """
+        Position and difficulty views of the sorted levels plus the enemy
+        lineup per mission, built once per static data version so that the
+        story loop never has to walk the stage lists
+        """
+        self.level_positions = {
+            level: inx for inx, level in enumerate(self.sorted_levels)
+        }
 
-        self.did_tutorial = len(self.completed) > 0
+        self.levels_by_difficulty = {d: [] for d in LEVEL_HIERARCHY.keys()}
+        for level in self.sorted_levels:
+            self.levels_by_difficulty.setdefault(level[-2:], []).append(level)
 
-        logger.print_ok_blue(f"\nStarting PVE game for user {user}...")
+        stage_difficulties = self.static_data.stage_difficulties
+        self.enemy_lineups = {
+            mission: self._build_enemy_lineup(stage_info)
+            for mission, stage_info in stage_difficulties.items()
+        }
 
     def _is_just_past_midnight_utc(self) -> bool:
         if self.ignore_utc_time:
@@ -150,10 +198,8 @@ class PveGame:
 
     def _get_level_five_exp(self) -> int:
         INVALID_EXP = 1000000
-        for level in self.account_info:
-            if level.get("level", -1) == 5:
-                return level.get("total_exp", INVALID_EXP)
-        return INVALID_EXP
+        level = self.static_data.account_levels.get(5, {})
+        return level.get("total_exp", INVALID_EXP)
 
     def _get_all_levels_from_cache(
         self, exclude_difficulty: bool = False
@@ -177,26 +223,7 @@ class PveGame:
         return sorted(list(levels))
 
     def _get_stage_info_from_cache(self, mission: str) -> types.StageDifficulty:
-        stages = []
-
-        for stages in self.stages_info:
-            if stages.get("id", "") in mission:
-                stages = stages.get("stages", [])
-                break
-
-        level_info: types.StageInfo = types.StageInfo()
-        for stage in stages:
-            if stage.get("id", "") in mission:
-                level_info = stage
-                break
-
-        for difficulty, stage_difficulty_info in level_info.get(
-            "difficulties", {}
-        ).items():
-            if stage_difficulty_info.get("id", "") in mission:
-                return stage_difficulty_info
-
-        return {}
+        return self.static_data.stage_difficulties.get(mission, {})
 
     def _get_num_enemies_for_mission(self, mission: str) -> int:
         if mission[:3] not in ALLOWED_MAPS:
@@ -206,11 +233,12 @@ class PveGame:
         return len(self._get_enemy_lineup(mission))
 
     def _get_enemy_lineup(self, mission: str) -> T.List[types.BattleUnit]:
-        enemies: T.List[types.BattleUnit] = []
+        return list(self.enemy_lineups.get(mission, []))
 
-        stage_info: types.StageDifficulty = self._get_stage_info_from_cache(
-            mission
-        )
+    def _build_enemy_lineup(
+        self, stage_info: types.StageDifficulty
+    ) -> T.List[types.BattleUnit]:
+        enemies: T.List[types.BattleUnit] = []
 
         enemies_info = stage_info.get("enemy", {})
         for enemy_type, category in enemies_info.items():
@@ -305,7 +333,12 @@ class PveGame:
         if self.last_mission is None:
             return self._get_next_stage_from_api()
         else:
-            index = self.sorted_levels.index(self.last_mission) + 1
+            index = (
+                self.level_positions.get(
+                    self.last_mission, len(self.sorted_levels)
+                )
+                + 1
+            )
             if index >= len(self.sorted_levels):
                 return self._get_next_stage_from_api()
 
@@ -329,12 +362,16 @@ class PveGame:
             self.did_tutorial = True
 
         unlocked = stages["unlocked"]
-        next_stages = [s for s in unlocked if s not in list(self.completed)]
+        next_stages = [s for s in unlocked if s not in self.completed]
         if len(next_stages) == 0:
             logger.print_normal(f"Not playing b/c no stages left to play!")
             return ""
 
-        available_indices = [self.sorted_levels.index(v) for v in next_stages]
+        available_indices = [
+            self.level_positions[v]
+            for v in next_stages
+            if v in self.level_positions
+        ]
         if available_indices:
             stage_id = self.sorted_levels[min(available_indices)]
         else:
@@ -351,8 +388,24 @@ class PveGame:
         )
         return stage_info.get("stamina_cost", 10000)
 
-    def _get_stamina(self) -> int:
-        return self.wynd_w2.get_stamina()
+    def _get_stamina(self, refresh: bool = False) -> int:
+        """
+        Stamina is fetched once and then tracked locally from the battles we
+        submit, `refresh` asks the server again (e.g. to pick up regen)
+        """
+        if refresh or self.stamina is None:
+            self.stamina = self.wynd_w2.get_stamina()
+        return self.stamina
+
+    def _use_stamina(self, amount: int) -> None:
+        if self.stamina is not None:
+            self.stamina = max(0, self.stamina - amount)
+
+    def _has_stamina(self, needed_stamina: int) -> bool:
+        if self._get_stamina() >= needed_stamina:
+            return True
+        # our local count doesn't see regen, so check before giving up
+        return self._get_stamina(refresh=True) >= needed_stamina
 
     def _send_notifications(self, chro_rewards: types.PveReward) -> None:
         unclaimed_chro_earned = chro_rewards.get("claimable", 0)
@@ -487,17 +540,25 @@ class PveGame:
     def _update_stats(self) -> None:
         chro_rewards = self.current_stats["chro"]
 
-        for address, commission_percent in self.config[
-            "commission_percent_per_mine"
-        ].items():
-            commission_chro = chro_rewards * (commission_percent / 100.0)
+        with QueryCounter(self.stats.db_str) as counter:
+            with self.stats.unit_of_work() as stats:
+                for address, commission_percent in self.config[
+                    "commission_percent_per_mine"
+                ].items():
+                    commission_chro = chro_rewards * (
+                        commission_percent / 100.0
+                    )
 
-            with self.stats.commission(address) as commission:
-                commission.amount += commission_chro
+                    with self.stats.commission(address) as commission:
+                        commission.amount += commission_chro
 
-            logger.print_ok(
-                f"Added {commission_chro} CHRO for {address} in commission ({commission_percent}%)!"
-            )
+                    logger.print_ok(
+                        f"Added {commission_chro} CHRO for {address} in commission ({commission_percent}%)!"
+                    )
+
+                stats_json = PveSchema().dump(stats.pve)
+
+        logger.print_normal(f"Stats update took {counter.count} queries")
 
         self.current_stats = copy.deepcopy(NULL_GAME_STATS)
         self.current_stats["pve_game"][self.address] = {
@@ -507,12 +568,10 @@ class PveGame:
             "claimed_chro": 0.0,
         }
 
-        with self.stats.pve() as pve:
-            stats_json = PveSchema().dump(pve)
-            logger.print_ok_blue(
-                f"Lifetime Stats for {self.user.upper()}\n"
-                f"{json.dumps(stats_json, indent=4)}"
-            )
+        logger.print_ok_blue(
+            f"Lifetime Stats for {self.user.upper()}\n"
+            f"{json.dumps(stats_json, indent=4)}"
+        )
 
     def _check_and_level_units(self, our_units: types.PveNfts) -> None:
         """
@@ -595,7 +654,7 @@ class PveGame:
         self.wynd_w2.preset_team([product_id])
 
     def _get_levels_at_difficulty(self, difficulty: Difficulty) -> T.List[str]:
-        return [l for l in self.sorted_levels if difficulty.value in l]
+        return self.levels_by_difficulty.get(difficulty.value, [])
 
     def _get_next_level(self, countdown: types.Countdown) -> str:
         stage_id = self._get_next_stage()
@@ -647,11 +706,10 @@ class PveGame:
                 return ""
 
         needed_stamina = self._get_stamina_for_level(stage_id)
-        current_stamina = self._get_stamina()
-        if self.human_mode and current_stamina < needed_stamina:
+        if self.human_mode and not self._has_stamina(needed_stamina):
             logger.print_normal(
                 f"Not playing more since we're behaving and respecting "
-                f"stamina...Have: {current_stamina} Need: {needed_stamina}"
+                f"stamina...Have: {self.stamina} Need: {needed_stamina}"
             )
             return ""
 
@@ -686,6 +744,16 @@ class PveGame:
             logger.print_warn(f"No players available to battle")
             return False
 
+        # fetched once per round, the stamina count is then kept up to date
+        # from the battles we submit rather than asked for on every attempt
+        needed_stamina = self._get_stamina_for_level(stage_id)
+        logger.print_normal(
+            f"Stamina, Have: {self._get_stamina()} Need: {needed_stamina}"
+        )
+
+        logger.print_normal(f"Pinging realtime...")
+        self.wynd_w2.ping_realtime()
+
         RETRY_ATTEMPTS = 6
         did_succeed = False
         difficulty_adjustment = LEVEL_HIERARCHY[stage_id[-2:]]
@@ -694,21 +762,10 @@ class PveGame:
                 self.min_game_duration, self.max_game_duration
             )
             result = "win" if random.randint(1, 2) == 1 else "lose"
-            should_win = result == "win"
-
-            logger.print_normal(f"Getting stamina...")
-            needed_stamina = self._get_stamina_for_level(stage_id)
-            current_stamina = self._get_stamina()
-            logger.print_normal(
-                f"Stamina, Have: {current_stamina} Need: {needed_stamina}"
-            )
-
-            logger.print_normal(f"Pinging realtime...")
-            self.wynd_w2.ping_realtime()
 
             did_succeed = False
 
-            if self.human_mode and current_stamina < needed_stamina:
+            if self.human_mode and not self._has_stamina(needed_stamina):
                 logger.print_warn("Not enough stamina not attempting battle...")
                 break
 
@@ -721,6 +778,8 @@ class PveGame:
                     logger.print_warn(f"We {result.upper()} \U0001F62D")
                 did_succeed = True
                 self.did_tutorial = True
+                self.num_battles += 1
+                self._use_stamina(needed_stamina)
 
             if did_succeed:
                 if result == "lose" and attempt + 1 < RETRY_ATTEMPTS:
@@ -733,7 +792,11 @@ class PveGame:
                     self.current_stats["pve_game"][self.address][
                         "levels_completed"
                     ].append(stage_id)
-                    self.stats.add_stage(stage_id)
+                    with QueryCounter(self.stats.db_str) as counter:
+                        self.stats.add_stage(stage_id)
+                    logger.print_normal(
+                        f"Stored round result with {counter.count} queries"
+                    )
                     self.last_mission = stage_id
                     logger.print_normal(
                         f"Beat level {stage_id}. {self.current_stats['pve_game'][self.address]['levels_completed']}"
@@ -741,9 +804,14 @@ class PveGame:
                     break
             elif attempt + 1 >= RETRY_ATTEMPTS:
                 logger.print_fail(f"Failed to submit battle")
+                # we don't know why it failed, so don't trust our count
+                self.stamina = None
             else:
                 logger.print_warn(f"Failed to submit battle, retrying...")
                 wait(2.0 * attempt)
+                # the realtime session may have lapsed, the rest of the
+                # round state (lineups, stage, stamina cost) is still good
+                self.wynd_w2.ping_realtime()
 
         if not did_succeed:
             return False
@@ -754,6 +822,19 @@ class PveGame:
 
         return True
 
+    def _log_story_throughput(
+        self, story_time: float, battles: int, api_calls: int
+    ) -> None:
+        if battles <= 0:
+            return
+
+        battles_per_minute = battles / max(story_time, 1.0) * 60.0
+        logger.print_ok_blue(
+            f"Played {battles} battles in {get_pretty_seconds(int(story_time))} "
+            f"({battles_per_minute:.2f} battles/min, "
+            f"{api_calls / float(battles):.1f} api calls/battle)"
+        )
+
     def check_and_claim_if_needed(self, exp: int) -> bool:
         chro_rewards: types.PveRewards = self.wynd_w2.get_chro_rewards()
         unclaimed_chro = chro_rewards.get("claimable", 0)
@@ -825,15 +906,13 @@ class PveGame:
             self.is_deactivated = False
             return False
 
+        # a cached token only saves the sign in, the server still checks it
+        self.wynd_w2.has_valid_auth()
         if self.wynd_w2.update_account():
             self.is_deactivated = False
             return self.is_deactivated
 
-        if not self.wynd_w2.authorize_user():
-            self.is_deactivated = True
-            return self.is_deactivated
-
-        if not self.wynd_w2.update_account():
+        if not self.wynd_w2.reauthorize():
             self.is_deactivated = True
             return self.is_deactivated
 
@@ -865,6 +944,8 @@ class PveGame:
             )
             return
 
+        self._check_for_static_data_update()
+
         if not self.did_tutorial:
             if not self._check_and_try_tutorial():
                 logger.print_fail_arrow(f"Failed to complete tutorial...")
@@ -894,7 +975,9 @@ class PveGame:
             logger.print_ok_blue(f"Weekly quests reset in {weekly_reset_left}")
 
         logger.print_ok_blue_arrow(f"User exp: {user_exp}")
-        logger.print_ok_blue_arrow(f"User stamina: {self._get_stamina()}")
+        logger.print_ok_blue_arrow(
+            f"User stamina: {self._get_stamina(refresh=True)}"
+        )
         chro_rewards_before: types.PveRewards = self.wynd_w2.get_chro_rewards()
         if chro_rewards_before:
             logger.print_ok_blue_arrow(
@@ -904,11 +987,21 @@ class PveGame:
                 f"Claimed: {chro_rewards_before['claimed']}"
             )
 
+        story_start = time.time()
+        battles_before = self.num_battles
+        requests_before = self.wynd_w2.num_requests
+
         while self._check_and_play_story(nft_data, countdown):
             wait(random.randint(1, 10 if self.human_mode else 5))
             self.check_and_auth_account()
             logger.print_normal(f"Playing next stage...")
 
+        self._log_story_throughput(
+            time.time() - story_start,
+            self.num_battles - battles_before,
+            self.wynd_w2.num_requests - requests_before,
+        )
+
         self._check_and_claim_quest_list()
         self._check_and_level_units(nft_data)
 
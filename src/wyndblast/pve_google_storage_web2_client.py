@@ -22,6 +22,17 @@ from wyndblast.wyndblast_web2_client import WyndblastWeb2Client
 
 
 class PveGoogleStorageWeb2Client(WyndblastWeb2Client):
+    # static game data, only changes when the game is patched
+    CACHE_TTLS = {
+        "PvE-enemy.json": 60.0 * 60.0,
+        "PvE-stages.json": 60.0 * 60.0,
+        "account-stats.json": 60.0 * 60.0,
+        "wynd-level-stats.json": 60.0 * 60.0,
+        "skills.json": 60.0 * 60.0,
+    }
+    # "v" is the server time, only used to bust the browser cache
+    CACHE_IGNORE_PARAMS = ["v"]
+
     def __init__(self, dry_run: bool = False) -> None:
         super().__init__(
             "dummy",
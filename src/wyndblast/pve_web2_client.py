@@ -11,6 +11,7 @@ from wyndblast.api_headers import (
     WYNDBLAST_AUTHORIZATION_HEADER_KEY_FORMAT,
     WYNDBLAST_PVE_HEADERS,
 )
+from wyndblast.auth_cache import WyndblastAuthCache
 from wyndblast.types import (
     BattlePayload,
     BattleSetup,
@@ -40,6 +41,7 @@ class PveWyndblastWeb2Client(WyndblastWeb2Client):
         user_address: Address,
         base_url: str,
         dry_run: bool = False,
+        auth_cache: T.Optional[WyndblastAuthCache] = None,
     ) -> None:
         super().__init__(
             private_key,
@@ -48,6 +50,7 @@ class PveWyndblastWeb2Client(WyndblastWeb2Client):
             rate_limit_delay=3.5,
             use_proxy=False,
             dry_run=dry_run,
+            auth_cache=auth_cache,
         )
 
     def _get_pve_headers(
@@ -15,6 +15,8 @@ from utils.price import wei_to_token
 from utils.user import get_alias_from_user
 from utils.security import decrypt_secret
 from web3_utils.avalanche_c_web3_client import AvalancheCWeb3Client
+from wyndblast.auth_cache import WyndblastAuthCache
+from wyndblast.cache import WyndblastStaticCache
 from wyndblast.config_manager_wyndblast import WyndblastConfigManager
 from wyndblast.daily_activities import DailyActivitiesGame
 from wyndblast.daily_activities_web2_client import (
@@ -24,7 +26,7 @@ from wyndblast.database.models.user import WyndblastUser, WyndblastUserSchema
 from wyndblast.game_stats import WyndblastLifetimeGameStats
 from wyndblast.pve import PveGame
 from wyndblast.pve_web2_client import PveWyndblastWeb2Client
-from wyndblast.types import AccountLevels, LevelsInformation, WyndNft
+from wyndblast.types import WyndNft
 from wyndblast.wyndblast_web2_client import WyndblastWeb2Client
 from wyndblast.wyndblast_web3_client import (
     WyndblastGameWeb3Client,
@@ -45,11 +47,11 @@ class WyndBot:
         email_accounts: T.List[Email],
         encrypt_password: str,
         log_dir: str,
-        stages_info: T.List[LevelsInformation],
-        account_info: T.List[AccountLevels],
+        static_cache: WyndblastStaticCache,
         human_mode: bool,
         dry_run: bool,
         ignore_utc_time: bool,
+        auth_cache: T.Optional[WyndblastAuthCache] = None,
     ):
         self.config = config
         self.alias = get_alias_from_user(user)
@@ -87,6 +89,7 @@ class WyndBot:
                 self.address,
                 WyndblastWeb2Client.DAILY_ACTIVITY_BASE_URL,
                 dry_run=dry_run,
+                auth_cache=auth_cache,
             )
         )
         self.pve_w2: PveWyndblastWeb2Client = PveWyndblastWeb2Client(
@@ -94,6 +97,7 @@ class WyndBot:
             self.address,
             WyndblastWeb2Client.PVE_BASE_URL,
             dry_run=dry_run,
+            auth_cache=auth_cache,
         )
 
         self.wynd_w3: WyndblastGameWeb3Client = (
@@ -133,8 +137,7 @@ class WyndBot:
             self.pve_w2,
             self.wynd_w3,
             self.stats,
-            stages_info,
-            account_info,
+            static_cache,
             human_mode,
             allow_deactivate=self.SUPPORT_ACCOUNT_DEACTIVATION,
             ignore_utc_time=ignore_utc_time,
@@ -330,8 +333,7 @@ class WyndBot:
 
         if self.alias in PVE_ENABLED:
             logger.print_bold(f"\n\nAttempting PVE game for {self.user}")
-            self.pve_w2.logout_user()
-            if self.pve_w2.authorize_user():
+            if self.pve_w2.ensure_authorized():
                 self.pve.play_game()
 
         if self.alias in DAILY_ENABLED:
@@ -339,9 +341,7 @@ class WyndBot:
                 logger.print_bold(
                     f"\n\nAttempting Daily Activities for {self.user}"
                 )
-                if not self.wynd_w2.update_account():
-                    self.wynd_w2.authorize_user()
-                    self.wynd_w2.update_account()
+                self.wynd_w2.ensure_authorized()
 
                 self._check_and_submit_available_inventory()
                 self.daily_activities.run_activity()
@@ -16,6 +16,7 @@ from wyndblast.api_headers import (
     WYNDBLAST_DAILY_ACTIVITIES_HEADERS,
     WYNDBLAST_PVE_HEADERS,
 )
+from wyndblast.auth_cache import WyndblastAuthCache
 from wyndblast.types import (
     AccountOverview,
     ActivityResult,
@@ -77,6 +78,7 @@ class WyndblastWeb2Client(web2_client.Web2Client):
         rate_limit_delay: float = 5.0,
         use_proxy: bool = False,
         dry_run: bool = False,
+        auth_cache: T.Optional[WyndblastAuthCache] = None,
     ) -> None:
         super().__init__(
             base_url,
@@ -96,6 +98,11 @@ class WyndblastWeb2Client(web2_client.Web2Client):
         self.object_id = None
         self.username = None
 
+        self.auth_cache = auth_cache
+        self.auth_key = WyndblastAuthCache.get_key(self.user_address, base_url)
+        self.num_sign_ins = 0
+        self._load_cached_auth()
+
     def _get_product_id(self, nft_id: int) -> str:
         return ":".join([self.WYNDBLAST_NFT_CONTRACT_ADDRESS, str(nft_id)])
 
@@ -190,7 +197,49 @@ class WyndblastWeb2Client(web2_client.Web2Client):
             url, json_data=payload, headers=headers, params=params
         )
 
+    def _load_cached_auth(self) -> bool:
+        if self.auth_cache is None:
+            return False
+        token = self.auth_cache.get(self.auth_key)
+        if token is None:
+            return False
+        self.session_token = token.session_token
+        self.object_id = token.object_id
+        self.username = token.username
+        # tokens from a previous run need refreshing just like new ones
+        self.auth_cache.register(self.auth_key, self._sign_in)
+        return True
+
+    def _invalidate_cached_auth(self) -> None:
+        if self.auth_cache is not None:
+            self.auth_cache.invalidate(self.auth_key)
+
+    def _sign_in(self) -> bool:
+        return self.authorize_user() and self.update_account()
+
+    def has_valid_auth(self) -> bool:
+        """True if we hold a token that hasn't expired, no network calls"""
+        if self.auth_cache is None:
+            return False
+        return self._load_cached_auth()
+
+    def ensure_authorized(self) -> bool:
+        """
+        Make sure the server still accepts our session. A cached token only
+        saves signing in again, it is checked like any other.
+        """
+        self.has_valid_auth()
+        if self.update_account():
+            return True
+        return self.reauthorize()
+
+    def reauthorize(self) -> bool:
+        """Drop the session, cached one included, and sign in again"""
+        self._invalidate_cached_auth()
+        return self._sign_in()
+
     def logout_user(self) -> None:
+        self._invalidate_cached_auth()
         try:
             res = self._logout_user_raw(headers=self._get_moralis_headers())
             logger.print_bold(
@@ -215,6 +264,15 @@ class WyndblastWeb2Client(web2_client.Web2Client):
             self.session_token = res["sessionToken"]
             self.object_id = res["objectId"]
             self.username = res["username"]
+            self.num_sign_ins += 1
+            if self.auth_cache is not None:
+                self.auth_cache.put(
+                    self.auth_key,
+                    self.session_token,
+                    self.object_id,
+                    self.username,
+                )
+                self.auth_cache.register(self.auth_key, self._sign_in)
             logger.print_normal(
                 f"Successfully authorized user {self.user_address}:\nToken: {self.session_token}\nUser: {self.username}"
             )
@@ -250,6 +308,7 @@ class WyndblastWeb2Client(web2_client.Web2Client):
             raise
         except:
             logger.print_fail(f"Failed to update {self.object_id}")
+            self._invalidate_cached_auth()
             if res:
                 logger.print_normal(f"{res}")
             return False